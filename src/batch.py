@@ -0,0 +1,217 @@
+"""无界面批量处理入口
+
+用法示例:
+    python batch.py export layouts/*.json --preset 680k --output-dir masks --jobs 8
+    python batch.py export chip.json --preset 680k --output-dir masks --region-masks --cycle-masks --jobs 8
+    python batch.py import masks/*.txt --preset 680k --output-dir layouts --jobs 8
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import os
+import sys
+import time
+
+from core.grid import CHIP_PRESETS, Grid
+from core.layout import load_cycles, load_layout, parse_grid_size, save_layout
+from core.mask_export import export_masks, plan_exports
+from core.mask_import import import_mask
+from core.mask_reader import MASK_READERS
+from core.mask_writer import MASK_WRITERS
+from core.rasterizer import rasterize_regions
+
+def export_layout(layout_file: str, size, output_dir: str, encoding: str):
+    """导出单个布局文件的mask，返回 (布局文件, 输出文件, 点数, 耗时)"""
+    start = time.perf_counter()
+    layout_size, regions = load_layout(layout_file)
+    rows, cols = size or layout_size or (None, None)
+    if rows is None:
+        raise ValueError("未指定点阵规格，请使用 --preset/--size 或在布局文件中给出")
+
+    stem = os.path.splitext(os.path.basename(layout_file))[0]
+    output_file = os.path.join(output_dir, stem + MASK_WRITERS[encoding].extension)
+    Grid(rows, cols).export_mask(regions, output_file, encoding)
+    return layout_file, output_file, rows * cols, time.perf_counter() - start
+
+def export_layout_masks(layout_file: str, size, output_dir: str, encoding: str, region_masks: bool,
+                        cycle_masks: bool, workers: int):
+    """导出单个布局的合并mask、每个区域的二值mask和布局中各周期的二值mask，
+    各输出文件分发到进程池中并行写入，返回 (文件数, 网格点数, 耗时)
+    """
+    layout_size, regions = load_layout(layout_file)
+    rows, cols = size or layout_size or (None, None)
+    if rows is None:
+        raise ValueError("未指定点阵规格，请使用 --preset/--size 或在布局文件中给出")
+
+    stem = os.path.splitext(os.path.basename(layout_file))[0]
+    cycles = load_cycles(layout_file) if cycle_masks else None
+    labels, names = rasterize_regions(regions, rows, cols)
+    jobs = plan_exports(names, output_dir, stem, encoding, region_masks, cycles)
+
+    def progress(done: int, total: int, filename: str):
+        print(f"\r  {done}/{total}  {os.path.basename(filename):<40}", end="", file=sys.stderr, flush=True)
+
+    # 进度只在终端中逐行刷新显示
+    interactive = sys.stderr.isatty()
+    cells, elapsed = export_masks(labels, names, jobs, encoding, workers, progress if interactive else None)
+    if interactive:
+        print(file=sys.stderr)
+    return len(jobs), cells, elapsed
+
+def import_mask_file(mask_file: str, size, output_dir: str, encoding):
+    """从单个mask文件重建区域并保存为布局文件，返回 (mask文件, 输出文件, 区域数, 无法还原的网格数, 耗时)"""
+    start = time.perf_counter()
+    grid_size, regions, unmatched = import_mask(mask_file, size, encoding)
+
+    stem = os.path.basename(mask_file)
+    if stem.endswith(".gz"):
+        stem = stem[:-len(".gz")]
+    output_file = os.path.join(output_dir, os.path.splitext(stem)[0] + ".json")
+    save_layout(output_file, grid_size, regions)
+    return mask_file, output_file, len(regions), unmatched, time.perf_counter() - start
+
+def job_count(value: str) -> int:
+    """--jobs 参数：非负整数，0 表示CPU核数"""
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"并行进程数必须为整数: {value}")
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"并行进程数不能为负数: {value}")
+    return jobs or os.cpu_count() or 1
+
+def grid_size_arg(args):
+    """命令行指定的点阵规格，未指定时为None"""
+    if args.preset:
+        return CHIP_PRESETS[args.preset]
+    if args.size:
+        return parse_grid_size(args.size)
+    return None
+
+def run_export(args) -> int:
+    """批量导出mask"""
+    size = grid_size_arg(args)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.region_masks or args.cycle_masks:
+        return run_multi_export(args, size)
+    jobs = min(args.jobs, len(args.layouts))
+    start = time.perf_counter()
+    results = []
+    failures = 0
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(export_layout, layout_file, size, args.output_dir, args.encoding): layout_file
+            for layout_file in args.layouts
+        }
+        for future in as_completed(futures):
+            try:
+                layout_file, output_file, cells, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[失败] {futures[future]}: {e}", file=sys.stderr)
+                continue
+            results.append((layout_file, output_file, cells, elapsed))
+            print(f"[完成] {layout_file} -> {output_file}  {cells} 点  {elapsed:.3f}s")
+
+    total = time.perf_counter() - start
+    job_time = sum(result[3] for result in results)
+    print(f"\n共 {len(args.layouts)} 个布局，成功 {len(results)} 个，失败 {failures} 个")
+    print(f"并行任务数: {jobs}，总耗时: {total:.3f}s，单任务累计耗时: {job_time:.3f}s")
+    if results:
+        slowest = max(results, key=lambda result: result[3])
+        print(f"单任务平均: {job_time / len(results):.3f}s，最慢: {slowest[0]} ({slowest[3]:.3f}s)")
+    return 1 if failures else 0
+
+def run_multi_export(args, size) -> int:
+    """逐个布局导出多个mask文件，每个布局的输出文件由进程池并行写入"""
+    failures = 0
+    total_cells = 0
+    start = time.perf_counter()
+    for layout_file in args.layouts:
+        try:
+            files, cells, elapsed = export_layout_masks(layout_file, size, args.output_dir, args.encoding,
+                                                        args.region_masks, args.cycle_masks, args.jobs)
+        except Exception as e:
+            failures += 1
+            print(f"[失败] {layout_file}: {e}", file=sys.stderr)
+            continue
+        total_cells += cells
+        print(f"[完成] {layout_file}  {files} 个文件  {cells} 点  {elapsed:.3f}s  "
+              f"{cells / max(elapsed, 1e-9) / 1e6:.1f}M 点/s")
+
+    total = time.perf_counter() - start
+    print(f"\n共 {len(args.layouts)} 个布局，成功 {len(args.layouts) - failures} 个，失败 {failures} 个")
+    print(f"总耗时: {total:.3f}s，吞吐量: {total_cells / max(total, 1e-9) / 1e6:.1f}M 点/s")
+    return 1 if failures else 0
+
+def run_import(args) -> int:
+    """批量从mask文件重建区域布局"""
+    size = grid_size_arg(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = min(args.jobs, len(args.masks))
+    start = time.perf_counter()
+    imported = 0
+    failures = 0
+    inexact = 0
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(import_mask_file, mask_file, size, args.output_dir, args.encoding): mask_file
+            for mask_file in args.masks
+        }
+        for future in as_completed(futures):
+            try:
+                mask_file, output_file, count, unmatched, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[失败] {futures[future]}: {e}", file=sys.stderr)
+                continue
+            imported += 1
+            if unmatched:
+                inexact += 1
+                print(f"[不完整] {mask_file} -> {output_file}  {count} 个区域，{unmatched} 个网格无法还原")
+            elif args.verbose:
+                print(f"[完成] {mask_file} -> {output_file}  {count} 个区域  {elapsed:.3f}s")
+
+    total = time.perf_counter() - start
+    print(f"\n共 {len(args.masks)} 个mask，成功 {imported} 个（其中 {inexact} 个无法完整还原），失败 {failures} 个")
+    print(f"并行任务数: {jobs}，总耗时: {total:.3f}s")
+    return 1 if failures else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="点阵分割工具批量处理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="根据区域布局文件批量导出mask")
+    export_parser.add_argument("layouts", nargs="+", help="区域布局文件(JSON)")
+    size_group = export_parser.add_mutually_exclusive_group()
+    size_group.add_argument("--preset", choices=sorted(CHIP_PRESETS), help="预设芯片规格")
+    size_group.add_argument("--size", help="点阵规格，如 636x1080")
+    export_parser.add_argument("--output-dir", default=".", help="输出目录")
+    export_parser.add_argument("--encoding", choices=sorted(MASK_WRITERS), default="text",
+                               help="mask输出格式")
+    export_parser.add_argument("--region-masks", action="store_true",
+                               help="同时为每个区域导出二值mask（被该区域覆盖为1，否则为0）")
+    export_parser.add_argument("--cycle-masks", action="store_true",
+                               help="同时按布局文件的 cycles 字段为每个周期导出二值mask")
+    export_parser.add_argument("--jobs", type=job_count, default="0", help="并行进程数，0 或不指定时为CPU核数")
+    export_parser.set_defaults(func=run_export)
+
+    import_parser = subparsers.add_parser("import", help="从mask文件重建区域，批量保存为布局文件")
+    import_parser.add_argument("masks", nargs="+", help="mask文件")
+    size_group = import_parser.add_mutually_exclusive_group()
+    size_group.add_argument("--preset", choices=sorted(CHIP_PRESETS), help="预设芯片规格")
+    size_group.add_argument("--size", help="点阵规格，如 636x1080；文本mask未指定时按网格点数匹配预设规格")
+    import_parser.add_argument("--output-dir", default=".", help="布局文件输出目录")
+    import_parser.add_argument("--encoding", choices=sorted(MASK_READERS),
+                               help="mask格式，默认根据文件内容判断")
+    import_parser.add_argument("--jobs", type=job_count, default="0", help="并行进程数，0 或不指定时为CPU核数")
+    import_parser.add_argument("--verbose", action="store_true", help="逐个输出完成的文件")
+    import_parser.set_defaults(func=run_import)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Mask导出基准测试
+
+在src目录下运行: python -m benchmarks.export
+对比逐点检查的旧导出方式与标签栅格导出方式的耗时，同时统计各mask输出格式的耗时和文件大小；
+两者输出逐字节一致由 tests/test_export.py 校验
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.grid import Grid
+from core.mask_writer import MASK_WRITERS
+from core.geometry import Point
+from core.region import Region
+from core.region_manager import region_name
+
+def export_mask_per_point(grid: Grid, regions, filename: str):
+    """逐点检查的参考导出实现（原Grid.export_mask）"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for row in range(grid.rows):
+            for col in range(grid.cols):
+                covered = False
+                for region in regions.values():
+                    if region.is_placed and region.contains_point(Point(col, row)):
+                        f.write(f"{region.name.upper()}\n")
+                        covered = True
+                        break
+                if not covered:
+                    f.write(f"{0}\n")
+
+def make_regions(rows: int, cols: int, count: int, seed: int = 0):
+    """生成随机放置的区域，允许重叠和超出边界以覆盖边界情况"""
+    rng = random.Random(seed)
+    regions = {}
+    for i in range(count):
+        name = region_name(i)
+        region = Region(name, rng.randint(1, max(1, cols // 3)), rng.randint(1, max(1, rows // 3)))
+        region.set_position(Point(rng.randint(-5, cols) + rng.choice((0, 0.5)),
+                                  rng.randint(-5, rows) + rng.choice((0, 0.5))))
+        region.is_placed = rng.random() > 0.1
+        regions[name] = region
+    return regions
+
+def main():
+    parser = argparse.ArgumentParser(description="Mask导出基准测试")
+    parser.add_argument("--rows", type=int, default=318)
+    parser.add_argument("--cols", type=int, default=74)
+    parser.add_argument("--regions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    grid = Grid(args.rows, args.cols)
+    regions = make_regions(args.rows, args.cols, args.regions, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_file = os.path.join(tmp, "reference.txt")
+        raster_file = os.path.join(tmp, "raster.txt")
+
+        start = time.perf_counter()
+        export_mask_per_point(grid, regions, reference_file)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        grid.export_mask(regions, raster_file)
+        raster_time = time.perf_counter() - start
+
+        encoding_stats = []
+        for encoding in MASK_WRITERS:
+            encoded_file = os.path.join(tmp, f"mask.{encoding}")
+            start = time.perf_counter()
+            grid.export_mask(regions, encoded_file, encoding)
+            encoding_stats.append((encoding, time.perf_counter() - start, os.path.getsize(encoded_file)))
+
+    print(f"点阵 {args.rows}×{args.cols}, 区域 {len(regions)} 个")
+    print(f"逐点导出: {reference_time:.3f}s")
+    print(f"栅格导出: {raster_time:.3f}s")
+    for encoding, elapsed, size in encoding_stats:
+        print(f"  {encoding:<8} {elapsed:.3f}s  {size} 字节")
+
+if __name__ == "__main__":
+    main()
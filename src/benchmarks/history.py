@@ -0,0 +1,108 @@
+"""撤销/重做基准测试
+
+在src目录下运行: python -m benchmarks.history
+在680k点阵上模拟一段较长的编辑过程（无重叠地创建、逐步拖动、删除区域），
+统计撤销栈的记录数和内存估计，以及历史记录较短和较长时每一步撤销/重做的耗时，
+并校验全部撤销后回到初始状态、全部重做后回到最终状态
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.geometry import Point
+from core.grid import Grid
+from core.history import CreateRegion, DeleteRegion, SetRegionGeometry, UndoStack, region_geometry
+from core.layout import parse_grid_size
+from core.region import Region
+from core.region_manager import RegionManager
+
+def snapshot(manager: RegionManager, grid: Grid):
+    """区域和占用位图的状态，用于校验（区域重新加入时分配的标签可能不同，只比较是否占用）"""
+    return ({name: region_geometry(region) for name, region in manager.regions.items()},
+            dict(grid.footprints), (grid.occupancy != 0).tobytes())
+
+def simulate(manager: RegionManager, grid: Grid, history: UndoStack, edits: int, drag_steps: int, seed: int):
+    """随机执行edits次编辑，每次拖动由drag_steps步移动组成，只移动到空闲位置"""
+    rng = random.Random(seed)
+    for edit in range(edits):
+        names = list(manager.regions)
+        action = rng.random()
+        if not names or action < 0.3:
+            region = Region(f"r{edit}", rng.randint(5, 40), rng.randint(5, 40))
+            x, y = rng.randint(0, grid.cols - 40), rng.randint(0, grid.rows - 40)
+            if not grid.is_footprint_free(y, x, region.height, region.width):
+                continue
+            region.set_position(Point(x, y))
+            region.is_placed = True
+            manager.add_region(region)
+            grid.place_region(region)
+            history.push(CreateRegion(region))
+        elif action < 0.9:
+            region = manager.regions[rng.choice(names)]
+            for _ in range(drag_steps):
+                before = region_geometry(region)
+                x = min(max(0, before[0] + rng.randint(-3, 3)), grid.cols - region.width)
+                y = min(max(0, before[1] + rng.randint(-3, 3)), grid.rows - region.height)
+                if not grid.is_footprint_free(y, x, region.height, region.width, ignore=region.name):
+                    continue
+                manager.move_region(region.name, Point(x, y))
+                history.push(SetRegionGeometry(region.name, before, region_geometry(region),
+                                               merge_key=("drag", edit)))
+            grid.place_region(region)
+        else:
+            region = manager.regions[rng.choice(names)]
+            manager.remove_region(region.name)
+            grid.remove_region(region.name)
+            history.push(DeleteRegion(region))
+
+def step_times(func, count: int):
+    """执行count步，返回每步耗时（微秒）"""
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e6)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="撤销/重做基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--edits", nargs="+", type=int, default=[100, 5000])
+    parser.add_argument("--drag-steps", type=int, default=30, help="每次拖动的移动步数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    print(f"点阵 {rows}×{cols}，每次拖动 {args.drag_steps} 步")
+    for edits in args.edits:
+        manager, grid = RegionManager(), Grid(rows, cols)
+        history = UndoStack(max_entries=edits)
+        initial = snapshot(manager, grid)
+        start = time.perf_counter()
+        simulate(manager, grid, history, edits, args.drag_steps, args.seed)
+        edit_s = time.perf_counter() - start
+        final = snapshot(manager, grid)
+
+        entries = len(history)
+        undo = step_times(lambda: history.undo(manager, grid), entries)
+        undone = snapshot(manager, grid)
+        redo = step_times(lambda: history.redo(manager, grid), entries)
+        print(f"{edits:>6} 次编辑  编辑耗时 {edit_s:6.2f}s  记录 {entries} 条  "
+              f"内存估计 {history.nbytes / 1024:7.1f}KB  "
+              f"撤销 中位 {statistics.median(undo):6.1f}us 最大 {max(undo):7.1f}us  "
+              f"重做 中位 {statistics.median(redo):6.1f}us 最大 {max(redo):7.1f}us  "
+              f"校验 {'通过' if undone == initial and snapshot(manager, grid) == final else '失败'}")
+
+    # 记录数和内存上限：超过上限时丢弃最早的记录
+    manager, grid = RegionManager(), Grid(rows, cols)
+    history = UndoStack(max_entries=200, max_bytes=64 * 1024)
+    simulate(manager, grid, history, 2000, args.drag_steps, args.seed)
+    print(f"上限 200 条/64KB 时保留 {len(history)} 条记录，内存估计 {history.nbytes / 1024:.1f}KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""核心模块导入耗时基准测试
+
+在src目录下运行: python -m benchmarks.imports [--baseline <git版本>]
+每次在新的解释器进程中导入模块并计时，并确认导入核心模型后没有加载任何Qt模块。
+核心模型原先直接依赖PyQt6（QPointF/QRectF/QColor/pyqtSignal），导入时会一并加载QtCore和QtGui，
+因此以“先导入PyQt6再导入核心模型”作为原导入路径的对照；
+指定 --baseline 时还会从git取出该版本的 core 目录，直接测量其导入耗时作为改动前的对比
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_IMPORT = "import core.grid, core.region, core.region_manager"
+QT_IMPORT = "import PyQt6.QtCore, PyQt6.QtGui"
+
+# 待测的导入语句
+IMPORT_CASES = {
+    "numpy": "import numpy",
+    "PyQt6 (QtCore+QtGui)": QT_IMPORT,
+    "core": CORE_IMPORT,
+    "core + PyQt6 (原导入路径)": f"{QT_IMPORT}; {CORE_IMPORT}",
+    "gui": "import gui.main_window",
+}
+
+MEASURE_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, any(name.startswith('PyQt6') for name in sys.modules))
+"""
+
+def measure(statement: str, repeat: int, cwd: str = SRC_DIR):
+    """在新进程中重复导入，返回 (耗时列表, 是否加载了Qt)"""
+    timings = []
+    loaded_qt = False
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE_SCRIPT.format(statement=statement)],
+            cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        loaded_qt = loaded_qt or output[1] == "True"
+    return timings, loaded_qt
+
+def extract_core(revision: str, target: str):
+    """从git取出指定版本的 core 目录到target下"""
+    def git(*args) -> bytes:
+        return subprocess.run(["git", *args], cwd=SRC_DIR, capture_output=True, check=True).stdout
+
+    toplevel = git("rev-parse", "--show-toplevel").decode().strip()
+    prefix = git("rev-parse", "--show-prefix").decode().strip()
+    archive = git("-C", toplevel, "archive", "--format=tar", f"{revision}:{prefix}", "core")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+def report(label: str, timings, loaded_qt: bool) -> float:
+    median = statistics.median(timings) * 1000
+    print(f"{label:<26} 中位数 {median:8.1f}ms  "
+          f"最小 {min(timings) * 1000:8.1f}ms  加载Qt: {'是' if loaded_qt else '否'}")
+    return median
+
+def main():
+    parser = argparse.ArgumentParser(description="核心模块导入耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="对比的git版本（如核心模型去除PyQt6依赖之前的提交）")
+    args = parser.parse_args()
+
+    medians = {label: report(label, *measure(statement, args.repeat))
+               for label, statement in IMPORT_CASES.items()}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            extract_core(args.baseline, tmp)
+            medians["baseline"] = report(f"core ({args.baseline})", *measure(CORE_IMPORT, args.repeat, tmp))
+
+    core = medians["core"]
+    print(f"相对原导入路径节省       {medians['core + PyQt6 (原导入路径)'] - core:8.1f}ms")
+    if "baseline" in medians:
+        print(f"相对 {args.baseline} 节省 {medians['baseline'] - core:8.1f}ms")
+
+if __name__ == "__main__":
+    main()
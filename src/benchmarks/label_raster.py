@@ -0,0 +1,107 @@
+"""增量标签栅格基准测试
+
+在src目录下运行: python -m benchmarks.label_raster
+在680k点阵上放置矩形和多边形区域，随机执行添加、移动、删除操作：
+对比 RegionManager 增量更新标签栅格与每次用 rasterize_regions 重新栅格化的耗时，
+统计每次操作重绘的面积，并定期校验两者的导出结果（标签栅格和名称列表）完全一致
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import parse_grid_size
+from core.rasterizer import rasterize_regions
+from core.region import Region
+from core.region_manager import RegionManager
+
+def random_region(manager: RegionManager, rng: random.Random, rows: int, cols: int) -> Region:
+    """创建随机位置的矩形或三角形区域（允许重叠，用于检查重叠时的优先级）"""
+    width, height = rng.randint(1, 30), rng.randint(1, 30)
+    region = manager.create_region(width, height)
+    x, y = rng.randint(-5, cols - width + 5), rng.randint(-5, rows - height + 5)
+    if rng.random() < 0.3:
+        region.set_polygon([(x, y), (x + width, y + rng.choice((0, 0.5))), (x + rng.randint(0, width), y + height)])
+        manager.move_region(region.name, region.position)
+    else:
+        manager.move_region(region.name, Point(x, y))
+    return region
+
+def check(manager: RegionManager, rows: int, cols: int) -> bool:
+    labels, names = manager.export_labels()
+    expected, expected_names = rasterize_regions(manager.regions, rows, cols)
+    return names == expected_names and np.array_equal(labels, expected)
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="增量标签栅格基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--regions", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=2000, help="随机操作次数")
+    parser.add_argument("--check-every", type=int, default=200, help="每隔多少次操作校验一次")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    rng = random.Random(args.seed)
+    manager = RegionManager()
+    for _ in range(args.regions):
+        manager.set_placed(random_region(manager, rng, rows, cols).name)
+    dirty = []
+    manager.labels_changed.connect(lambda r0, r1, c0, c1: dirty.append((r1 - r0) * (c1 - c0)))
+
+    start = time.perf_counter()
+    manager.set_grid_size(rows, cols)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+    print(f"点阵 {rows}×{cols}，{len(manager.regions)} 个区域  初始绘制（含多边形首次栅格化） {rebuild_ms:7.1f}ms  "
+          f"结果一致: {'是' if check(manager, rows, cols) else '否'}")
+
+    incremental, failures = [], 0
+    dirty.clear()
+    for step in range(1, args.ops + 1):
+        names = list(manager.regions)
+        op = rng.random()
+        start = time.perf_counter()
+        if op < 0.6:
+            region = manager.regions[rng.choice(names)]
+            manager.move_region(region.name, Point(region.position.x() + rng.randint(-3, 3),
+                                                   region.position.y() + rng.randint(-3, 3)))
+        elif op < 0.8 and len(names) < manager.MAX_REGIONS:
+            region = random_region(manager, rng, rows, cols)
+            manager.set_placed(region.name)
+        else:
+            manager.remove_region(rng.choice(names))
+        incremental.append((time.perf_counter() - start) * 1000)
+        if step % args.check_every == 0:
+            failures += not check(manager, rows, cols)
+
+    start = time.perf_counter()
+    rasterize_regions(manager.regions, rows, cols)
+    full_ms = (time.perf_counter() - start) * 1000
+    print(f"{args.ops} 次操作  增量更新 中位 {statistics.median(incremental):6.3f}ms  "
+          f"最大 {max(incremental):6.2f}ms  重新栅格化 {full_ms:7.1f}ms/次")
+    print(f"每次操作重绘 中位 {statistics.median(dirty):.0f} 个网格（点阵共 {rows * cols} 个）  "
+          f"校验 {args.ops // args.check_every} 次，不一致 {failures} 次")
+
+    grid = Grid(rows, cols)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "mask.txt")
+        scratch_ms = min(timed(lambda: grid.export_mask(manager.regions, filename)) for _ in range(3))
+        reuse_ms = min(timed(lambda: grid.export_mask(manager.regions, filename,
+                                                      labels=manager.export_labels())) for _ in range(3))
+    print(f"导出  重新栅格化 {scratch_ms:7.1f}ms  使用标签栅格 {reuse_ms:7.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Mask导入基准测试
+
+在src目录下运行: python -m benchmarks.mask_import
+以随机放置（允许重叠和超出边界）的区域导出各格式的mask，
+对比逐行解析的参考实现与批量解析的耗时，并校验重建的区域重新导出后与原mask内容一致
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.export import make_regions
+from core.grid import Grid
+from core.layout import parse_grid_size
+from core.mask_import import import_mask, regions_from_labels
+from core.mask_reader import read_mask
+from core.mask_writer import MASK_WRITERS
+
+def read_text_mask_per_line(filename: str, rows: int, cols: int):
+    """逐行解析文本mask的参考实现"""
+    names = {}
+    labels = np.zeros((rows, cols), dtype=np.int64)
+    with open(filename, 'r', encoding='utf-8') as f:
+        for index, line in enumerate(f):
+            token = line.strip()
+            if token != "0":
+                labels[index // cols, index % cols] = names.setdefault(token, len(names) + 1)
+    return labels, list(names)
+
+def mask_tokens(labels: np.ndarray, names) -> np.ndarray:
+    """将标签栅格转换为名称栅格，便于比较标签编号不同的两个mask"""
+    return np.array(["0"] + list(names), dtype=object)[labels]
+
+def best_time(func, repeat: int) -> float:
+    """重复执行func，返回最短耗时（毫秒）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Mask导入基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--regions", type=int, default=26)
+    parser.add_argument("--seeds", type=int, default=5, help="校验使用的随机布局数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    grid = Grid(rows, cols)
+    with tempfile.TemporaryDirectory() as tmp:
+        regions = make_regions(rows, cols, args.regions)
+        text_file = os.path.join(tmp, "mask.txt")
+        grid.export_mask(regions, text_file)
+        baseline_ms = best_time(lambda: read_text_mask_per_line(text_file, rows, cols), 1)
+        print(f"点阵 {rows}×{cols}  逐行解析文本: {baseline_ms:8.1f}ms")
+
+        for encoding in MASK_WRITERS:
+            filename = os.path.join(tmp, "mask" + MASK_WRITERS[encoding].extension)
+            grid.export_mask(regions, filename, encoding)
+            read_ms = best_time(lambda: read_mask(filename, (rows, cols)), args.repeat)
+            labels, names = read_mask(filename, (rows, cols))
+            rebuild_ms = best_time(lambda: regions_from_labels(labels, names), args.repeat)
+            print(f"{encoding:<7} 读取 {read_ms:7.1f}ms  重建区域 {rebuild_ms:7.1f}ms  "
+                  f"相对逐行解析加速 {baseline_ms / read_ms:6.1f}x")
+
+        # 校验：重建的区域重新导出后，各格式的mask内容与原mask一致
+        failures = 0
+        for seed in range(args.seeds):
+            regions = make_regions(rows, cols, args.regions, seed)
+            for encoding in MASK_WRITERS:
+                filename = os.path.join(tmp, "mask" + MASK_WRITERS[encoding].extension)
+                grid.export_mask(regions, filename, encoding)
+                _, imported, unmatched = import_mask(filename, (rows, cols))
+                expected = mask_tokens(*read_mask(filename))
+                grid.export_mask(imported, filename, encoding)
+                if unmatched or not np.array_equal(mask_tokens(*read_mask(filename)), expected):
+                    failures += 1
+                    print(f"[不一致] 随机种子 {seed} 格式 {encoding}，无法还原 {unmatched} 个网格")
+        print(f"校验 {args.seeds} 个随机布局 × {len(MASK_WRITERS)} 种格式，不一致 {failures} 个")
+
+if __name__ == "__main__":
+    main()
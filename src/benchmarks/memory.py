@@ -0,0 +1,137 @@
+"""点阵存储内存占用基准测试
+
+在src目录下运行: python -m benchmarks.memory
+分别以旧的float64内存存储、uint8内存存储和uint8 memmap磁盘存储创建680k、10M、100M网格的点阵，
+依次写入点阵数据（np.zeros按需分配，写入后才真正占用内存）、放置区域、创建导出用的标签栅格、读取一个视口、
+生成多分辨率金字塔（会扫描整个点阵）并导出mask，
+记录每一步之后进程的匿名内存（RssAnon，不可回收）和文件映射内存（RssFile，可由系统回收）。
+每种配置在独立的子进程中运行，互不影响
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import parse_grid_size
+from core.pyramid import GridPyramid
+from core.region import Region
+from core.region_manager import RegionManager
+
+SIZES = {"680k": "680k", "10M": "2500x4000", "100M": "10000x10000"}
+BACKENDS = ("float64", "uint8", "memmap")
+VIEWPORT = (800, 1280)  # 读取的视口大小（行, 列）
+
+def memory_status():
+    """返回当前进程的 (RssAnon, RssFile, VmHWM)，单位MB，不支持时为None"""
+    values = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("RssAnon", "RssFile", "VmHWM"):
+                    values[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return None, None, None
+    return values.get("RssAnon"), values.get("RssFile"), values.get("VmHWM")
+
+def make_regions(rows: int, cols: int, count: int = 200):
+    """在点阵上均匀排列count个互不重叠的区域"""
+    per_row = int(count ** 0.5) + 1
+    step_y, step_x = rows // per_row, cols // per_row
+    regions = {}
+    for i in range(count):
+        region = Region(f"r{i}", max(1, step_x // 2), max(1, step_y // 2))
+        region.set_position(Point((i % per_row) * step_x, (i // per_row) * step_y))
+        region.is_placed = True
+        regions[region.name] = region
+    return regions
+
+def run_child(size: str, backend: str):
+    """在子进程中执行各步骤，以JSON输出每步之后的内存占用"""
+    rows, cols = parse_grid_size(SIZES[size])
+    stages = []
+
+    def record(stage: str, start: float):
+        anon, file, _ = memory_status()
+        stages.append({"stage": stage, "seconds": round(time.perf_counter() - start, 3),
+                       "rss_anon_mb": anon, "rss_file_mb": file})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        if backend == "memmap":
+            grid = Grid(rows, cols, storage_dir=os.path.join(tmp, "grid"))
+        else:
+            grid = Grid(rows, cols, dtype=np.dtype(backend))
+        record("创建", start)
+
+        start = time.perf_counter()
+        grid.points[:] = (np.arange(cols) % 3 == 0)
+        record("写入点阵", start)
+
+        start = time.perf_counter()
+        regions = make_regions(rows, cols)
+        for region in regions.values():
+            grid.place_region(region)
+        record("放置区域", start)
+
+        start = time.perf_counter()
+        manager = RegionManager()
+        manager.add_regions(regions.values())
+        manager.set_grid_size(rows, cols, grid.storage_dir)
+        record("标签栅格", start)
+
+        start = time.perf_counter()
+        view_rows, view_cols = min(rows, VIEWPORT[0]), min(cols, VIEWPORT[1])
+        top, left = (rows - view_rows) // 2, (cols - view_cols) // 2
+        # 只访问视口范围，memmap存储只会读入这部分页
+        np.count_nonzero(grid.get_window(top, top + view_rows, left, left + view_cols))
+        np.count_nonzero(grid.occupancy[top:top + view_rows, left:left + view_cols])
+        record("读取视口", start)
+
+        start = time.perf_counter()
+        GridPyramid(grid)
+        record("生成金字塔", start)
+
+        start = time.perf_counter()
+        grid.export_mask(regions, os.path.join(tmp, "mask.bin"), "binary")
+        record("导出", start)
+
+        print(json.dumps({"size": size, "backend": backend, "cells": rows * cols,
+                          "nbytes_mb": grid.nbytes / 2**20, "peak_mb": memory_status()[2],
+                          "stages": stages}, ensure_ascii=False))
+
+def main():
+    parser = argparse.ArgumentParser(description="点阵存储内存占用基准测试")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--child", nargs=2, metavar=("SIZE", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for size in args.sizes:
+        for backend in args.backends:
+            output = subprocess.run([sys.executable, "-m", "benchmarks.memory", "--child", size, backend],
+                                    capture_output=True, text=True, cwd=src_dir)
+            if output.returncode != 0:
+                print(f"{size:<5} {backend:<8} 失败: {output.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(output.stdout)
+            print(f"{size:<5} {backend:<8} 数组 {result['nbytes_mb']:8.1f}MB  峰值 {result['peak_mb'] or 0:8.1f}MB")
+            for stage in result["stages"]:
+                print(f"      {stage['stage']:<6} {stage['seconds']:7.3f}s  "
+                      f"匿名 {stage['rss_anon_mb'] or 0:8.1f}MB  文件映射 {stage['rss_file_mb'] or 0:8.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""多文件mask导出基准测试
+
+在src目录下运行: python -m benchmarks.multi_export
+在680k点阵上随机放置区域，导出合并的mask、每个区域的二值mask和每个周期的二值mask，
+对比单进程与进程池（标签栅格放在共享内存中）的耗时和吞吐量（网格点/秒），
+并读回部分输出文件，校验与标签栅格一致
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.geometry import Point
+from core.layout import parse_grid_size
+from core.mask_export import export_masks, plan_exports
+from core.mask_reader import read_mask
+from core.rasterizer import rasterize_regions
+from core.region import Region
+from core.region_manager import region_name
+
+def random_regions(count: int, rows: int, cols: int, seed: int):
+    rng = random.Random(seed)
+    regions = {}
+    for i in range(count):
+        region = Region(region_name(i), rng.randint(5, 80), rng.randint(5, 80))
+        region.set_position(Point(rng.randint(0, cols - region.width), rng.randint(0, rows - region.height)))
+        region.is_placed = True
+        regions[region.name] = region
+    return regions
+
+def verify(labels: np.ndarray, names, jobs, samples: int, rng: random.Random) -> int:
+    """读回合并的mask和随机抽取的二值mask，返回不一致的文件数"""
+    mismatches = 0
+    for filename, selected in [jobs[0]] + rng.sample(jobs[1:], min(samples, len(jobs) - 1)):
+        read_labels, read_names = read_mask(filename, labels.shape)
+        if selected is None:
+            # 读回的名称为大写，且文本格式中不包含完全被遮挡的区域，按名称比较每个网格点
+            expected = np.array(["0"] + [name.upper() for name in names])[labels]
+            read_labels = np.array(["0"] + read_names)[read_labels]
+        else:
+            expected = np.isin(labels, selected).view(np.uint8)
+        mismatches += not np.array_equal(read_labels, expected)
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="多文件mask导出基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--regions", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=8, help="周期数，每个周期随机涉及一半的区域")
+    parser.add_argument("--encodings", nargs="+", default=["text", "binary", "rle"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--verify", type=int, default=10, help="每次读回校验的二值mask数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    rng = random.Random(args.seed)
+    regions = random_regions(args.regions, rows, cols, args.seed)
+    labels, names = rasterize_regions(regions, rows, cols)
+    cycles = [rng.sample(names, len(names) // 2) for _ in range(args.cycles)]
+    print(f"点阵 {rows}×{cols}，{len(names)} 个区域，{args.cycles} 个周期，CPU {os.cpu_count()} 核")
+
+    for encoding in args.encodings:
+        for workers in sorted(set(args.workers)):
+            with tempfile.TemporaryDirectory() as tmp:
+                jobs = plan_exports(names, tmp, "mask", encoding, cycles=cycles)
+                cells, elapsed = export_masks(labels, names, jobs, encoding, workers)
+                size = sum(os.path.getsize(filename) for filename, _ in jobs)
+                mismatches = verify(labels, names, jobs, args.verify, rng)
+            print(f"{encoding:<7} {workers:>2} 个进程  {len(jobs)} 个文件  {elapsed:6.2f}s  "
+                  f"{cells / elapsed / 1e6:7.1f}M 点/s  {size / 1e6:8.1f}MB  不一致 {mismatches} 个")
+
+if __name__ == "__main__":
+    main()
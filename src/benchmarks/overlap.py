@@ -0,0 +1,119 @@
+"""拖动时重叠检测的基准测试
+
+在src目录下运行: python -m benchmarks.overlap
+在680k点阵上放置不同数量的小区域，模拟拖动其中一个区域，
+对比线性扫描与空间索引两种重叠检测方式每次查询的耗时，并校验结果一致；
+同时测量拖动时求冲突网格掩码的耗时，以及排序扫描与逐对比较两种方式找出全部重叠区域对的耗时
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.geometry import Point
+from core.grid import CHIP_PRESETS
+from core.region import Region
+from core.region_manager import RegionManager
+
+def find_overlaps_pairwise(manager: RegionManager):
+    """逐对比较的参考实现"""
+    placed = [region for region in manager.regions.values() if region.is_placed]
+    return [(a.name, b.name) for i, a in enumerate(placed) for b in placed[i + 1:] if a.intersects_with(b)]
+
+def check_overlap_linear(manager: RegionManager, region: Region) -> bool:
+    """线性扫描的参考实现（原RegionManager.check_overlap）"""
+    for existing_region in manager.regions.values():
+        if existing_region != region and existing_region.is_placed:
+            if region.intersects_with(existing_region):
+                return True
+    return False
+
+def build_manager(count: int, rows: int, cols: int, seed: int, polygons: bool = False) -> RegionManager:
+    """创建包含count个随机放置小区域的管理器，polygons为True时每隔一个区域为三角形"""
+    rng = random.Random(seed)
+    manager = RegionManager()
+    for i in range(count):
+        region = Region(f"r{i}", rng.randint(2, 12), rng.randint(2, 12))
+        region.set_position(Point(rng.randint(0, cols - region.width), rng.randint(0, rows - region.height)))
+        if polygons and i % 2:
+            x, y = region.position.x(), region.position.y()
+            region.set_polygon([(x, y), (x + region.width, y), (x, y + region.height)])
+        region.is_placed = True
+        manager.add_region(region)
+    return manager
+
+def drag_path(rows: int, cols: int, steps: int, seed: int):
+    """生成模拟拖动的鼠标轨迹（网格坐标）"""
+    rng = random.Random(seed)
+    x, y = cols / 2, rows / 2
+    path = []
+    for _ in range(steps):
+        x = min(cols - 1, max(0, x + rng.randint(-3, 3)))
+        y = min(rows - 1, max(0, y + rng.randint(-3, 3)))
+        path.append(Point(int(x), int(y)))
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="拖动时重叠检测的基准测试")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = CHIP_PRESETS["680k"]
+    path = drag_path(rows, cols, args.steps, args.seed)
+
+    for count in args.counts:
+        manager = build_manager(count, rows, cols, args.seed)
+        dragged = manager.regions["r0"]
+
+        start = time.perf_counter()
+        linear_results = []
+        for pos in path:
+            manager.move_region(dragged.name, pos)
+            linear_results.append(check_overlap_linear(manager, dragged))
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_results = []
+        for pos in path:
+            manager.move_region(dragged.name, pos)
+            index_results.append(manager.check_overlap(dragged))
+        index_time = time.perf_counter() - start
+
+        print(f"{count:>6} 个区域  线性扫描 {linear_time / len(path) * 1e6:8.1f}µs/次  "
+              f"空间索引 {index_time / len(path) * 1e6:8.1f}µs/次  "
+              f"结果一致: {'是' if linear_results == index_results else '否'}")
+
+    # 冲突网格：在区域密集的点阵中拖动矩形和三角形，每步求出与其他区域冲突的网格
+    for count in args.counts:
+        manager = build_manager(count, 200, 200, args.seed, polygons=True)
+        for name in ("r0", "r1"):
+            dragged = manager.regions[name]
+            elapsed, cells = 0.0, 0
+            for pos in drag_path(200 - 12, 200 - 12, args.steps, args.seed):
+                manager.move_region(name, pos)
+                start = time.perf_counter()
+                cells += int(manager.conflict_mask(dragged)[2].sum())
+                elapsed += time.perf_counter() - start
+            kind = "三角形" if dragged.is_polygon else "矩形"
+            print(f"{count:>6} 个区域  拖动{kind:<3} 冲突掩码 {elapsed / args.steps * 1e6:8.1f}µs/次  "
+                  f"平均冲突 {cells / args.steps:6.1f} 个网格")
+
+    # 全部重叠区域对：排序扫描与逐对比较
+    for count in args.counts:
+        manager = build_manager(count, rows // 8, cols // 8, args.seed, polygons=True)
+        start = time.perf_counter()
+        sweep = manager.find_overlaps()
+        sweep_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pairwise = find_overlaps_pairwise(manager)
+        pairwise_time = time.perf_counter() - start
+        print(f"{count:>6} 个区域  重叠区域对 {len(sweep):>6}  排序扫描 {sweep_time * 1000:8.1f}ms  "
+              f"逐对比较 {pairwise_time * 1000:8.1f}ms  结果一致: {'是' if sweep == pairwise else '否'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""自动排布基准测试
+
+在src目录下运行: python -m benchmarks.packing
+在680k点阵上排布随机尺寸的区域，统计各策略的耗时、放置数量和覆盖率，并校验结果无重叠
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.grid import CHIP_PRESETS
+from core.packing import PACKING_STRATEGIES, pack_rectangles
+
+def verify(sizes, positions, rows: int, cols: int) -> bool:
+    """校验排布结果在点阵范围内且互不重叠"""
+    occupied = np.zeros((rows, cols), dtype=bool)
+    for (width, height), position in zip(sizes, positions):
+        if position is None:
+            continue
+        row, col = position
+        if row < 0 or col < 0 or row + height > rows or col + width > cols:
+            return False
+        if occupied[row:row + height, col:col + width].any():
+            return False
+        occupied[row:row + height, col:col + width] = True
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="自动排布基准测试")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--min-size", type=int, default=3)
+    parser.add_argument("--max-size", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = CHIP_PRESETS["680k"]
+    rng = random.Random(args.seed)
+    sizes = [(rng.randint(args.min_size, args.max_size), rng.randint(args.min_size, args.max_size))
+             for _ in range(args.count)]
+
+    for strategy in PACKING_STRATEGIES:
+        start = time.perf_counter()
+        positions = pack_rectangles(sizes, np.zeros((rows, cols), dtype=bool), strategy)
+        elapsed = time.perf_counter() - start
+
+        placed = [size for size, position in zip(sizes, positions) if position is not None]
+        coverage = sum(width * height for width, height in placed) / (rows * cols)
+        print(f"{strategy:<10} {elapsed:.3f}s  放置 {len(placed)}/{len(sizes)}  "
+              f"覆盖率 {coverage:.1%}  无重叠: {'是' if verify(sizes, positions, rows, cols) else '否'}")
+
+if __name__ == "__main__":
+    main()
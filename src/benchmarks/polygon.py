@@ -0,0 +1,143 @@
+"""多边形区域基准测试
+
+在src目录下运行: python -m benchmarks.polygon
+在680k点阵上无重叠地放置一组随机多边形，与同样位置的外接矩形区域对比
+栅格化（首次和命中缓存）、放置到占用位图、拖动时的重叠检测、点击命中和导出的耗时，
+并用逐点判断的参考实现校验扫描线栅格化的结果
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import parse_grid_size
+from core.rasterizer import polygon_mask
+from core.region import Region
+from core.region_manager import RegionManager, region_name
+
+def point_in_polygon(x: float, y: float, vertices, closed: bool) -> bool:
+    """逐点判断的参考实现：奇偶规则，closed为True时边界上的点也算在内"""
+    inside = False
+    for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1]):
+        if closed and abs((x1 - x0) * (y - y0) - (y1 - y0) * (x - x0)) < 1e-9 \
+                and min(x0, x1) <= x <= max(x0, x1) and min(y0, y1) <= y <= max(y0, y1):
+            return True
+        if (y0 <= y) != (y1 <= y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+def random_polygon(rng: random.Random, radius: int):
+    """以原点为中心的随机星形多边形（可能凹），顶点为整数坐标"""
+    count = rng.randint(3, 12)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(count))
+    return [(round(math.cos(a) * rng.uniform(radius * 0.4, radius)),
+             round(math.sin(a) * rng.uniform(radius * 0.4, radius))) for a in angles]
+
+def verify(rng: random.Random, trials: int) -> int:
+    """与参考实现逐点比较，返回不一致的网格数"""
+    mismatches = 0
+    for _ in range(trials):
+        vertices = [(x + 20 + rng.choice((0, 0.5)), y + 20 + rng.choice((0, 0.5)))
+                    for x, y in random_polygon(rng, 15)]
+        for closed in (True, False):
+            start_row, start_col, mask = polygon_mask(*zip(*vertices), closed=closed)
+            offset = 0 if closed else 0.5
+            for row in range(45):
+                for col in range(45):
+                    inside = 0 <= row - start_row < mask.shape[0] and 0 <= col - start_col < mask.shape[1] \
+                        and mask[row - start_row, col - start_col]
+                    if closed or not any(abs((x1 - x0) * (row + offset - y0) - (y1 - y0) * (col + offset - x0)) < 1e-9
+                                         for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1])):
+                        # 网格中心恰好落在边上时由左闭右开规则决定归属，参考实现不比较这些网格
+                        mismatches += inside != point_in_polygon(col + offset, row + offset, vertices, closed)
+    return mismatches
+
+def place_polygons(grid: Grid, count: int, radius: int, seed: int):
+    """无重叠地随机放置最多count个多边形，返回 (多边形区域字典, 同位置的外接矩形区域字典)"""
+    rng = random.Random(seed)
+    manager = RegionManager()
+    polygons, rects = {}, {}
+    for _ in range(count * 20):
+        if len(polygons) == count:
+            break
+        cx, cy = rng.randint(radius, grid.cols - radius), rng.randint(radius, grid.rows - radius)
+        region = Region(region_name(len(polygons)), 0, 0)
+        region.set_polygon([(cx + x, cy + y) for x, y in random_polygon(rng, radius)])
+        if not region.is_polygon or not region.is_valid_position(grid.cols, grid.rows) \
+                or manager.check_overlap(region):
+            continue
+        region.is_placed = True
+        manager.add_region(region)
+        polygons[region.name] = region
+        rect = Region(region.name, region.width, region.height)
+        rect.set_position(region.position)
+        rect.is_placed = True
+        rects[rect.name] = rect
+    return manager, polygons, rects
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="多边形区域基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--regions", type=int, default=1000)
+    parser.add_argument("--radius", type=int, default=12, help="多边形的最大半径（网格数）")
+    parser.add_argument("--steps", type=int, default=2000, help="模拟拖动的步数")
+    parser.add_argument("--verify", type=int, default=50, help="校验使用的随机多边形数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    grid = Grid(rows, cols)
+    manager, polygons, rects = place_polygons(grid, args.regions, args.radius, args.seed)
+    print(f"点阵 {rows}×{cols}，{len(polygons)} 个多边形")
+
+    # 栅格化：首次计算与命中缓存，整数平移后仍命中缓存
+    for region in polygons.values():
+        region._masks.clear()
+    cold_ms = timed(lambda: [region.cell_mask() and region.footprint_mask() for region in polygons.values()])
+    warm_ms = timed(lambda: [region.cell_mask() and region.footprint_mask() for region in polygons.values()])
+    print(f"栅格化  首次 {cold_ms:7.1f}ms  命中缓存 {warm_ms:6.2f}ms")
+
+    for name, regions in (("多边形", polygons), ("外接矩形", rects)):
+        grid = Grid(rows, cols)
+        place_ms = timed(lambda: [grid.place_region(region) for region in regions.values()])
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "mask.txt")
+            export_ms = min(timed(lambda: grid.export_mask(regions, filename)) for _ in range(3))
+        print(f"{name:<6} 放置 {place_ms:7.1f}ms  导出 {export_ms:7.1f}ms")
+
+    # 拖动：一个多边形沿随机轨迹按整数格移动，每步检查重叠并命中测试
+    rng = random.Random(args.seed)
+    region = next(iter(polygons.values()))
+    overlap, hit = [], []
+    for _ in range(args.steps):
+        x = min(max(0, region.position.x() + rng.randint(-3, 3)), cols - region.width)
+        y = min(max(0, region.position.y() + rng.randint(-3, 3)), rows - region.height)
+        manager.move_region(region.name, Point(x, y))
+        start = time.perf_counter()
+        manager.check_overlap(region)
+        overlap.append((time.perf_counter() - start) * 1e6)
+        point = Point(x + region.width / 2, y + region.height / 2)
+        start = time.perf_counter()
+        manager.region_at(point)
+        hit.append((time.perf_counter() - start) * 1e6)
+    print(f"拖动 {args.steps} 步  重叠检测 中位 {statistics.median(overlap):6.1f}us  "
+          f"点击命中 中位 {statistics.median(hit):6.1f}us")
+
+    mismatches = verify(random.Random(args.seed), args.verify)
+    print(f"校验 {args.verify} 个随机多边形，与逐点判断不一致 {mismatches} 个网格")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""项目文件保存/加载基准测试
+
+在src目录下运行: python -m benchmarks.project
+在680k点阵上放置不同数量的区域，分别测量二进制项目文件的保存、加载（点阵数据按需映射）、
+加载后读取全部点阵数据，以及写入和读取JSON附属文件的耗时和文件大小
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import load_layout, parse_grid_size
+from core.project import load_project, save_project, sidecar_filename, write_sidecar
+from core.region import Region
+
+def make_project(rows: int, cols: int, count: int):
+    """生成随机点阵数据和count个均匀排列的区域"""
+    grid = Grid(rows, cols)
+    grid.points[:] = np.random.default_rng(0).random((rows, cols)) < 0.3
+    per_row = int(count ** 0.5) + 1
+    step_y, step_x = max(1, rows // per_row), max(1, cols // per_row)
+    regions = {}
+    for i in range(count):
+        region = Region(f"r{i}", max(1, step_x // 2), max(1, step_y // 2))
+        region.set_position(Point((i % per_row) * step_x, (i // per_row) * step_y))
+        region.color = (i % 256, 100, 200, 100)
+        region.is_placed = True
+        regions[region.name] = region
+    return grid, regions
+
+def best_time(func, repeat: int) -> float:
+    """重复执行func，返回最短耗时（毫秒）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="项目文件保存/加载基准测试")
+    parser.add_argument("--size", default="680k", help="点阵规格，如 680k 或 636x1080")
+    parser.add_argument("--regions", nargs="+", type=int, default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows, cols = parse_grid_size(args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "project.maskproj")
+        sidecar = sidecar_filename(filename)
+        print(f"点阵 {rows}×{cols}")
+        for count in args.regions:
+            grid, regions = make_project(rows, cols, count)
+            save_ms = best_time(lambda: save_project(filename, grid, regions), args.repeat)
+            load_ms = best_time(lambda: load_project(filename), args.repeat)
+            touch_ms = best_time(lambda: int(load_project(filename)[0].points.sum()), args.repeat)
+            sidecar_ms = best_time(lambda: write_sidecar(sidecar, grid, regions), args.repeat)
+            layout_ms = best_time(lambda: load_layout(sidecar), args.repeat)
+
+            loaded_grid, loaded_regions = load_project(filename)
+            assert np.array_equal(loaded_grid.points, grid.points)
+            assert [(r.name, r.get_rect(), r.points, r.color, r.is_placed) for r in loaded_regions.values()] == \
+                   [(r.name, r.get_rect(), r.points, r.color, r.is_placed) for r in regions.values()]
+
+            print(f"{count:>6} 个区域  保存 {save_ms:7.2f}ms  加载 {load_ms:7.2f}ms  "
+                  f"加载并读取点阵 {touch_ms:7.2f}ms  文件 {os.path.getsize(filename) / 1024:8.1f}KB")
+            print(f"{'':>6}          JSON写入 {sidecar_ms:7.2f}ms  JSON读取 {layout_ms:7.2f}ms  "
+                  f"JSON {os.path.getsize(sidecar) / 1024:8.1f}KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""区域列表面板基准测试
+
+在src目录下运行: python -m benchmarks.region_panel
+在离屏模式(QT_QPA_PLATFORM=offscreen)下，对比每个区域一组按钮控件的旧面板与 QListView 面板：
+逐个添加和批量添加区域、完成布局并显示、滚动到底部、逐字输入过滤文本以及删除全部区域的耗时
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QScrollArea)
+from core.region import Region
+from core.region_manager import RegionManager, region_name
+from gui.region_control_panel import RegionControlPanel
+
+class WidgetRegionPanel(QScrollArea):
+    """每个区域一组按钮控件的参考实现（原RegionControlPanel的区域列表）"""
+    def __init__(self, manager: RegionManager):
+        super().__init__()
+        self.setWidgetResizable(True)
+        self.container = QWidget()
+        self.container_layout = QVBoxLayout(self.container)
+        self.setWidget(self.container)
+        self.setFixedSize(150, 600)
+        self.region_buttons = {}
+        manager.region_added.connect(self.add_region)
+        manager.region_removed.connect(self.remove_region)
+        manager.regions_added.connect(lambda names: [self.add_region(name) for name in names])
+        manager.regions_removed.connect(lambda names: [self.remove_region(name) for name in names])
+
+    def add_region(self, name: str):
+        button_widget = QWidget()
+        layout = QHBoxLayout(button_widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        select_btn = QPushButton(name.upper())
+        select_btn.setFixedHeight(30)
+        delete_btn = QPushButton("×")
+        delete_btn.setFixedSize(30, 30)
+        layout.addWidget(select_btn)
+        layout.addWidget(delete_btn)
+        self.region_buttons[name] = button_widget
+        self.container_layout.addWidget(button_widget)
+
+    def remove_region(self, name: str):
+        button_widget = self.region_buttons.pop(name)
+        self.container_layout.removeWidget(button_widget)
+        button_widget.deleteLater()
+
+    def scroll_to_end(self):
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+class ListRegionPanel(RegionControlPanel):
+    def __init__(self, manager: RegionManager):
+        super().__init__(manager)
+        self.setFixedSize(150, 600)
+
+    def scroll_to_end(self):
+        self.list_view.scrollToBottom()
+
+def make_regions(count: int):
+    regions = []
+    for i in range(count):
+        region = Region(region_name(i), 10, 10)
+        region.is_placed = True
+        regions.append(region)
+    return regions
+
+def timed(app: QApplication, func) -> float:
+    """执行func并处理完由此产生的布局和绘制事件，返回耗时（毫秒）"""
+    start = time.perf_counter()
+    func()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+def run(app: QApplication, panel_type, count: int, batched: bool):
+    manager = RegionManager()
+    panel = panel_type(manager)
+    panel.show()
+    app.processEvents()
+    regions = make_regions(count)
+    if batched:
+        add_ms = timed(app, lambda: manager.add_regions(regions))
+    else:
+        add_ms = timed(app, lambda: [manager.add_region(region) for region in regions])
+    scroll_ms = timed(app, panel.scroll_to_end)
+    filter_ms = None
+    if isinstance(panel, RegionControlPanel):
+        def type_filter():
+            for text in ("a", "ab", "abc", "ab", "a", ""):
+                panel.search_edit.setText(text)
+                app.processEvents()
+        filter_ms = timed(app, type_filter)
+    if batched:
+        remove_ms = timed(app, lambda: manager.remove_regions(list(manager.regions)))
+    else:
+        remove_ms = timed(app, lambda: [manager.remove_region(name) for name in list(manager.regions)])
+    panel.close()
+    panel.deleteLater()
+    app.processEvents()
+    return add_ms, scroll_ms, filter_ms, remove_ms
+
+def main():
+    parser = argparse.ArgumentParser(description="区域列表面板基准测试")
+    parser.add_argument("--counts", nargs="+", type=int, default=[26, 1000, 5000])
+    parser.add_argument("--max-widget-count", type=int, default=1000, help="按钮控件面板测试的最大区域数")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for count in args.counts:
+        for panel_type in (WidgetRegionPanel, ListRegionPanel):
+            if panel_type is WidgetRegionPanel and count > args.max_widget_count:
+                continue
+            for batched in (False, True):
+                add_ms, scroll_ms, filter_ms, remove_ms = run(app, panel_type, count, batched)
+                filter_text = f"{filter_ms:8.1f}ms" if filter_ms is not None else "       -  "
+                print(f"{count:>6} 个区域  {panel_type.__name__:<18} {'批量' if batched else '逐个'}  "
+                      f"添加 {add_ms:8.1f}ms  滚动 {scroll_ms:7.1f}ms  过滤 {filter_text}  删除 {remove_ms:8.1f}ms")
+
+if __name__ == "__main__":
+    main()
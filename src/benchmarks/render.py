@@ -0,0 +1,242 @@
+"""GridView渲染与交互基准测试
+
+在src目录下运行: python -m benchmarks.render --output render.json
+在离屏模式(QT_QPA_PLATFORM=offscreen)下驱动GridView，覆盖23k/680k预设（也可指定 行x列 的自定义规格）、
+所有缩放级别和不同区域数量，记录paintEvent耗时、拖动区域和平移视图时每步的耗时与重绘面积以及导出耗时，
+结果写入JSON文件；使用 --compare 可与之前的结果逐项对比
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtCore import Qt, QEvent, QPointF, PYQT_VERSION_STR, QT_VERSION_STR
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import parse_grid_size
+from core.packing import pack_rectangles
+from core.region import Region
+from core.trace import tracer
+from gui.grid_view import GridView
+
+def populate(view: GridView, count: int, seed: int):
+    """在点阵上自动排布count个区域"""
+    sizes = [(8 + (i * 7 + seed) % 17, 8 + (i * 11 + seed) % 13) for i in range(count)]
+    positions = pack_rectangles(sizes, view.grid.occupancy != 0)
+    manager = view.region_manager
+    for i, ((width, height), position) in enumerate(zip(sizes, positions)):
+        if position is None:
+            continue
+        region = Region(f"r{i}", width, height)
+        region.set_position(Point(position[1], position[0]))
+        region.is_placed = True
+        manager.add_region(region)
+        view.grid.place_region(region)
+
+def mouse_event(event_type, pos: QPointF) -> QMouseEvent:
+    button = Qt.MouseButton.LeftButton
+    return QMouseEvent(event_type, pos, pos, button, button, Qt.KeyboardModifier.NoModifier)
+
+def measure_paint(view: GridView, repeat: int):
+    """返回 (首帧耗时, 后续帧耗时中位数)，单位毫秒，首帧在清空图块缓存后绘制"""
+    view.tile_cache.clear()
+    timings = []
+    for _ in range(repeat + 1):
+        view.repaint()
+        timings.append(view.last_frame_time * 1000)
+    return timings[0], statistics.median(timings[1:])
+
+def repaint_area(view: GridView) -> int:
+    """上一帧实际重绘的面积（像素）"""
+    return view.last_repaint_area
+
+def flush_updates(view: GridView):
+    """处理挂起的重绘请求，返回实际重绘的面积（像素），没有重绘时为0"""
+    view.last_repaint_area = 0
+    QApplication.processEvents()
+    return repaint_area(view)
+
+def measure_drag(view: GridView, steps: int):
+    """模拟拖动一个新区域，返回 (每次mouseMoveEvent耗时中位数, 含重绘的每步耗时中位数, 每步重绘面积中位数)，
+    耗时单位为毫秒，重绘只处理mouseMoveEvent提交的脏区域"""
+    region = Region("drag", 10, 10)
+    view.region_manager.add_region(region)
+    view.region_manager.move_region(region.name, Point(0, 0))
+    view.dragging_region = region
+
+    start = view.grid_to_screen(Point(5, 5))
+    # 每步至少移动一个网格，保证每次mouseMoveEvent都会产生重绘
+    step_pixels = max(1, math.ceil(view.current_cell_size))
+    move_times, frame_times, areas = [], [], []
+    view.mousePressEvent(mouse_event(QEvent.Type.MouseButtonPress, start))
+    flush_updates(view)
+    for step in range(steps):
+        pos = QPointF(start.x() + (step % 50) * step_pixels, start.y() + (step // 50) * step_pixels)
+        t0 = time.perf_counter()
+        view.mouseMoveEvent(mouse_event(QEvent.Type.MouseMove, pos))
+        t1 = time.perf_counter()
+        areas.append(flush_updates(view))
+        t2 = time.perf_counter()
+        move_times.append((t1 - t0) * 1000)
+        frame_times.append((t2 - t0) * 1000)
+
+    view.dragging_region = None
+    view.delete_region(region.name)
+    flush_updates(view)
+    return statistics.median(move_times), statistics.median(frame_times), statistics.median(areas)
+
+def measure_pan(view: GridView, steps: int):
+    """模拟按住中键平移视图，返回 (含重绘的每步耗时中位数, 每步重绘面积中位数)，耗时单位为毫秒"""
+    middle = Qt.MouseButton.MiddleButton
+    def event(event_type, pos):
+        return QMouseEvent(event_type, pos, pos, middle, middle, Qt.KeyboardModifier.NoModifier)
+
+    pos = QPointF(view.width() / 2, view.height() / 2)
+    frame_times, areas = [], []
+    view.mousePressEvent(event(QEvent.Type.MouseButtonPress, pos))
+    flush_updates(view)
+    for step in range(steps):
+        # 先向左上方平移，再移回原处
+        delta = -3 if step < steps // 2 else 3
+        pos = QPointF(pos.x() + delta, pos.y() + delta)
+        t0 = time.perf_counter()
+        view.mouseMoveEvent(event(QEvent.Type.MouseMove, pos))
+        areas.append(flush_updates(view))
+        frame_times.append((time.perf_counter() - t0) * 1000)
+    view.mouseReleaseEvent(event(QEvent.Type.MouseButtonRelease, pos))
+    return statistics.median(frame_times), statistics.median(areas)
+
+def measure_export(view: GridView, repeat: int) -> float:
+    """返回导出文本mask的耗时中位数，单位毫秒"""
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            view.grid.export_mask(view.region_manager.regions, os.path.join(tmp, "mask.txt"))
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run(args):
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = []
+
+    for preset in args.presets:
+        rows, cols = parse_grid_size(preset)
+        for region_count in args.regions:
+            view = GridView()
+            view.resize(args.width, args.height)
+            view.set_grid(Grid(rows, cols))
+            populate(view, region_count, args.seed)
+            view.show()
+            app.processEvents()
+
+            export_ms = measure_export(view, args.repeat)
+            for zoom_index, zoom in enumerate(view.zoom_levels):
+                view.current_zoom_index = zoom_index
+                view.offset.setX(10)
+                view.offset.setY(10)
+                first_ms, paint_ms = measure_paint(view, args.repeat)
+                paint_area = repaint_area(view)
+                move_ms, drag_frame_ms, drag_area = measure_drag(view, args.drag_steps)
+                pan_frame_ms, pan_area = measure_pan(view, args.drag_steps)
+                result = {
+                    "preset": preset,
+                    "regions": len(view.region_manager.regions),
+                    "zoom": zoom,
+                    "paint_first_ms": round(first_ms, 3),
+                    "paint_ms": round(paint_ms, 3),
+                    "paint_area": paint_area,
+                    "drag_move_ms": round(move_ms, 3),
+                    "drag_frame_ms": round(drag_frame_ms, 3),
+                    "drag_area": drag_area,
+                    "pan_frame_ms": round(pan_frame_ms, 3),
+                    "pan_area": pan_area,
+                    "export_ms": round(export_ms, 3),
+                }
+                results.append(result)
+                print(f"{preset:<5} 区域 {result['regions']:>4}  缩放 {zoom:<6}  "
+                      f"绘制 {paint_ms:8.2f}ms (首帧 {first_ms:8.2f}ms)  "
+                      f"拖动 {move_ms:6.3f}ms/次 (含重绘 {drag_frame_ms:8.2f}ms)  "
+                      f"平移 {pan_frame_ms:8.2f}ms/次  导出 {export_ms:7.1f}ms")
+            view.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "viewport": [args.width, args.height],
+            "repeat": args.repeat,
+            "drag_steps": args.drag_steps,
+        },
+        "results": results,
+    }
+
+def compare(current, baseline_file: str):
+    """与之前的结果逐项对比，输出耗时变化比例"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    key = lambda item: (item["preset"], item["regions"], item["zoom"])
+    previous = {key(item): item for item in baseline["results"]}
+    print(f"\n与 {baseline_file} ({baseline['meta'].get('commit', '')}) 对比:")
+    for item in current["results"]:
+        old = previous.get(key(item))
+        if old is None:
+            continue
+        changes = []
+        for field in ("paint_ms", "drag_frame_ms", "pan_frame_ms", "export_ms"):
+            if old.get(field):
+                changes.append(f"{field} {item[field] / old[field]:.2f}x")
+        print(f"{item['preset']:<5} 区域 {item['regions']:>4}  缩放 {item['zoom']:<6}  " + "  ".join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description="GridView渲染与交互基准测试")
+    parser.add_argument("--presets", nargs="+", default=["23k", "680k"], help="预设名称(23k/680k)或 行x列")
+    parser.add_argument("--regions", type=int, nargs="+", default=[0, 26, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--drag-steps", type=int, default=50)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="render_benchmark.json", help="结果JSON文件")
+    parser.add_argument("--compare", help="用于对比的历史结果JSON文件")
+    parser.add_argument("--trace", help="同时记录耗时区间并保存为Chrome Trace JSON文件")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.enable()
+
+    report = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到: {args.output}")
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"追踪数据已保存到: {args.trace}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import colorsys
+from typing import Tuple
+
+# 颜色以 (r, g, b, a) 元组表示，各分量范围 0-255
+Color = Tuple[int, int, int, int]
+
+def color_from_hsv(hue: int, saturation: int, value: int, alpha: int = 255) -> Color:
+    """根据HSV创建颜色，参数范围与QColor.setHsv一致（色相0-359，其余0-255）"""
+    r, g, b = colorsys.hsv_to_rgb(hue / 360, saturation / 255, value / 255)
+    return (round(r * 255), round(g * 255), round(b * 255), alpha)
+
+class Point:
+    """二维点，接口与QPointF保持一致，便于GUI直接使用"""
+    __slots__ = ('_x', '_y')
+
+    def __init__(self, x: float = 0, y: float = 0):
+        self._x = x
+        self._y = y
+
+    def x(self) -> float:
+        return self._x
+
+    def y(self) -> float:
+        return self._y
+
+    def setX(self, x: float):
+        self._x = x
+
+    def setY(self, y: float):
+        self._y = y
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Point) and self._x == other._x and self._y == other._y
+
+    def __hash__(self):
+        return hash((self._x, self._y))
+
+    def __getstate__(self):
+        return (self._x, self._y)
+
+    def __setstate__(self, state):
+        self._x, self._y = state
+
+    def __repr__(self) -> str:
+        return f"Point({self._x}, {self._y})"
+
+class Rect:
+    """轴对齐矩形，接口与QRectF保持一致"""
+    __slots__ = ('_x', '_y', '_w', '_h')
+
+    def __init__(self, x: float, y: float, width: float, height: float):
+        self._x = x
+        self._y = y
+        self._w = width
+        self._h = height
+
+    def x(self) -> float:
+        return self._x
+
+    def y(self) -> float:
+        return self._y
+
+    def width(self) -> float:
+        return self._w
+
+    def height(self) -> float:
+        return self._h
+
+    def left(self) -> float:
+        return self._x
+
+    def top(self) -> float:
+        return self._y
+
+    def right(self) -> float:
+        return self._x + self._w
+
+    def bottom(self) -> float:
+        return self._y + self._h
+
+    def topLeft(self) -> Point:
+        return Point(self._x, self._y)
+
+    def bottomRight(self) -> Point:
+        return Point(self._x + self._w, self._y + self._h)
+
+    def isNull(self) -> bool:
+        return self._w == 0 or self._h == 0
+
+    def contains(self, point) -> bool:
+        """检查点是否在矩形内（包含边界），与QRectF.contains一致"""
+        if self.isNull():
+            return False
+        return (self._x <= point.x() <= self._x + self._w and
+                self._y <= point.y() <= self._y + self._h)
+
+    def intersects(self, other: 'Rect') -> bool:
+        """检查两个矩形是否重叠（仅接触边界不算重叠），与QRectF.intersects一致"""
+        if self.isNull() or other.isNull():
+            return False
+        return (self._x < other._x + other._w and other._x < self._x + self._w and
+                self._y < other._y + other._h and other._y < self._y + self._h)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, Rect) and self._x == other._x and self._y == other._y and
+                self._w == other._w and self._h == other._h)
+
+    def __hash__(self):
+        return hash((self._x, self._y, self._w, self._h))
+
+    def __getstate__(self):
+        return (self._x, self._y, self._w, self._h)
+
+    def __setstate__(self, state):
+        self._x, self._y, self._w, self._h = state
+
+    def __repr__(self) -> str:
+        return f"Rect({self._x}, {self._y}, {self._w}, {self._h})"
@@ -1,14 +1,78 @@
+import heapq
+import os
 import numpy as np
-from typing import Dict
-from PyQt6.QtCore import QPointF
+from typing import Dict, List, Optional, Tuple
+from .rasterizer import clip_mask, rasterize_regions, region_footprint
+from .mask_writer import get_mask_writer
+from .occupancy import first_fit, summed_area_table
+from .signal import Signal
+from .trace import tracer
+
+# 预设芯片规格: (行数, 列数)
+CHIP_PRESETS = {
+    "23k": (318, 74),
+    "680k": (636, 1080),
+}
+
+POINT_DTYPE = np.uint8    # 点阵数据类型，每个网格1字节
+LABEL_DTYPE = np.uint16   # 占用位图标签类型
+POINTS_FILE = "points.npy"        # 磁盘存储时点阵数据的文件名
+OCCUPANCY_FILE = "occupancy.npy"  # 磁盘存储时占用位图的文件名
+
+def allocate_array(shape: Tuple[int, int], dtype, filename: Optional[str] = None) -> np.ndarray:
+    """分配全0数组；指定文件名时创建.npy文件并以np.memmap映射，只有访问到的页才会读入内存"""
+    if filename is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=shape)
 
 class Grid:
-    def __init__(self, rows: int, cols: int):
-        """初始化点阵"""
+    def __init__(self, rows: int, cols: int, dtype=POINT_DTYPE, storage_dir: Optional[str] = None,
+                 points: Optional[np.ndarray] = None):
+        """初始化点阵
+        dtype 为点阵数据类型；指定 storage_dir 时点阵数据和占用位图保存在该目录下并以np.memmap映射；
+        points 可传入已有的点阵数据（如 Grid.open 打开的memmap），形状需为 (rows, cols)
+        """
         self.rows = rows
         self.cols = cols
-        self.points = np.zeros((rows, cols))  # 存储点阵数据
+        self.storage_dir = storage_dir
+        if storage_dir is not None:
+            os.makedirs(storage_dir, exist_ok=True)
+        if points is None:
+            points = allocate_array((rows, cols), dtype, self._storage_file(POINTS_FILE))
+        elif points.shape != (rows, cols):
+            raise ValueError(f"点阵数据形状 {points.shape} 与 ({rows}, {cols}) 不一致")
+        self.points = points  # 存储点阵数据
+        # 占用位图：按显示坐标（第0行在最上方）记录每个网格被哪个区域占用，0表示空闲
+        self.occupancy = allocate_array((rows, cols), LABEL_DTYPE, self._storage_file(OCCUPANCY_FILE))
+        self.region_labels: Dict[str, int] = {}  # 区域名称 -> 占用位图中的标签
+        self.footprints: Dict[str, Tuple[int, int, int, int]] = {}  # 区域名称 -> 当前占用范围
+        self._free_labels = []  # 已释放、可重新使用的标签（最小堆）
+        self._next_label = 1
+        # 点或占用位图变化时发送 (起始行, 结束行, 起始列, 结束列)，显示坐标，结束值不包含
+        self.cells_changed = Signal()
         
+    @classmethod
+    def open(cls, storage_dir: str) -> 'Grid':
+        """打开磁盘上已有的点阵数据（以np.memmap映射），占用位图重新创建"""
+        points = np.load(os.path.join(storage_dir, POINTS_FILE), mmap_mode="r+")
+        rows, cols = points.shape
+        return cls(rows, cols, points.dtype, storage_dir, points)
+    
+    def _storage_file(self, name: str) -> Optional[str]:
+        """磁盘存储时数组的文件路径，内存存储时为None"""
+        return os.path.join(self.storage_dir, name) if self.storage_dir is not None else None
+    
+    def flush(self):
+        """将memmap中修改过的数据写回磁盘，内存存储时不做任何事"""
+        for array in (self.points, self.occupancy):
+            if isinstance(array, np.memmap):
+                array.flush()
+    
+    @property
+    def nbytes(self) -> int:
+        """点阵数据和占用位图占用的字节数"""
+        return self.points.nbytes + self.occupancy.nbytes
+    
     def is_valid_point(self, row: int, col: int) -> bool:
         """检查点是否在有效范围内"""
         return 0 <= row < self.rows and 0 <= col < self.cols 
@@ -28,24 +92,181 @@ class Grid:
         """设置点的值，使用转换后的行索引"""
         converted_row = self.convert_row(row)
         if self.is_valid_point(converted_row, col):
-            self.points[converted_row, col] = value 
-            
-    def export_mask(self, regions: Dict[str, 'Region'], filename: str = "mask.txt"):
+            self.points[converted_row, col] = value
+            self.cells_changed.emit(row, row + 1, col, col + 1)
+
+    def _clip_window(self, start_row: int, end_row: int,
+                     start_col: int, end_col: int) -> Tuple[int, int, int, int]:
+        """将窗口范围裁剪到点阵内"""
+        start_row, start_col = max(0, start_row), max(0, start_col)
+        end_row, end_col = min(self.rows, end_row), min(self.cols, end_col)
+        return start_row, max(start_row, end_row), start_col, max(start_col, end_col)
+
+    def _window_view(self, start_row: int, end_row: int, start_col: int, end_col: int) -> np.ndarray:
+        """点阵数据中窗口范围（显示坐标，需已裁剪）的视图，行已翻转为显示顺序（第0行在最上方）"""
+        return self.points[self.rows - end_row:self.rows - start_row, start_col:end_col][::-1]
+
+    def get_window(self, start_row: int, end_row: int, start_col: int, end_col: int) -> np.ndarray:
+        """读取矩形窗口（显示坐标，结束值不包含）内的点，返回按显示顺序排列的只读视图
+        超出点阵范围的部分被裁掉
+        """
+        window = self._window_view(*self._clip_window(start_row, end_row, start_col, end_col))
+        window.flags.writeable = False
+        return window
+
+    def set_window(self, start_row: int, start_col: int, values):
+        """以(start_row, start_col)为左上角（显示坐标）写入按显示顺序排列的二维数组，超出点阵的部分被忽略"""
+        values = np.asarray(values)
+        rows, cols = values.shape
+        clipped = self._clip_window(start_row, start_row + rows, start_col, start_col + cols)
+        if clipped[0] == clipped[1] or clipped[2] == clipped[3]:
+            return
+        self._window_view(*clipped)[...] = values[clipped[0] - start_row:clipped[1] - start_row,
+                                                  clipped[2] - start_col:clipped[3] - start_col]
+        self.cells_changed.emit(*clipped)
+
+    def fill_window(self, start_row: int, end_row: int, start_col: int, end_col: int, value: int):
+        """将矩形窗口（显示坐标，结束值不包含）内的点全部设为value"""
+        clipped = self._clip_window(start_row, end_row, start_col, end_col)
+        if clipped[0] == clipped[1] or clipped[2] == clipped[3]:
+            return
+        self._window_view(*clipped)[...] = value
+        self.cells_changed.emit(*clipped)
+
+    def fill_footprint(self, region: 'Region', value: int):
+        """将区域占用范围内的点全部设为value"""
+        if region.is_polygon:
+            start_row, start_col, mask = region.footprint_mask()
+            self.apply_mask(mask, value, start_row, start_col)
+        else:
+            self.fill_window(*region_footprint(region, self.rows, self.cols), value)
+
+    def apply_mask(self, mask: np.ndarray, value: int, start_row: int = 0, start_col: int = 0):
+        """将布尔掩码（按显示顺序，左上角位于(start_row, start_col)）为True的点设为value"""
+        mask = np.asarray(mask, dtype=bool)
+        rows, cols = mask.shape
+        clipped = self._clip_window(start_row, start_row + rows, start_col, start_col + cols)
+        if clipped[0] == clipped[1] or clipped[2] == clipped[3]:
+            return
+        window = self._window_view(*clipped)
+        window[mask[clipped[0] - start_row:clipped[1] - start_row,
+                    clipped[2] - start_col:clipped[3] - start_col]] = value
+        self.cells_changed.emit(*clipped)
+
+    def gather(self, rows, cols) -> np.ndarray:
+        """按坐标数组（显示坐标）批量读取点的值，超出点阵范围的坐标返回0"""
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp))
+        valid = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        values = np.zeros(rows.shape, dtype=self.points.dtype)
+        values[valid] = self.points[self.rows - 1 - rows[valid], cols[valid]]
+        return values
+
+    def scatter(self, rows, cols, values):
+        """按坐标数组（显示坐标）批量写入点的值，超出点阵范围的坐标被忽略"""
+        rows, cols, values = np.broadcast_arrays(np.asarray(rows, dtype=np.intp),
+                                                 np.asarray(cols, dtype=np.intp), np.asarray(values))
+        valid = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        if not valid.any():
+            return
+        rows, cols = rows[valid], cols[valid]
+        self.points[self.rows - 1 - rows, cols] = values[valid]
+        self.cells_changed.emit(int(rows.min()), int(rows.max()) + 1, int(cols.min()), int(cols.max()) + 1)
+
+    def _allocate_label(self, name: str) -> int:
+        """为区域分配占用位图中的标签，优先重用已释放的最小标签"""
+        if name in self.region_labels:
+            return self.region_labels[name]
+        if self._free_labels:
+            label = heapq.heappop(self._free_labels)
+        else:
+            if self._next_label > np.iinfo(self.occupancy.dtype).max:
+                raise ValueError("占用位图的标签已用尽")
+            label = self._next_label
+            self._next_label += 1
+        self.region_labels[name] = label
+        return label
+    
+    def place_region(self, region: 'Region'):
+        """在占用位图中放置或移动区域：清除旧的占用范围，再写入新的占用范围"""
+        label = self._allocate_label(region.name)
+        old = self.footprints.get(region.name)
+        if old is not None:
+            window = self.occupancy[old[0]:old[1], old[2]:old[3]]
+            window[window == label] = 0
+            self.cells_changed.emit(*old)
+        
+        if region.is_polygon:
+            # 多边形只写入缓存的占用掩码中的网格，占用范围记录为掩码的外接矩形
+            *footprint, mask = clip_mask(region.footprint_mask(), self.rows, self.cols)
+            footprint = tuple(footprint)
+            self.occupancy[footprint[0]:footprint[1], footprint[2]:footprint[3]][mask] = label
+        else:
+            footprint = region_footprint(region, self.rows, self.cols)
+            self.occupancy[footprint[0]:footprint[1], footprint[2]:footprint[3]] = label
+        self.footprints[region.name] = footprint
+        self.cells_changed.emit(*footprint)
+    
+    def remove_region(self, name: str):
+        """从占用位图中移除区域，并释放其标签"""
+        label = self.region_labels.pop(name, None)
+        if label is None:
+            return
+        start_row, end_row, start_col, end_col = self.footprints.pop(name)
+        window = self.occupancy[start_row:end_row, start_col:end_col]
+        window[window == label] = 0
+        heapq.heappush(self._free_labels, label)
+        self.cells_changed.emit(start_row, end_row, start_col, end_col)
+    
+    def is_footprint_free(self, row: int, col: int, height: int, width: int,
+                          ignore: Optional[str] = None) -> bool:
+        """检查以(row, col)为左上角的 height×width 范围是否空闲，ignore指定的区域视为空闲
+        超出点阵范围的部分视为不空闲
+        """
+        if row < 0 or col < 0 or row + height > self.rows or col + width > self.cols:
+            return False
+        window = self.occupancy[row:row + height, col:col + width]
+        ignore_label = self.region_labels.get(ignore, 0) if ignore else 0
+        if ignore_label:
+            return not np.any((window != 0) & (window != ignore_label))
+        return not window.any()
+    
+    def is_region_free(self, region: 'Region') -> bool:
+        """检查区域当前位置是否与其他已放置区域重叠，多边形区域只检查其占用掩码中的网格"""
+        if region.is_polygon:
+            full = region.footprint_mask()
+            start_row, end_row, start_col, end_col, mask = clip_mask(full, self.rows, self.cols)
+            if np.count_nonzero(mask) != np.count_nonzero(full[2]):
+                return False  # 部分网格超出点阵范围
+            cells = self.occupancy[start_row:end_row, start_col:end_col][mask]
+            ignore_label = self.region_labels.get(region.name, 0)
+            return not np.any((cells != 0) & (cells != ignore_label))
+        start_row, end_row, start_col, end_col = region_footprint(region, self.rows, self.cols)
+        return self.is_footprint_free(start_row, start_col, end_row - start_row,
+                                      end_col - start_col, ignore=region.name)
+    
+    def free_cell_count(self) -> int:
+        """统计空闲网格数量"""
+        return int(self.occupancy.size - np.count_nonzero(self.occupancy))
+    
+    def find_free_slot(self, height: int, width: int) -> Optional[Tuple[int, int]]:
+        """查找第一个能容纳 height×width 的空闲位置，返回左上角 (行, 列)，找不到时返回None"""
+        return first_fit(self.occupancy != 0, height, width)
+    
+    def occupancy_table(self) -> np.ndarray:
+        """计算占用位图的积分图，用于批量查询任意矩形范围内的占用数量"""
+        return summed_area_table(self.occupancy != 0)
+    
+    def export_mask(self, regions: Dict[str, 'Region'], filename: str = "mask.txt",
+                    encoding: str = "text", labels: Optional[Tuple[np.ndarray, List[str]]] = None):
         """导出mask文件
         每个网格点占一行，按照从左到右，从上到下的顺序输出
         如果某个点被region覆盖，输出region的名称
         如果没有被覆盖，输出数字0
+        encoding 可选 text / rle / binary / gzip，见 core.mask_writer
+        labels 为已有的 (标签栅格, 名称列表)，如 RegionManager.export_labels() 的结果，提供时不再重新栅格化
         """
-        with open(filename, 'w', encoding='utf-8') as f:
-            for row in range(self.rows):
-                for col in range(self.cols):
-                    # 检查当前点是否被任何region覆盖
-                    covered = False
-                    for region in regions.values():
-                        if region.is_placed and region.contains_point(QPointF(col, row)):
-                            f.write(f"{region.name.upper()}\n")
-                            covered = True
-                            break
-                    
-                    if not covered:
-                        f.write(f"{0}\n") 
\ No newline at end of file
+        # 先将所有区域绘制为标签栅格，再由写入器按行块批量输出
+        with tracer.span("export", encoding=encoding, regions=len(regions), cells=self.rows * self.cols):
+            if labels is None or labels[0].shape != (self.rows, self.cols):
+                labels = rasterize_regions(regions, self.rows, self.cols)
+            get_mask_writer(encoding).write(*labels, filename)
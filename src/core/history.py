@@ -0,0 +1,228 @@
+"""区域编辑的撤销/重做
+
+每条记录只保存区域名称和变化前后的几何信息（或被创建/删除的区域对象本身），不保存点阵快照。
+记录在操作完成后压入 UndoStack，撤销/重做时通过 RegionManager 和 Grid 恢复区域状态，
+每一步的开销只与该区域的大小有关，与历史记录的长度无关
+"""
+import sys
+from collections import deque
+from typing import Deque, Hashable, List, Optional, Tuple
+from .geometry import Point
+from .region import Region
+from .signal import Signal
+
+Geometry = Tuple[float, float, int, int]  # (x, y, 宽度, 高度)
+
+def region_geometry(region: Region) -> Geometry:
+    """区域的几何信息 (x, y, 宽度, 高度)"""
+    return (region.position.x(), region.position.y(), region.width, region.height)
+
+def _shallow_size(*objects) -> int:
+    """对象本身占用的字节数之和，用于估计记录的内存占用"""
+    return sum(sys.getsizeof(obj) for obj in objects)
+
+class RegionCommand:
+    """区域编辑记录基类
+    merge_key 不为None时，与栈顶 merge_key 相同的新记录会合并到栈顶记录中（如连续的拖动步骤）
+    """
+    text = ""
+
+    def __init__(self, merge_key: Optional[Hashable] = None):
+        self.merge_key = merge_key
+
+    @property
+    def nbytes(self) -> int:
+        """记录占用内存的估计值"""
+        return _shallow_size(self, self.__dict__)
+
+    def undo(self, manager: 'RegionManager', grid: Optional['Grid']):
+        raise NotImplementedError
+
+    def redo(self, manager: 'RegionManager', grid: Optional['Grid']):
+        raise NotImplementedError
+
+    def merge(self, other: 'RegionCommand') -> bool:
+        """尝试将紧随其后的记录合并到本记录中，成功时返回True"""
+        return False
+
+    def is_noop(self) -> bool:
+        """合并后前后状态相同，记录可以丢弃"""
+        return False
+
+class SetRegionGeometry(RegionCommand):
+    """区域位置或尺寸的变化"""
+    text = "移动区域"
+
+    def __init__(self, name: str, before: Geometry, after: Geometry, merge_key: Optional[Hashable] = None):
+        super().__init__(merge_key)
+        self.name = name
+        self.before = before
+        self.after = after
+
+    @staticmethod
+    def _apply(manager: 'RegionManager', grid: Optional['Grid'], name: str, geometry: Geometry):
+        region = manager.regions[name]
+        x, y, region.width, region.height = geometry
+        manager.move_region(name, Point(x, y))
+        if grid is not None and region.is_placed:
+            grid.place_region(region)
+
+    def undo(self, manager, grid):
+        self._apply(manager, grid, self.name, self.before)
+
+    def redo(self, manager, grid):
+        self._apply(manager, grid, self.name, self.after)
+
+    def merge(self, other: RegionCommand) -> bool:
+        if not isinstance(other, SetRegionGeometry) or other.name != self.name:
+            return False
+        self.after = other.after
+        return True
+
+    def is_noop(self) -> bool:
+        return self.before == self.after
+
+class CreateRegion(RegionCommand):
+    """创建并放置区域，记录保存区域对象本身，重做时原样加回"""
+    text = "创建区域"
+
+    def __init__(self, region: Region):
+        super().__init__()
+        self.region = region
+
+    @property
+    def nbytes(self) -> int:
+        region = self.region
+        return super().nbytes + _shallow_size(region, region.__dict__, region.name, region.position, region.color)
+
+    def undo(self, manager, grid):
+        manager.remove_region(self.region.name)
+        if grid is not None:
+            grid.remove_region(self.region.name)
+
+    def redo(self, manager, grid):
+        manager.add_region(self.region)
+        if grid is not None and self.region.is_placed:
+            grid.place_region(self.region)
+
+class DeleteRegion(CreateRegion):
+    """删除区域，与创建互为逆操作"""
+    text = "删除区域"
+
+    def undo(self, manager, grid):
+        super().redo(manager, grid)
+
+    def redo(self, manager, grid):
+        super().undo(manager, grid)
+
+class CompositeCommand(RegionCommand):
+    """作为一步撤销/重做的一组记录（如自动排布放置的所有区域）"""
+    def __init__(self, text: str, commands: List[RegionCommand]):
+        super().__init__()
+        self.text = text
+        self.commands = commands
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + sum(command.nbytes for command in self.commands)
+
+    def undo(self, manager, grid):
+        with manager.batch():
+            for command in reversed(self.commands):
+                command.undo(manager, grid)
+
+    def redo(self, manager, grid):
+        with manager.batch():
+            for command in self.commands:
+                command.redo(manager, grid)
+
+class UndoStack:
+    """撤销/重做栈
+    记录数超过 max_entries 或估计内存超过 max_bytes 时丢弃最早的记录（至少保留最近一条），
+    压入新记录时清空重做栈。每一步撤销/重做、压入和合并均为O(1)
+    """
+    def __init__(self, max_entries: int = 1000, max_bytes: Optional[int] = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.changed = Signal()  # 可撤销/重做的状态变化时发送
+        self._undo: Deque[Tuple[RegionCommand, int]] = deque()  # (记录, 压入时的内存估计)
+        self._redo: List[RegionCommand] = []
+        self.nbytes = 0  # 撤销栈中记录的内存估计之和
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_text(self) -> str:
+        return self._undo[-1][0].text if self._undo else ""
+
+    def redo_text(self) -> str:
+        return self._redo[-1].text if self._redo else ""
+
+    def push(self, command: RegionCommand):
+        """压入已经执行过的记录，前后状态相同的记录直接忽略"""
+        if command.is_noop():
+            return
+        self._redo.clear()
+        if self._undo and command.merge_key is not None:
+            top, _ = self._undo[-1]
+            if top.merge_key == command.merge_key and top.merge(command):
+                self._pop_undo()
+                if not top.is_noop():
+                    # 合并后记录的内存估计可能变化，重新压入以更新估计并检查上限
+                    self._push_undo(top)
+                self.changed.emit()
+                return
+
+        self._push_undo(command)
+        self.changed.emit()
+
+    def _push_undo(self, command: RegionCommand):
+        """压入撤销栈，超过记录数或内存上限时丢弃最早的记录（至少保留最近一条）"""
+        size = command.nbytes
+        self._undo.append((command, size))
+        self.nbytes += size
+        while len(self._undo) > 1 and (
+                len(self._undo) > self.max_entries
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, dropped = self._undo.popleft()
+            self.nbytes -= dropped
+
+    def _pop_undo(self) -> RegionCommand:
+        command, size = self._undo.pop()
+        self.nbytes -= size
+        return command
+
+    def undo(self, manager: 'RegionManager', grid: Optional['Grid']) -> Optional[RegionCommand]:
+        """撤销最近一条记录，返回被撤销的记录"""
+        if not self._undo:
+            return None
+        command = self._pop_undo()
+        command.undo(manager, grid)
+        self._redo.append(command)
+        self.changed.emit()
+        return command
+
+    def redo(self, manager: 'RegionManager', grid: Optional['Grid']) -> Optional[RegionCommand]:
+        """重做最近一条被撤销的记录，返回被重做的记录"""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        command.redo(manager, grid)
+        self._push_undo(command)
+        self.changed.emit()
+        return command
+
+    def clear(self):
+        """清空全部记录（如加载项目或导入mask后）"""
+        self._undo.clear()
+        self._redo.clear()
+        self.nbytes = 0
+        self.changed.emit()
@@ -0,0 +1,137 @@
+import heapq
+import os
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from .geometry import Rect
+from .grid import LABEL_DTYPE, allocate_array
+from .rasterizer import clip_mask, region_cell_bounds
+from .spatial_index import SpatialIndex
+
+Window = Tuple[int, int, int, int]  # (起始行, 结束行, 起始列, 结束列)，显示坐标，结束值不包含
+LABELS_FILE = "labels.npy"  # 磁盘存储时标签栅格的文件名
+
+def window_rect(window: Window) -> Rect:
+    """窗口对应的矩形，两个非空窗口有公共网格当且仅当两者的矩形相交"""
+    start_row, end_row, start_col, end_col = window
+    return Rect(start_col, start_row, end_col - start_col, end_row - start_row)
+
+def window_union(a: Window, b: Window) -> Window:
+    """包含两个窗口的最小窗口"""
+    return min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])
+
+def windows_intersect(a: Window, b: Window) -> bool:
+    return a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]
+
+class LabelRaster:
+    """导出用的区域标签栅格，与 rasterize_regions 的结果一致（边界上的网格点也算作被覆盖）
+    每个区域持有固定的标签，区域变化时只重绘其新旧覆盖范围：将窗口清零后，按优先级
+    重新绘制与窗口相交的区域（用覆盖范围的空间索引查找），耗时只与变化的面积有关。
+    标签栅格按显示坐标存储（第0行在最上方），0表示未被覆盖；
+    指定 storage_dir 时与点阵数据一样保存在该目录下并以np.memmap映射，只有绘制过的页才会读入内存
+    """
+    def __init__(self, rows: int, cols: int, storage_dir: Optional[str] = None):
+        self.rows = rows
+        self.cols = cols
+        filename = os.path.join(storage_dir, LABELS_FILE) if storage_dir is not None else None
+        self.labels = allocate_array((rows, cols), LABEL_DTYPE, filename)
+        self.region_labels: Dict[str, int] = {}  # 区域名称 -> 标签
+        self.windows: Dict[str, Window] = {}  # 已绘制区域的覆盖范围
+        self.index = SpatialIndex()  # 覆盖范围的空间索引
+        self._free_labels: List[int] = []  # 已释放、可重新使用的标签（最小堆）
+        self._next_label = 1
+
+    def cell_window(self, region: 'Region') -> Optional[Window]:
+        """区域覆盖的网格点范围（已裁剪到点阵内），完全不覆盖时返回None"""
+        if region.is_polygon:
+            window = clip_mask(region.cell_mask(), self.rows, self.cols)[:4]
+        else:
+            window = region_cell_bounds(region, self.rows, self.cols)
+        if window[0] >= window[1] or window[2] >= window[3]:
+            return None
+        return window
+
+    def label(self, name: str) -> int:
+        """区域的标签，首次使用时分配，优先重用已释放的最小标签"""
+        label = self.region_labels.get(name)
+        if label is not None:
+            return label
+        if self._free_labels:
+            label = heapq.heappop(self._free_labels)
+        else:
+            if self._next_label > np.iinfo(self.labels.dtype).max:
+                raise ValueError("标签栅格的标签已用尽")
+            label = self._next_label
+            self._next_label += 1
+        self.region_labels[name] = label
+        return label
+
+    def release(self, name: str):
+        """释放已删除区域的标签，调用前其覆盖范围应已清除"""
+        label = self.region_labels.pop(name, None)
+        if label is not None:
+            heapq.heappush(self._free_labels, label)
+
+    def set_window(self, name: str, window: Optional[Window]):
+        """登记区域当前的覆盖范围，None表示不再绘制该区域"""
+        if window is None:
+            self.windows.pop(name, None)
+            self.index.remove(name)
+        else:
+            self.windows[name] = window
+            self.index.update(name, window_rect(window))
+
+    def names_in(self, window: Window) -> Set[str]:
+        """覆盖范围与窗口相交的区域名称"""
+        return self.index.query(window_rect(window))
+
+    def repaint(self, window: Window, regions: Sequence['Region']):
+        """将窗口清零后重新绘制与其相交的区域，regions 按优先级从高到低排列（重叠时靠前的区域优先）"""
+        start_row, end_row, start_col, end_col = window
+        target = self.labels[start_row:end_row, start_col:end_col]
+        target[...] = 0
+        for region in reversed(regions):
+            self._paint(region, window, target)
+
+    def _paint(self, region: 'Region', window: Window, target: np.ndarray):
+        """在窗口 target 中绘制区域与窗口相交的部分"""
+        covered = self.windows[region.name]
+        start_row, end_row = max(window[0], covered[0]), min(window[1], covered[1])
+        start_col, end_col = max(window[2], covered[2]), min(window[3], covered[3])
+        if region.is_polygon:
+            mask_row, mask_col, mask = region.cell_mask()
+            start_row, end_row = max(start_row, mask_row), min(end_row, mask_row + mask.shape[0])
+            start_col, end_col = max(start_col, mask_col), min(end_col, mask_col + mask.shape[1])
+        if start_row >= end_row or start_col >= end_col:
+            return
+        cells = target[start_row - window[0]:end_row - window[0], start_col - window[2]:end_col - window[2]]
+        label = self.label(region.name)
+        if region.is_polygon:
+            cells[mask[start_row - mask_row:end_row - mask_row, start_col - mask_col:end_col - mask_col]] = label
+        else:
+            cells[...] = label
+
+    def rebuild(self, regions: Sequence['Region']):
+        """重新绘制全部区域，regions 为已放置的区域，按优先级从高到低排列
+        只清除已绘制区域的覆盖范围，其余网格保持为0，不必访问整个标签栅格
+        """
+        for start_row, end_row, start_col, end_col in self.windows.values():
+            self.labels[start_row:end_row, start_col:end_col] = 0
+        self.windows.clear()
+        self.index.clear()
+        for region in regions:
+            self.set_window(region.name, self.cell_window(region))
+        full = (0, self.rows, 0, self.cols)
+        for region in reversed(regions):
+            if region.name in self.windows:
+                self._paint(region, full, self.labels)
+
+    def export_labels(self, names: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """按导出顺序重新编号，返回与 rasterize_regions 相同的 (标签栅格, 名称列表)
+        names 为已放置区域的名称，按优先级从高到低排列；只需一次查表，不必重新栅格化
+        """
+        table = np.zeros(self._next_label, dtype=np.min_scalar_type(len(names)))
+        for index, name in enumerate(names, 1):
+            label = self.region_labels.get(name)
+            if label is not None:
+                table[label] = index
+        return table[self.labels], list(names)
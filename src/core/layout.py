@@ -0,0 +1,111 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from .grid import CHIP_PRESETS
+from .region import Region
+from .geometry import Point
+
+def parse_grid_size(text: str) -> Tuple[int, int]:
+    """解析点阵规格，支持预设名称(23k/680k)或 "行数x列数" 形式"""
+    if text in CHIP_PRESETS:
+        return CHIP_PRESETS[text]
+    try:
+        rows, cols = (int(value) for value in text.lower().replace('×', 'x').split('x'))
+    except ValueError:
+        raise ValueError(f"无效的点阵规格: {text}")
+    if rows <= 0 or cols <= 0:
+        raise ValueError(f"无效的点阵规格: {text}")
+    return rows, cols
+
+def parse_region_sizes(text: str) -> List[Tuple[int, int]]:
+    """解析区域尺寸列表，每行为 "宽度 高度" 或 "宽度 高度 数量"，也支持 "宽度x高度"
+    空行和以#开头的行会被忽略
+    """
+    sizes = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        fields = line.lower().replace('×', ' ').replace('x', ' ').replace(',', ' ').split()
+        try:
+            values = [int(field) for field in fields]
+        except ValueError:
+            raise ValueError(f"第{line_number}行格式无效: {line}")
+        if len(values) not in (2, 3) or min(values) <= 0:
+            raise ValueError(f"第{line_number}行格式无效: {line}")
+        width, height = values[0], values[1]
+        count = values[2] if len(values) == 3 else 1
+        sizes.extend([(width, height)] * count)
+    return sizes
+
+def load_layout(filename: str) -> Tuple[Optional[Tuple[int, int]], Dict[str, Region]]:
+    """读取区域布局文件
+    文件为JSON格式:
+    {
+        "preset": "680k",            # 可选，或使用 "rows" 和 "cols"
+        "regions": [
+            {"name": "a", "x": 0, "y": 0, "width": 10, "height": 10},
+            {"name": "b", "x": 20, "y": 0, "points": [[0, 0], [8, 0], [0, 6]]}
+        ]
+    }
+    多边形区域用 points 给出顶点（相对于 x, y 的坐标），宽高由顶点的外接矩形确定；
+    可选的 placed 字段为false的区域视为未放置（如项目JSON附属文件中的区域），导出时不绘制
+    返回 (点阵规格或None, 区域字典)
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    size = None
+    if "preset" in data:
+        size = parse_grid_size(data["preset"])
+    elif "rows" in data and "cols" in data:
+        size = (int(data["rows"]), int(data["cols"]))
+
+    regions: Dict[str, Region] = {}
+    for item in data.get("regions", []):
+        name = item["name"]
+        if name in regions:
+            raise ValueError(f"布局中存在重复的区域名称: {name}")
+        x, y = item.get("x", 0), item.get("y", 0)
+        if "points" in item:
+            region = Region(name, 0, 0)
+            region.set_polygon([(x + px, y + py) for px, py in item["points"]])
+            if not region.is_polygon:
+                raise ValueError(f"多边形区域至少需要3个顶点: {name}")
+        else:
+            region = Region(name, int(item["width"]), int(item["height"]))
+            region.set_position(Point(x, y))
+        region.is_placed = bool(item.get("placed", True))
+        regions[name] = region
+
+    return size, regions
+
+def load_cycles(filename: str) -> List[List[str]]:
+    """读取布局文件中可选的 "cycles" 字段：每个周期涉及的区域名称列表，如 [["a", "b"], ["c"]]
+    没有该字段时返回空列表
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    cycles = data.get("cycles", [])
+    if not isinstance(cycles, list) or not all(isinstance(cycle, list) for cycle in cycles):
+        raise ValueError("cycles 字段应为区域名称列表的列表")
+    return [[str(name) for name in cycle] for cycle in cycles]
+
+def polygon_item(region: Region) -> dict:
+    """多边形区域在布局文件中的顶点字段（相对于区域位置），矩形区域为空"""
+    if not region.is_polygon:
+        return {}
+    return {"points": [[int(v) if float(v).is_integer() else v for v in point] for point in region.points]}
+
+def save_layout(filename: str, size: Tuple[int, int], regions: Dict[str, Region]):
+    """保存区域布局文件，格式与 load_layout 读取的一致，只保存已放置的区域"""
+    data = {
+        "rows": size[0],
+        "cols": size[1],
+        "regions": [
+            {"name": region.name, "x": region.position.x(), "y": region.position.y(),
+             "width": region.width, "height": region.height, **polygon_item(region)}
+            for region in regions.values() if region.is_placed
+        ],
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
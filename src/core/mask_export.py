@@ -0,0 +1,123 @@
+"""多文件mask导出
+
+一次导出一个芯片的全部mask：合并的mask（每个网格点为区域名称或0）、每个区域的二值mask
+（被该区域覆盖为1，否则为0），以及可选的每个周期的二值mask（该周期涉及的区域覆盖为1）。
+所有输出都由同一个标签栅格生成：标签栅格放入共享内存，工作进程启动时映射一次，
+各个输出文件作为独立的任务分发到进程池中，任务参数只有文件名和标签编号，不必重复传递点阵
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .mask_writer import MASK_WRITERS, get_mask_writer
+from .trace import get_logger, tracer
+
+log = get_logger("mask_export")
+
+BINARY_NAMES = ["1"]  # 二值mask中被覆盖的网格点输出为1
+
+# 导出任务: (输出文件, 选中的标签)，选中的标签为None时输出合并的mask，否则输出这些标签的二值mask
+ExportJob = Tuple[str, Optional[Tuple[int, ...]]]
+
+def plan_exports(names: Sequence[str], output_dir: str, stem: str = "mask", encoding: str = "text",
+                 region_masks: bool = True,
+                 cycles: Optional[Sequence[Sequence[str]]] = None) -> List[ExportJob]:
+    """列出一个芯片的全部输出文件
+    names 为标签栅格的名称列表（标签i对应names[i-1]）；cycles 为每个周期涉及的区域名称，
+    输出文件依次为 stem（合并的mask）、stem_区域名称（每个区域）、stem_cycle序号（每个周期，从1开始）
+    """
+    extension = MASK_WRITERS[encoding].extension
+    labels = {name: label for label, name in enumerate(names, 1)}
+    jobs: List[ExportJob] = [(os.path.join(output_dir, stem + extension), None)]
+    if region_masks:
+        jobs.extend((os.path.join(output_dir, f"{stem}_{name.upper()}{extension}"), (label,))
+                    for name, label in labels.items())
+    for index, cycle in enumerate(cycles or (), 1):
+        unknown = [name for name in cycle if name not in labels]
+        if unknown:
+            raise ValueError(f"第{index}个周期包含不存在的区域: {', '.join(unknown)}")
+        jobs.append((os.path.join(output_dir, f"{stem}_cycle{index:03d}{extension}"),
+                     tuple(sorted({labels[name] for name in cycle}))))
+
+    # 区域名称可能与其他输出文件同名（如名为 cycle001 的区域），不区分大小写的文件系统上会相互覆盖
+    planned: Dict[str, str] = {}
+    for filename, _ in jobs:
+        key = filename.lower()
+        if key in planned:
+            raise ValueError(f"输出文件名冲突（不区分大小写）: {planned[key]} 与 {filename}")
+        planned[key] = filename
+    return jobs
+
+def write_job(labels: np.ndarray, names: Sequence[str], encoding: str, job: ExportJob) -> int:
+    """执行一个导出任务，返回写入的网格点数"""
+    filename, selected = job
+    writer = get_mask_writer(encoding)
+    if selected is None:
+        writer.write(labels, list(names), filename)
+    else:
+        if len(selected) == 1:
+            mask = labels == selected[0]
+        else:
+            mask = np.isin(labels, selected)
+        writer.write(mask.view(np.uint8), BINARY_NAMES, filename)
+    return labels.size
+
+# 工作进程中映射的共享标签栅格，由 _attach 在进程启动时设置
+_shared = None
+
+def _attach(shm_name: str, shape: Tuple[int, int], dtype: str, names: Sequence[str], encoding: str):
+    """工作进程初始化：映射共享内存中的标签栅格"""
+    global _shared
+    shm = shared_memory.SharedMemory(name=shm_name)
+    labels = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    labels.flags.writeable = False
+    _shared = (shm, labels, names, encoding)
+
+def _run_shared(job: ExportJob) -> Tuple[str, int]:
+    _, labels, names, encoding = _shared
+    return job[0], write_job(labels, names, encoding, job)
+
+def export_masks(labels: np.ndarray, names: Sequence[str], jobs: Sequence[ExportJob], encoding: str = "text",
+                 workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, str], None]] = None) -> Tuple[int, float]:
+    """执行导出任务，返回 (写入的网格点总数, 耗时秒数)
+    workers 为进程数，默认为CPU核数，为1或只有一个任务时在当前进程中执行；
+    每完成一个任务调用 progress(已完成数, 任务总数, 输出文件)
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    start = time.perf_counter()
+    cells = 0
+    with tracer.span("export_masks", jobs=len(jobs), workers=workers, cells=labels.size * len(jobs)):
+        if workers <= 1:
+            for done, job in enumerate(jobs, 1):
+                cells += write_job(labels, names, encoding, job)
+                if progress is not None:
+                    progress(done, len(jobs), job[0])
+        else:
+            labels = np.ascontiguousarray(labels)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, labels.nbytes))
+            try:
+                np.ndarray(labels.shape, dtype=labels.dtype, buffer=shm.buf)[...] = labels
+                with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                         initargs=(shm.name, labels.shape, labels.dtype.str,
+                                                   list(names), encoding)) as executor:
+                    futures = [executor.submit(_run_shared, job) for job in jobs]
+                    try:
+                        for done, future in enumerate(as_completed(futures), 1):
+                            filename, job_cells = future.result()
+                            cells += job_cells
+                            if progress is not None:
+                                progress(done, len(jobs), filename)
+                    except BaseException:
+                        # 一个任务失败（或进度回调要求中止）时取消尚未开始的任务
+                        for future in futures:
+                            future.cancel()
+                        raise
+            finally:
+                shm.close()
+                shm.unlink()
+    elapsed = time.perf_counter() - start
+    log.debug("导出 %d 个mask文件，%d 个网格点，%.3fs", len(jobs), cells, elapsed)
+    return cells, elapsed
@@ -0,0 +1,192 @@
+"""从mask文件重建区域
+
+标签栅格先按行分解为游程，上下相邻且列范围重叠的同标签游程属于同一连通分量，
+连通分量及其外接矩形都由NumPy批量计算。导出时矩形边界上的点也算作被覆盖，
+因此覆盖第 c0..c1 列、第 r0..r1 行的区域还原为位置 (c0, r0)、宽 c1-c0、高 r1-r0 的区域；
+只覆盖一行（一列）的标签若还原为高（宽）为0的空矩形，重叠检查和选取都会忽略它，
+因此还原为以该行（列）为中心、高（宽）为1的区域，覆盖的网格不变。
+被其他区域遮挡的区域按可见部分的外接矩形还原，并排在遮挡它的区域之后，使重新导出的mask与原文件一致；
+同一标签的几块之间有未被覆盖的网格时，每块分别还原为一个区域（name、name_2…）
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .geometry import Point
+from .mask_reader import read_mask
+from .rasterizer import rasterize_regions
+from .region import Region
+from .region_manager import default_region_color
+from .trace import get_logger
+
+log = get_logger("mask_import")
+
+def label_runs(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """将标签栅格中非0的部分分解为行内游程，返回 (标签, 行, 起始列, 结束列)，结束列包含，按行列顺序排列"""
+    rows, cols = labels.shape
+    flat = labels.ravel()
+    is_start = np.ones(labels.shape, dtype=bool)
+    is_start[:, 1:] = labels[:, 1:] != labels[:, :-1]
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:], flat.size) - 1
+    keep = flat[starts] != 0
+    starts, ends = starts[keep], ends[keep]
+    return flat[starts].astype(np.int64), starts // cols, starts % cols, ends % cols
+
+def _connect(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """按边 (a[i], b[i]) 合并节点，返回每个节点所在连通分量中最小的节点编号"""
+    parent = np.arange(count)
+    while True:
+        # 两端所在树的根挂到较小的根上，再压缩路径，直到每条边的两端都在同一棵树中
+        root_a, root_b = parent[a], parent[b]
+        if np.array_equal(root_a, root_b):
+            return parent
+        low = np.minimum(root_a, root_b)
+        np.minimum.at(parent, root_a, low)
+        np.minimum.at(parent, root_b, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+def label_components(labels: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """计算标签栅格中非0标签的4连通分量
+    返回 (标签, 起始行, 结束行, 起始列, 结束列, 网格数) 六个数组，每个元素对应一个连通分量，
+    行列范围为外接矩形且结束值包含，按标签排序
+    """
+    rows, cols = labels.shape
+    run_label, run_row, start_col, end_col = label_runs(labels)
+    if len(run_label) == 0:
+        return (np.zeros(0, dtype=np.int64),) * 6
+    # 按 (标签, 行, 列) 排序后，同一标签下一行的游程是连续的一段
+    order = np.argsort(run_label, kind='stable')
+    run_label, run_row, start_col, end_col = run_label[order], run_row[order], start_col[order], end_col[order]
+    key = run_label * rows + run_row
+    code_start, code_end = key * cols + start_col, key * cols + end_col
+
+    # 下一行中与本游程列范围重叠的游程：结束列不小于本游程起始列、起始列不大于本游程结束列
+    lower = np.searchsorted(code_end, (key + 1) * cols + start_col, 'left')
+    upper = np.searchsorted(code_start, (key + 1) * cols + end_col, 'right')
+    counts = np.where(run_row + 1 < rows, np.maximum(upper - lower, 0), 0)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    a = np.repeat(np.arange(len(counts)), counts)
+    b = np.repeat(lower, counts) + offsets
+
+    roots, component = np.unique(_connect(len(counts), a, b), return_inverse=True)
+    order = np.argsort(component, kind='stable')
+    bounds = np.flatnonzero(np.diff(component[order], prepend=-1))
+    return (run_label[roots],
+            np.minimum.reduceat(run_row[order], bounds),
+            np.maximum.reduceat(run_row[order], bounds),
+            np.minimum.reduceat(start_col[order], bounds),
+            np.maximum.reduceat(end_col[order], bounds),
+            np.add.reduceat((end_col - start_col + 1)[order], bounds))
+
+Bounds = Tuple[int, int, int, int]  # (起始行, 结束行, 起始列, 结束列)，结束值包含
+
+def _label_parts(labels: np.ndarray) -> Dict[int, List[Tuple[Bounds, int]]]:
+    """将每个标签的连通分量整理为要还原的部分，返回 标签 -> [(外接矩形, 网格数)]
+    连通分量之间只隔着其他标签时（被遮挡而分开），整个标签还原为一个区域，导出时由遮挡它的区域盖住中间部分；
+    标签的外接矩形中有未被覆盖的网格时，一个矩形无法还原，每个连通分量分别还原为一个区域
+    """
+    label, start_row, end_row, start_col, end_col, cells = (array.tolist() for array in label_components(labels))
+    parts: Dict[int, List[Tuple[Bounds, int]]] = {}
+    for index, value in enumerate(label):
+        parts.setdefault(value, []).append(((start_row[index], end_row[index],
+                                             start_col[index], end_col[index]), cells[index]))
+    for value, components in parts.items():
+        if len(components) == 1:
+            continue
+        whole = (min(bounds[0] for bounds, _ in components), max(bounds[1] for bounds, _ in components),
+                 min(bounds[2] for bounds, _ in components), max(bounds[3] for bounds, _ in components))
+        if np.all(labels[whole[0]:whole[1] + 1, whole[2]:whole[3] + 1] != 0):
+            parts[value] = [(whole, sum(count for _, count in components))]
+    return parts
+
+def _drawing_order(labels: np.ndarray, parts: Dict[int, List[Tuple[Bounds, int]]]) -> List[int]:
+    """确定标签顺序：外接矩形中含有其他标签的部分，其标签排在这些标签之后（字典中靠前的区域导出时优先）"""
+    after: Dict[int, set] = {label: set() for label in parts}
+    for label, label_parts in parts.items():
+        for (start_row, end_row, start_col, end_col), cells in label_parts:
+            if cells < (end_row - start_row + 1) * (end_col - start_col + 1):
+                inside = np.unique(labels[start_row:end_row + 1, start_col:end_col + 1])
+                after[label].update(int(other) for other in inside.tolist() if other != 0 and other != label)
+
+    order, done = [], set()
+    pending = sorted(parts)
+    while pending:
+        ready = [label for label in pending if after[label] <= done]
+        if not ready:
+            # 相互遮挡无法满足时按标签顺序排列，差异由 unmatched_cells 统计
+            ready = pending
+        order.extend(ready)
+        done.update(ready)
+        pending = [label for label in pending if label not in done]
+    return order
+
+def _part_name(name: str, used: set) -> str:
+    """同一标签第2个及之后的部分的名称：name_2、name_3…，跳过已使用的名称"""
+    index = 2
+    while f"{name}_{index}" in used:
+        index += 1
+    used.add(f"{name}_{index}")
+    return f"{name}_{index}"
+
+def source_name(name: str, names: List[str]) -> str:
+    """重建区域对应的mask中的名称（小写）：拆分出的 name_2 等对应 name"""
+    label_names = {label_name.lower() for label_name in names}
+    if name not in label_names and "_" in name:
+        return name.rsplit("_", 1)[0]
+    return name
+
+def _closed_span(start: int, end: int) -> Tuple[float, int]:
+    """覆盖第 start..end 个网格（结束值包含）的区间的起点和长度
+    边界上的点也算作被覆盖，长度为 end-start；只覆盖一个网格时长度为0的区间是空矩形，
+    改为以该网格为中心、长度为1的区间 (start-0.5, 1)，覆盖的网格相同
+    """
+    if start == end:
+        return start - 0.5, 1
+    return start, end - start
+
+def regions_from_labels(labels: np.ndarray, names: List[str]) -> Dict[str, Region]:
+    """根据标签栅格重建区域，区域名称为mask中名称的小写形式，均视为已放置
+    一个标签拆分为多个区域时（见 _label_parts），第一个部分使用原名称，其余部分依次命名为 name_2、name_3…
+    """
+    parts = _label_parts(labels)
+    split = [names[label - 1] for label, label_parts in parts.items() if len(label_parts) > 1]
+    if split:
+        log.warning("%d 个区域由不相连的几块组成，分别还原为多个区域: %s", len(split), ", ".join(split))
+
+    used = {name.lower() for name in names}
+    regions: Dict[str, Region] = {}
+    for label in _drawing_order(labels, parts):
+        base = names[label - 1].lower()
+        for index, ((start_row, end_row, start_col, end_col), _) in enumerate(parts[label]):
+            name = base if index == 0 else _part_name(base, used)
+            x, width = _closed_span(start_col, end_col)
+            y, height = _closed_span(start_row, end_row)
+            region = Region(name, width, height)
+            region.set_position(Point(x, y))
+            region.color = default_region_color(name)
+            region.is_placed = True
+            regions[name] = region
+    return regions
+
+def unmatched_cells(labels: np.ndarray, names: List[str], regions: Dict[str, Region]) -> int:
+    """重建的区域重新绘制后与原标签栅格不一致的网格数"""
+    raster, placed = rasterize_regions(regions, *labels.shape)
+    label_of = {name.lower(): index for index, name in enumerate(names, 1)}
+    table = np.array([0] + [label_of[source_name(name, names)] for name in placed], dtype=np.int64)
+    return int(np.count_nonzero(table[raster] != labels))
+
+def import_mask(filename: str, size: Optional[Tuple[int, int]] = None,
+                encoding: Optional[str] = None) -> Tuple[Tuple[int, int], Dict[str, Region], int]:
+    """读取mask文件并重建区域
+    文本格式不记录规格，按size或网格点数相同的预设规格确定；未指定encoding时自动判断格式
+    返回 (点阵规格, 区域字典, 无法还原的网格数)
+    """
+    labels, names = read_mask(filename, size, encoding)
+    regions = regions_from_labels(labels, names)
+    unmatched = unmatched_cells(labels, names, regions)
+    if unmatched:
+        log.warning("%s 中有 %d 个网格无法用矩形区域还原", filename, unmatched)
+    return labels.shape, regions, unmatched
@@ -0,0 +1,151 @@
+"""mask文件读取，与 core.mask_writer 中的各输出格式对应
+读取结果为标签栅格（0表示未覆盖，i表示names[i-1]）和文件中出现的区域名称，
+整个文件一次读入后用NumPy批量解析，不逐行处理
+"""
+import gzip
+from typing import BinaryIO, Dict, List, Optional, Tuple, Type
+import numpy as np
+from .grid import CHIP_PRESETS
+from .mask_writer import BinaryMaskWriter
+
+def infer_grid_size(count: int, size: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+    """根据网格点数确定点阵规格：给出size时校验点数，否则在预设规格中查找点数相同的一个"""
+    if size is not None:
+        if size[0] * size[1] != count:
+            raise ValueError(f"mask包含{count}个网格点，与点阵规格 {size[0]}×{size[1]} 不符")
+        return size
+    matches = [preset for preset in CHIP_PRESETS.values() if preset[0] * preset[1] == count]
+    if len(matches) != 1:
+        raise ValueError(f"无法根据{count}个网格点推断点阵规格，请指定点阵规格")
+    return matches[0]
+
+def token_table(tokens: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """为去重后的名称分配标签，返回 (每个名称的标签, 区域名称)，名称"0"对应标签0"""
+    names = [token.decode('utf-8') for token in tokens.tolist() if token != b"0"]
+    table = np.zeros(len(tokens), dtype=np.min_scalar_type(len(names)))
+    table[tokens != b"0"] = np.arange(1, len(names) + 1)
+    return table, names
+
+# 取uint64低 8*n 位的掩码，n为0到8
+LINE_MASKS = np.array([(1 << (8 * n)) - 1 for n in range(9)], dtype=np.uint64)
+
+class MaskReader:
+    """mask读取器基类"""
+    def open(self, filename: str) -> BinaryIO:
+        """打开输入文件"""
+        return open(filename, 'rb')
+
+    def read(self, filename: str, size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, List[str]]:
+        """读取mask文件，返回 (标签栅格, 区域名称)"""
+        with self.open(filename) as f:
+            return self.read_from(f, size)
+
+    def read_from(self, f: BinaryIO, size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, List[str]]:
+        """从已打开的文件对象读取mask，文件中没有记录规格时按size或预设规格确定形状"""
+        raise NotImplementedError
+
+class TextMaskReader(MaskReader):
+    """文本格式：每个网格点占一行"""
+    def read_from(self, f: BinaryIO, size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, List[str]]:
+        data = f.read()
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        if buffer.size % 2 == 0 and np.all(buffer[1::2] == ord('\n')):
+            # 名称均为单个字符时每行正好2字节，直接按字节值查表
+            codes = buffer[0::2]
+            present = np.flatnonzero(np.bincount(codes, minlength=256))
+            table, names = token_table(np.array([bytes([code]) for code in present.tolist()], dtype=bytes))
+            lookup = np.zeros(256, dtype=table.dtype)
+            lookup[present] = table
+            labels = lookup[codes]
+        else:
+            labels, names = self._parse_lines(data, buffer)
+        return labels.reshape(infer_grid_size(labels.size, size)), names
+
+    @staticmethod
+    def _parse_lines(data: bytes, buffer: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """解析名称长度不一的文本mask"""
+        ends = np.flatnonzero(buffer == ord('\n'))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - starts
+        if (len(ends) and ends[-1] == len(buffer) - 1 and 0 < lengths.min()
+                and lengths.max() <= 8 and not np.any(buffer == ord('\r'))):
+            # 每行不超过8字节时，将每行的字节按小端打包为一个uint64再去重，比对字节串去重快得多
+            padded = np.concatenate((buffer, np.zeros(8, dtype=np.uint8)))
+            windows = np.lib.stride_tricks.sliding_window_view(padded, 8)[starts]
+            keys = windows.view('<u8').ravel() & LINE_MASKS[lengths]
+            # 同一区域的网格在行内连续，只对每段相同名称的第一行去重
+            run_starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+            keys, run_inverse = np.unique(keys[run_starts], return_inverse=True)
+            inverse = np.repeat(run_inverse, np.diff(np.append(run_starts, len(lengths))))
+            tokens = np.array([key.to_bytes(8, 'little').rstrip(b"\0") for key in keys.tolist()], dtype=bytes)
+        else:
+            tokens, inverse = np.unique(np.array(data.split(), dtype=bytes), return_inverse=True)
+        table, names = token_table(tokens)
+        return table[inverse], names
+
+class GzipTextMaskReader(TextMaskReader):
+    """gzip压缩的文本格式"""
+    def open(self, filename: str) -> BinaryIO:
+        return gzip.open(filename, 'rb')
+
+class RleMaskReader(MaskReader):
+    """游程编码文本格式，规格由文件头 "#RLE 行数 列数" 给出"""
+    def read_from(self, f: BinaryIO, size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, List[str]]:
+        header = f.readline().split()
+        if len(header) != 3 or header[0] != b"#RLE":
+            raise ValueError("不是有效的RLE mask文件")
+        rows, cols = int(header[1]), int(header[2])
+        if size is not None and size != (rows, cols):
+            raise ValueError(f"mask规格 {rows}×{cols} 与点阵规格 {size[0]}×{size[1]} 不符")
+
+        fields = f.read().split()
+        tokens, inverse = np.unique(np.array(fields[0::2], dtype=bytes), return_inverse=True)
+        table, names = token_table(tokens)
+        run_labels = table[inverse]
+        lengths = np.array(fields[1::2], dtype=bytes).astype(np.int64)
+        if len(lengths) != len(run_labels) or lengths.sum() != rows * cols:
+            raise ValueError(f"RLE游程总长度与规格 {rows}×{cols} 不符")
+        return np.repeat(run_labels, lengths).reshape(rows, cols), names
+
+class BinaryMaskReader(MaskReader):
+    """紧凑二进制格式，文件头见 BinaryMaskWriter"""
+    def read_from(self, f: BinaryIO, size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, List[str]]:
+        if f.read(len(BinaryMaskWriter.MAGIC)) != BinaryMaskWriter.MAGIC:
+            raise ValueError("不是有效的二进制mask文件")
+        rows, cols, count, itemsize = BinaryMaskWriter.HEADER.unpack(f.read(BinaryMaskWriter.HEADER.size))
+        if size is not None and size != (rows, cols):
+            raise ValueError(f"mask规格 {rows}×{cols} 与点阵规格 {size[0]}×{size[1]} 不符")
+
+        names = [f.read(f.read(1)[0]).decode('utf-8') for _ in range(count)]
+        data = f.read(rows * cols * itemsize)
+        if len(data) != rows * cols * itemsize:
+            raise ValueError("二进制mask文件不完整")
+        return np.frombuffer(data, dtype=f"<u{itemsize}").reshape(rows, cols), names
+
+# 支持的mask输入格式，名称与 MASK_WRITERS 一致
+MASK_READERS: Dict[str, Type[MaskReader]] = {
+    "text": TextMaskReader,
+    "rle": RleMaskReader,
+    "binary": BinaryMaskReader,
+    "gzip": GzipTextMaskReader,
+}
+
+def detect_encoding(filename: str) -> str:
+    """根据文件开头的内容判断mask格式"""
+    with open(filename, 'rb') as f:
+        head = f.read(len(BinaryMaskWriter.MAGIC))
+    if head.startswith(BinaryMaskWriter.MAGIC):
+        return "binary"
+    if head.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if head.startswith(b"#RLE"):
+        return "rle"
+    return "text"
+
+def read_mask(filename: str, size: Optional[Tuple[int, int]] = None,
+              encoding: Optional[str] = None) -> Tuple[np.ndarray, List[str]]:
+    """读取mask文件，返回 (标签栅格, 区域名称)；未指定encoding时自动判断格式"""
+    encoding = encoding or detect_encoding(filename)
+    if encoding not in MASK_READERS:
+        raise ValueError(f"不支持的mask格式: {encoding}")
+    return MASK_READERS[encoding]().read(filename, size)
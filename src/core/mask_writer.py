@@ -0,0 +1,149 @@
+import gzip
+import os
+import struct
+from typing import BinaryIO, Callable, Dict, List, Optional, Type
+import numpy as np
+
+class MaskWriter:
+    """mask写入器基类
+    输入为标签栅格（0表示未覆盖，i表示names[i-1]），按行块批量生成输出，避免逐点写入
+    progress 为可选的进度回调 progress(已完成, 总量)，每写完一块调用一次；回调抛出异常时写入中止
+    """
+    extension = ".txt"  # 默认文件扩展名
+
+    def __init__(self, chunk_rows: int = 256, progress: Optional[Callable[[int, int], None]] = None):
+        self.chunk_rows = chunk_rows  # 每次写入的行数
+        self.progress = progress
+
+    @staticmethod
+    def tokens(names: List[str]) -> List[bytes]:
+        """获取每个标签对应的输出文本"""
+        return [b"0"] + [name.upper().encode('utf-8') for name in names]
+
+    def open(self, filename: str) -> BinaryIO:
+        """打开输出文件"""
+        return open(filename, 'wb')
+
+    def write(self, labels: np.ndarray, names: List[str], filename: str):
+        """将标签栅格写入文件
+        先写入同目录下的临时文件（文件名加 .part），完成后改名为目标文件，
+        写入失败或中止时删除临时文件，目标文件要么是完整的新内容，要么保持不变
+        """
+        temp = filename + ".part"
+        try:
+            with self.open(temp) as f:
+                self.write_to(f, labels, names)
+            os.replace(temp, filename)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+
+    def report(self, done: int, total: int):
+        """报告写入进度"""
+        if self.progress is not None:
+            self.progress(done, total)
+
+    def write_to(self, f: BinaryIO, labels: np.ndarray, names: List[str]):
+        """将标签栅格写入已打开的文件对象"""
+        raise NotImplementedError
+
+class TextMaskWriter(MaskWriter):
+    """文本格式：每个网格点占一行，按从左到右、从上到下的顺序输出区域名称或0"""
+    def write_to(self, f: BinaryIO, labels: np.ndarray, names: List[str]):
+        lines = [token + b"\n" for token in self.tokens(names)]
+        width = max(len(line) for line in lines)
+
+        # 通过定长字节表查表后直接输出内存；名称长度不同时末尾补齐，输出前按有效字节掩码去掉补齐部分
+        table = np.zeros((len(lines), width), dtype=np.uint8)
+        valid = np.zeros((len(lines), width), dtype=bool)
+        for index, line in enumerate(lines):
+            table[index, :len(line)] = np.frombuffer(line, dtype=np.uint8)
+            valid[index, :len(line)] = True
+        padded = not valid.all()
+        # 各行等长时将每行视为一个定长元素，查表时每个网格点只复制一个元素（如二值mask）
+        records = table.view(np.dtype((np.void, width))).ravel()
+        for start in range(0, labels.shape[0], self.chunk_rows):
+            chunk = labels[start:start + self.chunk_rows]
+            if padded:
+                f.write(table[chunk][valid[chunk]].tobytes())
+            else:
+                f.write(records[chunk].tobytes())
+            self.report(start + len(chunk), labels.shape[0])
+
+class GzipTextMaskWriter(TextMaskWriter):
+    """gzip压缩的文本格式"""
+    extension = ".txt.gz"
+
+    def __init__(self, chunk_rows: int = 256, progress: Optional[Callable[[int, int], None]] = None,
+                 compresslevel: int = 6):
+        super().__init__(chunk_rows, progress)
+        self.compresslevel = compresslevel
+
+    def open(self, filename: str) -> BinaryIO:
+        return gzip.open(filename, 'wb', compresslevel=self.compresslevel)
+
+class RleMaskWriter(MaskWriter):
+    """游程编码文本格式
+    第一行为 "#RLE 行数 列数"，之后每行为 "区域名称 连续点数"，按从左到右、从上到下的顺序展开
+    """
+    extension = ".rle"
+
+    def write_to(self, f: BinaryIO, labels: np.ndarray, names: List[str]):
+        rows, cols = labels.shape
+        f.write(f"#RLE {rows} {cols}\n".encode('utf-8'))
+
+        flat = labels.ravel()
+        if flat.size == 0:
+            return
+
+        # 找到所有值发生变化的位置，得到每个游程的起点和长度
+        starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+        lengths = np.diff(np.append(starts, flat.size))
+        values = flat[starts]
+
+        table = self.tokens(names)
+        step = self.chunk_rows * cols  # 每次写入的游程数
+        for start in range(0, len(starts), step):
+            block = zip(values[start:start + step].tolist(), lengths[start:start + step].tolist())
+            f.write(b"".join(b"%s %d\n" % (table[value], length) for value, length in block))
+            self.report(min(start + step, len(starts)), len(starts))
+
+class BinaryMaskWriter(MaskWriter):
+    """紧凑二进制格式
+    文件头: 魔数 b"MASKBIN1"，小端 uint32 行数、uint32 列数、uint16 区域数、uint8 每点字节数
+    随后依次为每个区域名称（uint8 长度 + UTF-8 字节），最后是按行优先排列的标签数据，
+    区域不超过255个时每点1字节，否则每点为2字节的小端 uint16
+    """
+    extension = ".bin"
+    MAGIC = b"MASKBIN1"
+    HEADER = struct.Struct('<IIHB')
+
+    def write_to(self, f: BinaryIO, labels: np.ndarray, names: List[str]):
+        if len(names) > np.iinfo(np.uint16).max:
+            raise ValueError(f"二进制mask格式最多支持{np.iinfo(np.uint16).max}个区域")
+        dtype = np.dtype(np.uint8) if len(names) <= np.iinfo(np.uint8).max else np.dtype('<u2')
+
+        rows, cols = labels.shape
+        f.write(self.MAGIC)
+        f.write(self.HEADER.pack(rows, cols, len(names), dtype.itemsize))
+        for token in self.tokens(names)[1:]:
+            f.write(struct.pack('<B', len(token)) + token)
+
+        for start in range(0, rows, self.chunk_rows):
+            f.write(labels[start:start + self.chunk_rows].astype(dtype, copy=False).tobytes())
+            self.report(min(start + self.chunk_rows, rows), rows)
+
+# 支持的mask输出格式
+MASK_WRITERS: Dict[str, Type[MaskWriter]] = {
+    "text": TextMaskWriter,
+    "rle": RleMaskWriter,
+    "binary": BinaryMaskWriter,
+    "gzip": GzipTextMaskWriter,
+}
+
+def get_mask_writer(encoding: str = "text", **kwargs) -> MaskWriter:
+    """根据格式名称创建mask写入器"""
+    if encoding not in MASK_WRITERS:
+        raise ValueError(f"不支持的mask格式: {encoding}")
+    return MASK_WRITERS[encoding](**kwargs)
@@ -0,0 +1,38 @@
+from typing import Optional, Tuple
+import numpy as np
+
+def summed_area_table(mask: np.ndarray) -> np.ndarray:
+    """计算二维前缀和（积分图），结果比输入多一行一列，table[r, c] 为 mask[:r, :c] 之和"""
+    rows, cols = mask.shape
+    table = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+    np.cumsum(mask, axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+def window_sums(table: np.ndarray, height: int, width: int) -> np.ndarray:
+    """根据积分图计算所有 height×width 窗口的元素和
+    结果的 [r, c] 对应左上角位于 (r, c) 的窗口
+    """
+    return (table[height:, width:] - table[:-height, width:]
+            - table[height:, :-width] + table[:-height, :-width])
+
+def rect_sum(table: np.ndarray, start_row: int, end_row: int, start_col: int, end_col: int) -> int:
+    """根据积分图计算矩形范围内的元素和，结束值不包含"""
+    return int(table[end_row, end_col] - table[start_row, end_col]
+               - table[end_row, start_col] + table[start_row, start_col])
+
+def first_fit(occupied: np.ndarray, height: int, width: int,
+              table: Optional[np.ndarray] = None) -> Optional[Tuple[int, int]]:
+    """按从上到下、从左到右的顺序查找第一个能容纳 height×width 的空闲位置
+    返回左上角的 (行, 列)，找不到时返回None
+    """
+    rows, cols = occupied.shape
+    if height <= 0 or width <= 0 or height > rows or width > cols:
+        return None
+    if table is None:
+        table = summed_area_table(occupied)
+    free = np.flatnonzero(window_sums(table, height, width) == 0)
+    if free.size == 0:
+        return None
+    row, col = divmod(int(free[0]), cols - width + 1)
+    return row, col
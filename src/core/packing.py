@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+class FreeSpaceMap:
+    """空闲空间查询结构
+    对每个网格记录从该网格开始向右连续空闲的长度，height×width 的位置可用
+    当且仅当从该位置起连续height行的向右空闲长度都不小于width
+    """
+    def __init__(self, occupied: np.ndarray, band_rows: int = 64):
+        self.rows, self.cols = occupied.shape
+        self.band_rows = band_rows  # 每次搜索的行数
+        self.right_run = self._right_runs(occupied)
+        self.row_max = self.right_run.max(axis=1)  # 每行最长的连续空闲长度
+        self._cursors: Dict[Tuple[int, int], int] = {}  # 每种尺寸的起始搜索行
+
+    def _right_runs(self, occupied: np.ndarray) -> np.ndarray:
+        """计算每个网格向右连续空闲的长度"""
+        columns = np.arange(self.cols, dtype=np.int32)
+        # 每个网格右侧（含自身）第一个被占用网格的列号，没有则为列数
+        next_occupied = np.where(occupied, columns, np.int32(self.cols))
+        next_occupied = np.minimum.accumulate(next_occupied[:, ::-1], axis=1)[:, ::-1]
+        return (next_occupied - columns).astype(np.int32)
+
+    def occupy(self, row: int, col: int, height: int, width: int):
+        """将矩形范围标记为已占用，只更新受影响的行"""
+        rows = slice(row, row + height)
+        self.right_run[rows, col:col + width] = 0
+        if col > 0:
+            limit = col - np.arange(col, dtype=np.int32)
+            np.minimum(self.right_run[rows, :col], limit, out=self.right_run[rows, :col])
+        self.row_max[rows] = self.right_run[rows].max(axis=1)
+
+    def _first_candidate_row(self, start: int, height: int, width: int) -> int:
+        """根据每行最长空闲长度，跳过不可能放下矩形的行，返回可能的最小起始行"""
+        wide_enough = self.row_max[start:] >= width
+        counts = np.zeros(wide_enough.size + 1, dtype=np.int32)
+        np.cumsum(wide_enough, out=counts[1:])
+        candidates = np.flatnonzero((counts[height:] - counts[:-height]) == height)
+        return start + int(candidates[0]) if candidates.size else self.rows
+
+    def _feasible(self, start: int, end: int, height: int, width: int) -> np.ndarray:
+        """计算左上角位于 [start, end) 行内的所有可用位置"""
+        fits = self.right_run[start:end + height - 1] >= width
+        # 通过倍增的方式对连续height行做逻辑与，每次合并的行数翻倍
+        span = 1
+        while span < height:
+            step = min(span, height - span)
+            fits = fits[:-step] & fits[step:]
+            span += step
+        return fits
+
+    def find(self, height: int, width: int, strategy: str = "first_fit") -> Optional[Tuple[int, int]]:
+        """查找可放置 height×width 矩形的位置，返回左上角 (行, 列)，找不到时返回None
+        first_fit: 从上到下、从左到右的第一个可用位置
+        best_fit: 在最靠上的可用行中，选择右侧剩余空闲最少（最贴合）的位置
+        """
+        if height <= 0 or width <= 0 or height > self.rows or width > self.cols:
+            return None
+
+        # 占用只会增加，因此同一尺寸的第一个可用位置不会向前移动
+        start = self._cursors.get((height, width), 0)
+        last_row = self.rows - height + 1
+        while start < last_row:
+            start = self._first_candidate_row(start, height, width)
+            if start >= last_row:
+                break
+            end = min(last_row, start + max(self.band_rows, height))
+            feasible = self._feasible(start, end, height, width)
+            rows_with_space = np.flatnonzero(feasible.any(axis=1))
+            if rows_with_space.size:
+                offset = int(rows_with_space[0])
+                row = start + offset
+                self._cursors[(height, width)] = row
+                candidates = np.flatnonzero(feasible[offset])
+                if strategy == "best_fit":
+                    slack = self.right_run[row, candidates] - width
+                    col = int(candidates[np.argmin(slack)])
+                else:
+                    col = int(candidates[0])
+                return row, col
+            start = end
+
+        self._cursors[(height, width)] = last_row
+        return None
+
+# 支持的排布策略
+PACKING_STRATEGIES = ("first_fit", "best_fit")
+
+def pack_rectangles(sizes: Sequence[Tuple[int, int]], occupied: np.ndarray,
+                    strategy: str = "first_fit", sort: bool = True) -> List[Optional[Tuple[int, int]]]:
+    """将一组矩形无重叠地排布到点阵的空闲位置中
+    sizes 为 (宽度, 高度) 列表，occupied 为已占用网格的布尔数组（第0行在最上方）
+    返回与 sizes 一一对应的左上角 (行, 列)，放不下的矩形对应None
+    sort为True时按面积从大到小依次放置，通常能得到更紧凑的排布
+    """
+    if strategy not in PACKING_STRATEGIES:
+        raise ValueError(f"不支持的排布策略: {strategy}")
+
+    free_space = FreeSpaceMap(np.asarray(occupied, dtype=bool))
+    order = range(len(sizes))
+    if sort:
+        order = sorted(order, key=lambda i: (-sizes[i][0] * sizes[i][1], -sizes[i][1], i))
+
+    positions: List[Optional[Tuple[int, int]]] = [None] * len(sizes)
+    for i in order:
+        width, height = sizes[i]
+        position = free_space.find(height, width, strategy)
+        if position is not None:
+            free_space.occupy(position[0], position[1], height, width)
+            positions[i] = position
+    return positions
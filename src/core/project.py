@@ -0,0 +1,194 @@
+"""项目文件的保存与加载
+
+项目文件(.maskproj)为紧凑二进制格式:
+    魔数 b"MASKPRJ1"，小端 uint32 文件头长度，UTF-8 JSON 文件头，
+    随后是按 ALIGNMENT 字节对齐的原始数组数据
+文件头记录点阵规格、区域名称，以及每个数组的 dtype、形状和相对数据区起点的偏移；
+区域的位置尺寸、颜色和放置状态各保存为一个数组，多边形区域的顶点依次保存在 polygon_points 中，
+polygon_offsets[i]:polygon_offsets[i+1] 为第i个区域的顶点（矩形区域为空），点阵数据保存为 points 数组。
+加载时小数组直接读入，点阵数据以写时复制的 np.memmap 映射，只有访问到的页才会读入内存。
+
+可选的JSON附属文件（项目文件名 + ".json"）以可读形式保存同样的区域信息和点阵数据摘要，
+便于比较差异，格式与 core.layout.load_layout 读取的布局文件兼容
+"""
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, Tuple
+import numpy as np
+from .geometry import Point
+from .grid import Grid
+from .layout import polygon_item
+from .region import Region
+
+PROJECT_EXTENSION = ".maskproj"
+PROJECT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # 版本1不含多边形顶点
+MAGIC = b"MASKPRJ1"
+HEADER_LENGTH = struct.Struct('<I')
+ALIGNMENT = 64  # 数组数据的对齐字节数
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def _region_arrays(regions: Dict[str, Region]) -> Dict[str, np.ndarray]:
+    """将区域属性整理为数组：(x, y, 宽度, 高度)、(r, g, b, a)、是否已放置和多边形顶点"""
+    items = list(regions.values())
+    counts = [len(r.points) for r in items]
+    return {
+        "region_geometry": np.array([(r.position.x(), r.position.y(), r.width, r.height) for r in items],
+                                    dtype=np.float64).reshape(-1, 4),
+        "region_colors": np.array([r.color for r in items], dtype=np.uint8).reshape(-1, 4),
+        "region_placed": np.array([r.is_placed for r in items], dtype=bool),
+        "polygon_offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+        "polygon_points": np.array([point for r in items for point in r.points],
+                                   dtype=np.float64).reshape(-1, 2),
+    }
+
+def _map_points(filename: str, entry: dict, data_start: int) -> np.memmap:
+    """以写时复制方式映射项目文件中的点阵数据，修改不会写回项目文件"""
+    return np.memmap(filename, dtype=np.dtype(entry["dtype"]), mode='c',
+                     offset=data_start + entry["offset"], shape=tuple(entry["shape"]))
+
+def _mapped_from(array: np.ndarray, filename: str) -> bool:
+    """数组是否为映射自该文件的np.memmap"""
+    mapped = getattr(array, 'filename', None)
+    return (isinstance(array, np.memmap) and mapped is not None and os.path.exists(filename)
+            and os.path.samefile(mapped, filename))
+
+def save_project(filename: str, grid: Grid, regions: Dict[str, Region], sidecar: bool = False):
+    """保存项目：点阵规格、点阵数据和全部区域；sidecar为True时同时写入JSON附属文件"""
+    arrays = _region_arrays(regions)
+    arrays["points"] = np.ascontiguousarray(grid.points)
+
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({
+        "version": PROJECT_VERSION,
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "names": list(regions),
+        "arrays": entries,
+    }, ensure_ascii=False).encode('utf-8')
+
+    # 点阵数据可能正映射自同一个项目文件（load_project 默认以 np.memmap 映射），
+    # 先写入临时文件（文件名加 .part），完成后改名为目标文件，写入期间原文件及其映射保持有效
+    temp = filename + ".part"
+    try:
+        with open(temp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            data_start = _aligned(f.tell())
+            for name, array in arrays.items():
+                if array.size == 0:
+                    continue
+                f.write(b"\0" * (data_start + entries[name]["offset"] - f.tell()))
+                f.write(memoryview(array).cast('B'))
+        remap = _mapped_from(grid.points, filename)
+        if remap:
+            # 部分系统（如Windows）不能替换仍被映射的文件：先将点阵数据读入内存并释放映射，
+            # 替换完成后再映射新文件中的点阵数据
+            grid.points = np.array(grid.points)
+        try:
+            os.replace(temp, filename)
+        except PermissionError as e:
+            raise OSError(f"无法替换项目文件，文件可能正被其他程序使用: {filename}") from e
+        if remap:
+            grid.points = _map_points(filename, entries["points"], data_start)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+    if sidecar:
+        write_sidecar(sidecar_filename(filename), grid, regions)
+
+def load_project(filename: str, mmap: bool = True) -> Tuple[Grid, Dict[str, Region]]:
+    """加载项目，返回 (点阵, 区域字典)
+    mmap为True时点阵数据以写时复制方式映射，修改不会写回项目文件；
+    占用位图不保存在项目中，由调用方放置区域后生成（GridView.set_grid 会自动放置已放置的区域）
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是有效的项目文件: {filename}")
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        header = json.loads(f.read(length).decode('utf-8'))
+        if header.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"不支持的项目文件版本: {header.get('version')}")
+        data_start = _aligned(f.tell())
+
+        def read_array(name: str) -> np.ndarray:
+            entry = header["arrays"][name]
+            f.seek(data_start + entry["offset"])
+            count = int(np.prod(entry["shape"]))
+            return np.fromfile(f, dtype=np.dtype(entry["dtype"]), count=count).reshape(entry["shape"])
+
+        geometry = read_array("region_geometry")
+        colors = read_array("region_colors")
+        placed = read_array("region_placed")
+        if "polygon_offsets" in header["arrays"]:
+            offsets = read_array("polygon_offsets").tolist()
+            polygon_points = read_array("polygon_points").tolist()
+        else:
+            offsets, polygon_points = [0] * (len(header["names"]) + 1), []
+        entry = header["arrays"]["points"]
+        if mmap:
+            points = _map_points(filename, entry, data_start)
+        else:
+            points = read_array("points")
+
+    grid = Grid(header["rows"], header["cols"], points=points)
+    regions: Dict[str, Region] = {}
+    for index, (name, (x, y, width, height), color, is_placed) in enumerate(zip(
+            header["names"], geometry.tolist(), colors.tolist(), placed.tolist())):
+        region = Region(name, int(width), int(height))
+        region.set_position(Point(x, y))
+        vertices = polygon_points[offsets[index]:offsets[index + 1]]
+        if vertices:
+            region.set_polygon([(x + px, y + py) for px, py in vertices])
+        region.color = tuple(color)
+        region.is_placed = is_placed
+        regions[name] = region
+    return grid, regions
+
+def sidecar_filename(filename: str) -> str:
+    """项目文件对应的JSON附属文件名"""
+    return filename + ".json"
+
+def _number(value: float):
+    """整数值的坐标输出为整数，使JSON便于阅读和比较"""
+    return int(value) if float(value).is_integer() else value
+
+def write_sidecar(filename: str, grid: Grid, regions: Dict[str, Region]):
+    """写入可读的JSON附属文件：点阵规格、点阵数据摘要和全部区域"""
+    points = np.ascontiguousarray(grid.points)
+    data = {
+        "version": PROJECT_VERSION,
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "points": {
+            "dtype": points.dtype.str,
+            "nonzero": int(np.count_nonzero(points)),
+            "sha1": hashlib.sha1(memoryview(points).cast('B')).hexdigest(),
+        },
+        "regions": [
+            {
+                "name": region.name,
+                "x": _number(region.position.x()),
+                "y": _number(region.position.y()),
+                "width": region.width,
+                "height": region.height,
+                "color": list(region.color),
+                "placed": region.is_placed,
+                **polygon_item(region),
+            }
+            for region in regions.values()
+        ],
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,148 @@
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+from .grid import allocate_array
+
+def _padded_blocks(array: np.ndarray, factor: int) -> np.ndarray:
+    """将数组补零到factor的整数倍，并整理为 (行块, factor, 列块, factor) 的形状"""
+    rows, cols = array.shape
+    padded_rows = -(-rows // factor) * factor
+    padded_cols = -(-cols // factor) * factor
+    if (padded_rows, padded_cols) != (rows, cols):
+        padded = np.zeros((padded_rows, padded_cols), dtype=array.dtype)
+        padded[:rows, :cols] = array
+        array = padded
+    return array.reshape(padded_rows // factor, factor, padded_cols // factor, factor)
+
+def _blocks(array: np.ndarray, factor: int) -> np.ndarray:
+    """将数组整理为 (行块, 列块, factor*factor) 的形状"""
+    blocks = _padded_blocks(array, factor)
+    return blocks.transpose(0, 2, 1, 3).reshape(blocks.shape[0], blocks.shape[2], -1)
+
+def pool_max(array: np.ndarray, factor: int) -> np.ndarray:
+    """最大值池化：每 factor×factor 个网格取最大值"""
+    if factor <= 1:
+        return array
+    blocks = _padded_blocks(array, factor)
+    # 先按行、再按列逐个切片取最大值，比直接对跨步轴做归约快得多
+    rows = blocks[:, 0]
+    for i in range(1, factor):
+        rows = np.maximum(rows, blocks[:, i])
+    result = rows[..., 0]
+    for j in range(1, factor):
+        result = np.maximum(result, rows[..., j])
+    return result
+
+def pool_mode(array: np.ndarray, factor: int) -> np.ndarray:
+    """众数池化：每 factor×factor 个网格中非0标签出现最多的值，全为0时为0"""
+    if factor <= 1:
+        return array
+    blocks = np.sort(_blocks(array, factor), axis=2)
+    size = blocks.shape[2]
+    # 排序后每段相同值的起点，通过相邻起点之差得到每个值的出现次数
+    starts = np.ones(blocks.shape, dtype=bool)
+    starts[..., 1:] = blocks[..., 1:] != blocks[..., :-1]
+    index = np.where(starts, np.arange(size), size)
+    next_start = np.minimum.accumulate(index[..., ::-1], axis=2)[..., ::-1]
+    next_start = np.concatenate((next_start[..., 1:], np.full(blocks.shape[:2] + (1,), size)), axis=2)
+    counts = np.where(starts & (blocks != 0), next_start - np.arange(size), 0)
+    best = counts.argmax(axis=2)
+    return np.take_along_axis(blocks, best[..., None], axis=2)[..., 0] * (counts.max(axis=2) > 0)
+
+POOLING_FUNCTIONS = {"max": pool_max, "mode": pool_mode}
+
+PYRAMID_MEMMAP_CELLS = 1 << 22  # 磁盘存储的点阵中，不少于该网格数的层也以np.memmap保存在存储目录下
+BUILD_BAND_ROWS = 256  # 生成一层时每次计算的行数，限制临时数组的大小
+
+class GridPyramid:
+    """点阵的多分辨率金字塔
+    第k层的每个元素对应原始点阵中 2^k×2^k 个网格：点为该范围内是否有有效点，
+    标签为该范围内区域标签的池化结果（众数池化逐层取2×2众数，是整体众数的近似）。
+    labels 为第0层的标签栅格（如 RegionManager 的导出标签栅格），默认为点阵的占用位图；
+    第0层直接引用点阵数据和标签栅格，不单独保存；所有层均按显示坐标（第0行在最上方）存储，
+    一直缩小到长边不超过 min_size 为止。点阵使用磁盘存储时，较大的层也保存在其存储目录下
+    """
+    def __init__(self, grid: 'Grid', pooling: str = "max", min_size: int = 64,
+                 labels: Optional[np.ndarray] = None):
+        self.grid = grid
+        self.labels = grid.occupancy if labels is None else labels
+        self.pooling = pooling
+        self.min_size = min_size
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []  # 第1层起的 (点, 标签)
+        self.build()
+
+    def _source(self, level: int, start_row: int, end_row: int,
+                start_col: int, end_col: int) -> Tuple[np.ndarray, np.ndarray]:
+        """第level层指定范围的 (点, 标签)，第0层从点阵数据中读取"""
+        if level == 0:
+            points = self.grid.get_window(start_row, end_row, start_col, end_col) != 0
+            return points, self.labels[start_row:end_row, start_col:end_col]
+        points, labels = self.levels[level - 1]
+        return (points[start_row:end_row, start_col:end_col],
+                labels[start_row:end_row, start_col:end_col])
+
+    def _shape(self, level: int) -> Tuple[int, int]:
+        """第level层的 (行数, 列数)"""
+        if level == 0:
+            return self.grid.rows, self.grid.cols
+        return self.levels[level - 1][0].shape
+
+    def _allocate(self, level: int, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """分配第level层的 (点, 标签) 数组"""
+        def filename(kind: str) -> Optional[str]:
+            if shape[0] * shape[1] < PYRAMID_MEMMAP_CELLS:
+                return None
+            return self.grid._storage_file(f"pyramid{level}_{kind}.npy")
+        return (allocate_array(shape, bool, filename("points")),
+                allocate_array(shape, self.labels.dtype, filename("labels")))
+
+    def build(self):
+        """从点阵数据重新生成所有层，每层按行分段计算"""
+        pool = POOLING_FUNCTIONS[self.pooling]
+        self.levels = []
+        rows, cols = self._shape(0)
+        while max(rows, cols) > self.min_size:
+            level_rows, level_cols = -(-rows // 2), -(-cols // 2)
+            level_points, level_labels = self._allocate(len(self.levels) + 1, (level_rows, level_cols))
+            for start in range(0, level_rows, BUILD_BAND_ROWS):
+                end = min(level_rows, start + BUILD_BAND_ROWS)
+                points, labels = self._source(len(self.levels), start * 2, min(rows, end * 2), 0, cols)
+                level_points[start:end] = pool_max(points, 2)
+                level_labels[start:end] = pool(labels, 2)
+            self.levels.append((level_points, level_labels))
+            rows, cols = level_rows, level_cols
+
+    def update(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """点阵或标签栅格中指定范围（显示坐标，结束值不包含）变化后，逐层重新计算受影响的元素"""
+        pool = POOLING_FUNCTIONS[self.pooling]
+        for level in range(1, len(self.levels) + 1):
+            # 上一层的 [start, end) 对应本层的 [start // 2, ceil(end / 2))
+            start_row, end_row = start_row // 2, -(-end_row // 2)
+            start_col, end_col = start_col // 2, -(-end_col // 2)
+            if start_row >= end_row or start_col >= end_col:
+                return
+            below_rows, below_cols = self._shape(level - 1)
+            points, labels = self._source(level - 1, start_row * 2, min(below_rows, end_row * 2),
+                                          start_col * 2, min(below_cols, end_col * 2))
+            level_points, level_labels = self.levels[level - 1]
+            level_points[start_row:end_row, start_col:end_col] = pool_max(points, 2)
+            level_labels[start_row:end_row, start_col:end_col] = pool(labels, 2)
+
+    def level_for(self, factor: int) -> int:
+        """为每像素 factor×factor 个网格的显示选择金字塔层
+        在该层上继续池化时倍数要取整到 2^level 的整数倍，选择实际倍数不超过 factor 的1.25倍的最高层
+        """
+        level = min(len(self.levels), int(math.log2(max(1, factor))))
+        while level > 0:
+            scale = 1 << level
+            if -(-factor // scale) * scale <= factor * 1.25:
+                break
+            level -= 1
+        return level
+
+    def window(self, level: int, start_row: int, end_row: int,
+               start_col: int, end_col: int) -> Tuple[np.ndarray, np.ndarray]:
+        """第level层中覆盖原始网格范围（结束值不包含）的 (点, 标签)，起始值需对齐到 2^level"""
+        scale = 1 << level
+        return self._source(level, start_row // scale, -(-end_row // scale),
+                            start_col // scale, -(-end_col // scale))
@@ -0,0 +1,166 @@
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+
+Mask = Tuple[int, int, np.ndarray]  # (起始行, 起始列, 布尔掩码)，左上角为掩码第0行第0列的网格
+
+# 判断交点是否恰好落在网格点上的容差
+EPSILON = 1e-9
+
+def _fill_spans(mask: np.ndarray, rows: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """将每行的列区间 [starts, ends)（掩码内的列号，已裁剪）批量置为True"""
+    keep = ends > starts
+    rows, starts, ends = rows[keep], starts[keep], ends[keep]
+    if rows.size == 0:
+        return
+    height, width = mask.shape
+    diff = np.zeros((height, width + 1), dtype=np.int32)
+    np.add.at(diff, (rows, starts), 1)
+    np.add.at(diff, (rows, ends), -1)
+    mask |= np.cumsum(diff[:, :width], axis=1) > 0
+
+def polygon_mask(xs, ys, closed: bool = True) -> Mask:
+    """扫描线填充多边形（奇偶规则），返回 (起始行, 起始列, 掩码)
+    closed为True时采样网格点 (列, 行)，边界上的点也算作被覆盖，与 region_cell_bounds 一致；
+    closed为False时采样网格中心 (列+0.5, 行+0.5)，采用左闭右开规则，边界相接（包括沿斜边相接）的
+    两个多边形不会占用同一个网格；轴对齐的矩形位于整数位置时与 region_footprint 的结果相同。
+    每条扫描线与所有边的交点一次性由NumPy计算，排序后两两配对即为填充区间
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    offset = 0.0 if closed else 0.5
+    start_row = math.ceil(ys.min() - offset)
+    start_col = math.ceil(xs.min() - offset)
+    if closed:
+        end_row = math.floor(ys.max() - offset) + 1
+        end_col = math.floor(xs.max() - offset) + 1
+    else:
+        end_row = math.ceil(ys.max() - offset)
+        end_col = math.ceil(xs.max() - offset)
+    mask = np.zeros((max(0, end_row - start_row), max(0, end_col - start_col)), dtype=bool)
+    if mask.size == 0:
+        return start_row, start_col, mask
+
+    # 边 (x0, y0) -> (x1, y1)；扫描线 y 与边相交的条件为 y 位于 [min(y0, y1), max(y0, y1)) 内
+    x0, y0 = xs, ys
+    x1, y1 = np.append(xs[1:], xs[0]), np.append(ys[1:], ys[0])
+    scan_y = (np.arange(start_row, end_row) + offset)[:, None]
+    crosses = (y0 <= scan_y) != (y1 <= scan_y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (x1 - x0) / (y1 - y0)
+        cross_x = np.where(crosses, x0 + (scan_y - y0) * slope, np.inf)
+    cross_x.sort(axis=1)
+    pairs = int(crosses.sum(axis=1).max()) // 2
+    if pairs:
+        left, right = cross_x[:, 0:2 * pairs:2], cross_x[:, 1:2 * pairs:2]
+        valid = np.isfinite(right)
+        rows = np.nonzero(valid)[0]
+        left, right = left[valid] - offset, right[valid] - offset
+        if closed:
+            starts, ends = np.ceil(left - EPSILON), np.floor(right + EPSILON) + 1
+        else:
+            starts, ends = np.ceil(left), np.ceil(right)
+        width = mask.shape[1]
+        _fill_spans(mask, rows,
+                    np.clip(starts - start_col, 0, width).astype(np.intp),
+                    np.clip(ends - start_col, 0, width).astype(np.intp))
+
+    if closed:
+        # 补上扫描线规则漏掉的边界点：边上的网格点和水平边
+        on_edge = (np.minimum(y0, y1) <= scan_y) & (scan_y <= np.maximum(y0, y1)) & (y0 != y1)
+        with np.errstate(invalid='ignore'):
+            edge_x = np.where(on_edge, x0 + (scan_y - y0) * slope, np.nan)
+        hit = on_edge & (np.abs(edge_x - np.round(edge_x)) < EPSILON)
+        rows, edges = np.nonzero(hit)
+        cols = np.round(edge_x[rows, edges]).astype(np.intp) - start_col
+        inside = (cols >= 0) & (cols < mask.shape[1])
+        mask[rows[inside], cols[inside]] = True
+        horizontal = np.flatnonzero((y0 == y1) & (y0 == np.round(y0)))
+        if horizontal.size:
+            width = mask.shape[1]
+            rows = y0[horizontal].astype(np.intp) - start_row
+            starts = np.ceil(np.minimum(x0, x1)[horizontal] - EPSILON) - start_col
+            ends = np.floor(np.maximum(x0, x1)[horizontal] + EPSILON) + 1 - start_col
+            _fill_spans(mask, rows, np.clip(starts, 0, width).astype(np.intp),
+                        np.clip(ends, 0, width).astype(np.intp))
+    return start_row, start_col, mask
+
+def clip_mask(mask: Mask, rows: int, cols: int) -> Tuple[int, int, int, int, np.ndarray]:
+    """将掩码裁剪到点阵范围内，返回 (起始行, 结束行, 起始列, 结束列, 裁剪后的掩码)，结束值不包含"""
+    start_row, start_col, array = mask
+    height, width = array.shape
+    row0, col0 = max(0, start_row), max(0, start_col)
+    row1 = max(row0, min(rows, start_row + height))
+    col1 = max(col0, min(cols, start_col + width))
+    return row0, row1, col0, col1, array[row0 - start_row:row1 - start_row, col0 - start_col:col1 - start_col]
+
+EMPTY_MASK: Mask = (0, 0, np.zeros((0, 0), dtype=bool))
+
+def mask_intersection(a: Mask, b: Mask) -> Mask:
+    """两个掩码同时为True的网格，只在两者外接矩形的交集窗口内逐网格求与
+    返回交集窗口的 (起始行, 起始列, 掩码)，窗口为空时返回 EMPTY_MASK
+    """
+    start_row, start_col = max(a[0], b[0]), max(a[1], b[1])
+    end_row = min(a[0] + a[2].shape[0], b[0] + b[2].shape[0])
+    end_col = min(a[1] + a[2].shape[1], b[1] + b[2].shape[1])
+    if start_row >= end_row or start_col >= end_col:
+        return EMPTY_MASK
+    return (start_row, start_col,
+            a[2][start_row - a[0]:end_row - a[0], start_col - a[1]:end_col - a[1]]
+            & b[2][start_row - b[0]:end_row - b[0], start_col - b[1]:end_col - b[1]])
+
+def masks_overlap(a: Mask, b: Mask) -> bool:
+    """两个掩码是否有同时为True的网格"""
+    return bool(mask_intersection(a, b)[2].any())
+
+def mask_cells(mask: Mask) -> Tuple[np.ndarray, np.ndarray]:
+    """掩码中为True的网格坐标，返回 (行数组, 列数组)，按行列顺序排列"""
+    start_row, start_col, array = mask
+    rows, cols = np.nonzero(array)
+    return rows + start_row, cols + start_col
+
+def region_cell_bounds(region: 'Region', rows: int, cols: int) -> Tuple[int, int, int, int]:
+    """计算区域在点阵中覆盖的行列范围，返回 (起始行, 结束行, 起始列, 结束列)，结束值不包含
+    与 Region.contains_point 保持一致：矩形边界上的点也算作被覆盖；多边形区域为其外接矩形的覆盖范围
+    """
+    x = region.position.x()
+    y = region.position.y()
+    start_col = max(0, math.ceil(x))
+    end_col = min(cols, math.floor(x + region.width) + 1)
+    start_row = max(0, math.ceil(y))
+    end_row = min(rows, math.floor(y + region.height) + 1)
+    return start_row, end_row, start_col, end_col
+
+def region_footprint(region: 'Region', rows: int, cols: int) -> Tuple[int, int, int, int]:
+    """计算区域实际占用的网格范围，返回 (起始行, 结束行, 起始列, 结束列)，结束值不包含
+    与 Region.intersects_with 保持一致：只有内部与区域相交的网格才算被占用，
+    因此边界相接的两个区域不会占用同一个网格；多边形区域为其外接矩形的占用范围
+    """
+    x = region.position.x()
+    y = region.position.y()
+    start_col = max(0, math.floor(x))
+    end_col = min(cols, math.ceil(x + region.width))
+    start_row = max(0, math.floor(y))
+    end_row = min(rows, math.ceil(y + region.height))
+    return start_row, max(start_row, end_row), start_col, max(start_col, end_col)
+
+def rasterize_regions(regions: Dict[str, 'Region'], rows: int, cols: int) -> Tuple[np.ndarray, List[str]]:
+    """将已放置的区域绘制到标签栅格中
+    标签0表示未被覆盖，标签i表示names[i-1]对应的区域
+    区域重叠时字典中靠前的区域优先，与逐点检查的结果一致
+    """
+    placed = [region for region in regions.values() if region.is_placed]
+    labels = np.zeros((rows, cols), dtype=np.min_scalar_type(len(placed)))
+
+    # 逆序绘制，使靠前的区域覆盖靠后的区域；多边形区域使用缓存的覆盖掩码
+    for label in range(len(placed), 0, -1):
+        region = placed[label - 1]
+        if region.is_polygon:
+            start_row, end_row, start_col, end_col, mask = clip_mask(region.cell_mask(), rows, cols)
+            labels[start_row:end_row, start_col:end_col][mask] = label
+            continue
+        start_row, end_row, start_col, end_col = region_cell_bounds(region, rows, cols)
+        if start_row < end_row and start_col < end_col:
+            labels[start_row:end_row, start_col:end_col] = label
+
+    return labels, [region.name for region in placed]
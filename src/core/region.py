@@ -1,56 +1,164 @@
-from typing import List, Tuple
+import math
+from typing import Dict, List, Tuple
 import numpy as np
-from PyQt6.QtGui import QColor
-from PyQt6.QtCore import QPointF, QRectF
+from .geometry import Color, Point, Rect
+from .rasterizer import EMPTY_MASK, Mask, mask_intersection, masks_overlap, polygon_mask
 
 class Region:
-    """分割区域类"""
+    """分割区域类
+    矩形区域由位置和宽高确定；多边形区域另有顶点序列 points（相对于位置的坐标），
+    位置和宽高为顶点的外接矩形。多边形栅格化得到的掩码按顶点和位置的小数部分缓存，
+    区域按整数格移动时直接平移缓存的掩码，只有顶点变化时才重新栅格化
+    """
     def __init__(self, name: str, width: int, height: int):
         self.name = name
         self.width = width   # 矩形宽度
         self.height = height # 矩形高度
-        self.position = QPointF(0, 0)  # 左上角位置
-        self.color = QColor()
+        self.position = Point(0, 0)  # 左上角位置
+        self.color: Color = (0, 0, 0, 255)
         self.is_placed = False  # 是否已放置
-    
-    def set_position(self, pos: QPointF):
-        """设置区域位置"""
-        self.position = pos
-    
-    def get_rect(self) -> QRectF:
-        """获取区域矩形"""
-        return QRectF(self.position.x(), self.position.y(), 
-                     self.width, self.height)
-    
-    def contains_point(self, point: QPointF) -> bool:
-        """检查点是否在区域内"""
-        return self.get_rect().contains(point) 
-    
+        self.points: Tuple[Tuple[float, float], ...] = ()  # 多边形顶点（相对于position），矩形区域为空
+        self._masks: Dict[bool, Tuple[tuple, Mask]] = {}  # 是否包含边界 -> (缓存键, 相对掩码)
+
+    def __getstate__(self):
+        # 掩码缓存可以随时重新生成，不随区域一起序列化
+        state = self.__dict__.copy()
+        state['_masks'] = {}
+        return state
+
+    def set_position(self, pos):
+        """设置区域位置，pos可以是Point或任何提供x()/y()的点（如QPointF）"""
+        self.position = Point(pos.x(), pos.y())
+
+    def snapped_position(self, x: float, y: float) -> Point:
+        """按整数格移动时 (x, y) 附近的位置：保留当前位置的小数部分
+        如从mask导入的只覆盖一行（一列）的区域位于半格处，移动后仍只覆盖一行（一列）
+        """
+        frac_x = self.position.x() - math.floor(self.position.x())
+        frac_y = self.position.y() - math.floor(self.position.y())
+        return Point(math.floor(x - frac_x + 0.5) + frac_x, math.floor(y - frac_y + 0.5) + frac_y)
+
+    @property
+    def is_polygon(self) -> bool:
+        """是否为多边形区域（至少3个顶点）"""
+        return len(self.points) >= 3
+
+    def vertices(self) -> List[Point]:
+        """多边形顶点的绝对坐标"""
+        x, y = self.position.x(), self.position.y()
+        return [Point(x + px, y + py) for px, py in self.points]
+
+    def set_polygon(self, vertices):
+        """设置多边形顶点（绝对坐标，Point/QPointF 或 (x, y)），位置和宽高更新为顶点的外接矩形"""
+        coords = [(p.x(), p.y()) if hasattr(p, 'x') else (p[0], p[1]) for p in vertices]
+        if not coords:
+            self.points = ()
+            self._masks.clear()
+            return
+        left = min(x for x, _ in coords)
+        top = min(y for _, y in coords)
+        self.position = Point(left, top)
+        self.width = max(x for x, _ in coords) - left
+        self.height = max(y for _, y in coords) - top
+        self.points = tuple((x - left, y - top) for x, y in coords)
+        self._masks.clear()
+
+    def add_point(self, point):
+        """在末尾添加一个顶点（绝对坐标），用于逐点绘制多边形"""
+        self.set_polygon(self.vertices() + [point])
+
+    def close_region(self):
+        """结束绘制多边形：去掉与起点重合的末尾顶点，顶点不足3个时抛出ValueError"""
+        vertices = self.vertices()
+        if len(vertices) > 1 and vertices[-1] == vertices[0]:
+            vertices.pop()
+        if len(vertices) < 3:
+            raise ValueError("多边形至少需要3个顶点")
+        self.set_polygon(vertices)
+
+    def _polygon_mask(self, closed: bool) -> Mask:
+        """多边形在点阵中的掩码，缓存的掩码相对于位置的整数部分，随区域平移"""
+        x, y = self.position.x(), self.position.y()
+        col, row = math.floor(x), math.floor(y)
+        key = (self.points, x - col, y - row)
+        cached = self._masks.get(closed)
+        if cached is None or cached[0] != key:
+            xs = [px + key[1] for px, _ in self.points]
+            ys = [py + key[2] for _, py in self.points]
+            start_row, start_col, mask = polygon_mask(xs, ys, closed)
+            mask.flags.writeable = False
+            cached = (key, (start_row, start_col, mask))
+            self._masks[closed] = cached
+        start_row, start_col, mask = cached[1]
+        return start_row + row, start_col + col, mask
+
+    def cell_mask(self) -> Mask:
+        """多边形覆盖的网格点（含边界，用于导出），返回 (起始行, 起始列, 只读掩码)，未裁剪到点阵范围"""
+        return self._polygon_mask(True)
+
+    def footprint_mask(self) -> Mask:
+        """区域占用的网格（用于占用位图和重叠检测），返回 (起始行, 起始列, 只读掩码)，未裁剪到点阵范围
+        矩形区域返回其占用范围的全True掩码
+        """
+        if self.is_polygon:
+            return self._polygon_mask(False)
+        x, y = self.position.x(), self.position.y()
+        start_col, start_row = math.floor(x), math.floor(y)
+        return (start_row, start_col,
+                np.ones((max(0, math.ceil(y + self.height) - start_row),
+                         max(0, math.ceil(x + self.width) - start_col)), dtype=bool))
+
+    def get_rect(self) -> Rect:
+        """获取区域矩形（多边形区域为外接矩形）"""
+        return Rect(self.position.x(), self.position.y(),
+                    self.width, self.height)
+
+    def contains_point(self, point) -> bool:
+        """检查点是否在区域内，多边形区域检查点所在的网格是否被占用"""
+        if not self.is_polygon:
+            return self.get_rect().contains(point)
+        start_row, start_col, mask = self.footprint_mask()
+        row = math.floor(point.y()) - start_row
+        col = math.floor(point.x()) - start_col
+        return 0 <= row < mask.shape[0] and 0 <= col < mask.shape[1] and bool(mask[row, col])
+
     def is_valid_position(self, grid_cols: int, grid_rows: int) -> bool:
         """检查区域位置是否有效（完全在点阵范围内）"""
         # 添加一个小的容差值来处理浮点数精度问题
         epsilon = 1e-10
-        
+
         # 左边界检查
         if self.position.x() < (0 - epsilon):
             return False
-        # 上边界检查    
+        # 上边界检查
         if self.position.y() < (0 - epsilon):
             return False
-        # 右边界检查（确保整个区域都在点阵内）    
+        # 右边界检查（确保整个区域都在点阵内）
         if self.position.x() + self.width > (grid_cols + epsilon):
             return False
-        # 下边界检查    
+        # 下边界检查
         if self.position.y() + self.height > (grid_rows + epsilon):
             return False
-        
-        return True 
-    
+
+        return True
+
+    def overlap_mask(self, other: 'Region') -> Mask:
+        """与其他区域同时占用的网格，返回外接矩形交集窗口内的 (起始行, 起始列, 掩码)
+        外接矩形不相交时返回 EMPTY_MASK，与 intersects_with 的判断一致
+        """
+        if not self.get_rect().intersects(other.get_rect()):
+            return EMPTY_MASK
+        return mask_intersection(self.footprint_mask(), other.footprint_mask())
+
     def intersects_with(self, other: 'Region') -> bool:
         """检查是否与其他区域重叠"""
         # 获取两个区域的矩形
         rect1 = self.get_rect()
         rect2 = other.get_rect()
-        
-        # 检查是否重叠
-        return rect1.intersects(rect2) 
\ No newline at end of file
+
+        # 检查是否重叠，含多边形时进一步比较两者的占用掩码
+        if not rect1.intersects(rect2):
+            return False
+        if not self.is_polygon and not other.is_polygon:
+            return True
+        return masks_overlap(self.footprint_mask(), other.footprint_mask())
@@ -1,67 +1,343 @@
-from typing import Dict
+import heapq
+import math
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
 from .region import Region
-from PyQt6.QtGui import QColor
-from PyQt6.QtCore import pyqtSignal, QObject
+from .geometry import Color, Point, Rect, color_from_hsv
+from .grid import LABEL_DTYPE
+from .label_raster import LabelRaster, Window, window_union, windows_intersect
+from .packing import pack_rectangles
+from .rasterizer import Mask
+from .signal import Signal
+from .spatial_index import SpatialIndex, overlapping_pairs
+from .trace import tracer
 
-class RegionManager(QObject):
+def region_name(index: int) -> str:
+    """第index个（从0开始）区域名称：a, b, ..., z, aa, ab, ..., az, ba, ...，与表格的列名规则相同"""
+    name = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(ord('a') + rest) + name
+    return name
+
+def name_index(name: str) -> Optional[int]:
+    """region_name 的逆运算，名称不是由小写字母组成时返回None"""
+    if not name or not all('a' <= c <= 'z' for c in name):
+        return None
+    index = 0
+    for c in name:
+        index = index * 26 + ord(c) - ord('a') + 1
+    return index - 1
+
+def default_region_color(name: str) -> Color:
+    """区域的默认颜色
+    相邻序号的色相相差黄金角（约137.5°），任意多个区域的色相都均匀分散；
+    每转过一圈（约2.6个区域）后轮换饱和度和明度，区域较多时色相接近的区域也能区分
+    """
+    index = name_index(name)
+    if index is None:
+        index = zlib.crc32(name.encode('utf-8'))
+    tier = (index * 2 // 5) % 3
+    return color_from_hsv(
+        round(index * 137.508) % 360,  # 色相
+        (100, 170, 230)[tier],  # 饱和度
+        (200, 160, 230)[tier],  # 明度
+        100   # 透明度
+    )
+
+class RegionManager:
     """区域管理器"""
-    # 添加信号
-    region_added = pyqtSignal(str)  # 发送新添加的区域名称
-    region_removed = pyqtSignal(str)  # 新增：发送被删除的区域名称
+    MAX_REGIONS = int(np.iinfo(LABEL_DTYPE).max)  # 最大区域数量，受占用位图标签类型限制
     
     def __init__(self):
-        super().__init__()  # 调用父类初始化
+        # 添加信号
+        self.region_added = Signal()  # 发送新添加的区域名称
+        self.region_removed = Signal()  # 新增：发送被删除的区域名称
+        # 批量更新（见 batch）结束时发送，参数为按操作顺序排列的名称列表
+        self.regions_added = Signal()
+        self.regions_removed = Signal()
+        self._batch_depth = 0
+        self._pending: List[Tuple[bool, str]] = []  # 批量更新期间的 (是否为添加, 区域名称)
         self.regions: Dict[str, Region] = {}
-        self.next_name = 'a'  # 下一个可用的区域名称
         self.used_names = set()  # 添加已使用名称的集合
+        # 名称分配：序号小于 _next_index 的名称要么已使用，要么在已释放序号的最小堆中
+        self._free_indices: List[int] = []
+        self._next_index = 0
+        self.spatial_index = SpatialIndex()  # 区域矩形的空间索引，用于快速重叠检测
+        self._order: Dict[str, int] = {}  # 区域名称 -> 添加序号，与 regions 的顺序一致
+        self._next_order = 0
+        # 导出用的标签栅格，设置点阵尺寸（set_grid_size）后随区域的添加、移动和删除增量更新
+        self.label_raster: Optional[LabelRaster] = None
+        # 标签栅格变化时发送 (起始行, 结束行, 起始列, 结束列)，显示坐标，结束值不包含；
+        # 批量更新期间的变化合并为一个范围，在结束时发送
+        self.labels_changed = Signal()
+        self._dirty: Optional[Window] = None
         
     def create_region(self, width: int, height: int) -> Region:
         """创建新区域"""
         # 检查是否还有可用名称
-        if len(self.regions) >= 26:
-            raise ValueError("已达到最大区域数量限制(26个)")
+        if len(self.regions) >= self.MAX_REGIONS:
+            raise ValueError(f"已达到最大区域数量限制({self.MAX_REGIONS}个)")
             
-        # 寻找最小的未使用名称
-        for c in range(ord('a'), ord('z') + 1):
-            name = chr(c)
-            if name not in self.used_names:
-                self.next_name = name
-                break
+        # 分配最小的未使用名称
+        name = self._allocate_name()
         
         # 创建新区域
-        region = Region(self.next_name, width, height)
+        region = Region(name, width, height)
         region.is_placed = False  # 明确设置初始状态
         
         # 设置区域颜色
-        color = QColor()
-        color.setHsv(
-            (ord(self.next_name) - ord('a')) * 30 % 360,  # 色相
-            100,  # 饱和度
-            200   # 明度
-        )
-        color.setAlpha(100)  # 设置透明度
-        region.color = color
+        region.color = default_region_color(name)
         
         # 保存区域和名称
-        self.regions[self.next_name] = region
-        self.used_names.add(self.next_name)  # 添加到已使用名称集合
-        
-        # 发送信号
-        self.region_added.emit(self.next_name)
+        self.add_region(region)
         
         return region
     
+    def _allocate_name(self) -> str:
+        """返回最小的未使用名称，O(log n)
+        已释放的序号可能随后又被 add_region 直接使用（如撤销删除），出堆时跳过这些序号
+        """
+        while self._free_indices:
+            name = region_name(heapq.heappop(self._free_indices))
+            if name not in self.used_names:
+                return name
+        while region_name(self._next_index) in self.used_names:
+            self._next_index += 1
+        self._next_index += 1
+        return region_name(self._next_index - 1)
+    
+    def add_region(self, region: Region):
+        """添加已创建好的区域（如从布局文件读取的区域）"""
+        if region.name in self.regions:
+            raise ValueError(f"区域名称已存在: {region.name}")
+        self.regions[region.name] = region
+        self.used_names.add(region.name)  # 添加到已使用名称集合
+        self.spatial_index.insert(region.name, region.get_rect())
+        self._order[region.name] = self._next_order
+        self._next_order += 1
+        self._update_raster(region.name)
+        
+        # 发送信号
+        if self._batch_depth:
+            self._pending.append((True, region.name))
+        else:
+            self.region_added.emit(region.name)
+    
+    def add_regions(self, regions: Iterable[Region]):
+        """批量添加区域，只发送一次 regions_added"""
+        with self.batch():
+            for region in regions:
+                self.add_region(region)
+    
+    def move_region(self, name: str, pos):
+        """移动区域，同时更新空间索引和标签栅格（区域的宽高或顶点也可能已被修改，如撤销移动时）"""
+        region = self.regions[name]
+        region.set_position(pos)
+        self.spatial_index.update(name, region.get_rect())
+        self._update_raster(name)
+    
+    def set_placed(self, name: str, placed: bool = True):
+        """设置区域的放置状态，已放置的区域绘制到标签栅格中"""
+        self.regions[name].is_placed = placed
+        self._update_raster(name)
+    
     def remove_region(self, name: str):
         """删除区域"""
         if name in self.regions:
             del self.regions[name]
             self.used_names.remove(name)  # 从已使用名称集合中移除 
-            self.region_removed.emit(name)  # 发送区域删除信号
+            index = name_index(name)
+            if index is not None and index < self._next_index:
+                heapq.heappush(self._free_indices, index)
+            self.spatial_index.remove(name)
+            del self._order[name]
+            self._update_raster(name)
+            # 发送区域删除信号
+            if self._batch_depth:
+                self._pending.append((False, name))
+            else:
+                self.region_removed.emit(name)
+    
+    def remove_regions(self, names: Iterable[str]):
+        """批量删除区域，只发送一次 regions_removed"""
+        with self.batch():
+            for name in list(names):
+                self.remove_region(name)
+    
+    @contextmanager
+    def batch(self):
+        """批量更新：期间的添加和删除不逐个发送 region_added/region_removed，
+        而是在最外层结束时按操作顺序，将连续的同类操作合并为一次 regions_added/regions_removed
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty is not None:
+                dirty, self._dirty = self._dirty, None
+                self.labels_changed.emit(*dirty)
+            if not self._batch_depth and self._pending:
+                pending, self._pending = self._pending, []
+                start = 0
+                for end in range(1, len(pending) + 1):
+                    if end == len(pending) or pending[end][0] != pending[start][0]:
+                        names = [name for _, name in pending[start:end]]
+                        (self.regions_added if pending[start][0] else self.regions_removed).emit(names)
+                        start = end
+    
+    def set_grid_size(self, rows: int, cols: int, storage_dir: Optional[str] = None):
+        """按点阵尺寸创建标签栅格并绘制全部已放置的区域，之后随区域变化增量更新
+        storage_dir 通常为点阵的 storage_dir，指定时标签栅格也以np.memmap保存在该目录下
+        """
+        with tracer.span("rebuild_labels", regions=len(self.regions), cells=rows * cols):
+            self.label_raster = LabelRaster(rows, cols, storage_dir)
+            self.label_raster.rebuild(self._placed_regions())
+        self._mark_dirty((0, rows, 0, cols))
+    
+    def _placed_regions(self) -> List[Region]:
+        return [region for region in self.regions.values() if region.is_placed]
+    
+    def _update_raster(self, name: str):
+        """区域添加、移动、放置或删除后更新标签栅格：重绘其旧覆盖范围和新覆盖范围
+        新旧范围相交时（如拖动）合并为一个窗口重绘
+        """
+        raster = self.label_raster
+        if raster is None:
+            return
+        region = self.regions.get(name)
+        old = raster.windows.get(name)
+        new = raster.cell_window(region) if region is not None and region.is_placed else None
+        if old is None and new is None:
+            return
+        raster.set_window(name, new)
+        if region is None:
+            raster.release(name)
+        if old is not None and new is not None and windows_intersect(old, new):
+            dirty = [window_union(old, new)]
+        else:
+            dirty = [window for window in (old, new) if window is not None]
+        for window in dirty:
+            names = sorted(raster.names_in(window), key=self._order.__getitem__)
+            raster.repaint(window, [self.regions[name] for name in names])
+            self._mark_dirty(window)
+    
+    def _mark_dirty(self, window: Window):
+        """发送标签栅格变化的范围，批量更新期间先合并"""
+        if self._batch_depth:
+            self._dirty = window if self._dirty is None else window_union(self._dirty, window)
+        else:
+            self.labels_changed.emit(*window)
+    
+    def export_labels(self) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """由标签栅格生成与 rasterize_regions(regions, rows, cols) 相同的 (标签栅格, 名称列表)
+        尚未设置点阵尺寸时返回None
+        """
+        if self.label_raster is None:
+            return None
+        return self.label_raster.export_labels([region.name for region in self._placed_regions()])
     
     def check_overlap(self, region: Region) -> bool:
         """检查区域是否与已有区域重叠"""
-        for existing_region in self.regions.values():
-            if existing_region != region and existing_region.is_placed:
-                if region.intersects_with(existing_region):
+        with tracer.span("check_overlap", region=region.name):
+            rect = region.get_rect()
+            # 区域可能被直接调用set_position移动过，先同步其在索引中的位置
+            if self.regions.get(region.name) is region:
+                self.spatial_index.update(region.name, rect)
+            
+            # 外接矩形相交后，含多边形的区域再比较占用掩码
+            for name in self.spatial_index.query(rect):
+                existing_region = self.regions[name]
+                if (existing_region is not region and existing_region.is_placed
+                        and region.intersects_with(existing_region)):
                     return True
-        return False 
\ No newline at end of file
+            return False
+    
+    def conflicts(self, region: Region) -> Dict[str, Mask]:
+        """区域与其他已放置区域的冲突网格
+        宽阶段由空间索引找出外接矩形相交的区域，窄阶段只在外接矩形交集窗口内对两者的占用掩码求与；
+        返回 {区域名称: 冲突网格的掩码 (起始行, 起始列, 掩码)}，只包含确有冲突网格的区域
+        """
+        rect = region.get_rect()
+        if self.regions.get(region.name) is region:
+            self.spatial_index.update(region.name, rect)
+        result = {}
+        for name in self.spatial_index.query(rect):
+            existing_region = self.regions[name]
+            if existing_region is region or not existing_region.is_placed:
+                continue
+            mask = region.overlap_mask(existing_region)
+            if mask[2].any():
+                result[name] = mask
+        return result
+    
+    def conflict_mask(self, region: Region) -> Mask:
+        """区域与其他已放置区域同时占用的全部网格，返回区域占用窗口内的 (起始行, 起始列, 掩码)"""
+        with tracer.span("conflict_mask", region=region.name):
+            start_row, start_col, footprint = region.footprint_mask()
+            result = np.zeros(footprint.shape, dtype=bool)
+            for row, col, mask in self.conflicts(region).values():
+                result[row - start_row:row - start_row + mask.shape[0],
+                       col - start_col:col - start_col + mask.shape[1]] |= mask
+            return start_row, start_col, result
+    
+    def find_overlaps(self) -> List[Tuple[str, str]]:
+        """所有相互重叠的已放置区域对（如检查导入的布局），按添加顺序排列
+        外接矩形由排序扫描批量求出相交的候选对，含多边形的候选对再比较占用掩码
+        """
+        placed = [region for region in self.regions.values() if region.is_placed]
+        boxes = [(r.position.x(), r.position.y(), r.position.x() + r.width, r.position.y() + r.height)
+                 for r in placed]
+        first, second = overlapping_pairs(boxes)
+        pairs = []
+        for i, j in sorted(zip(first.tolist(), second.tolist())):
+            a, b = placed[i], placed[j]
+            if (not a.is_polygon and not b.is_polygon) or a.intersects_with(b):
+                pairs.append((a.name, b.name))
+        return pairs
+    
+    def regions_in(self, rect) -> List[Region]:
+        """返回与矩形重叠的所有区域，按添加顺序排列"""
+        names = self.spatial_index.query(rect)
+        return [self.regions[name] for name in sorted(names, key=self._order.__getitem__)]
+    
+    def region_at(self, point) -> Optional[Region]:
+        """返回包含该点的已放置区域，没有时返回None"""
+        cell = Rect(math.floor(point.x()), math.floor(point.y()), 1, 1)
+        for region in self.regions_in(cell):
+            if region.is_placed and region.contains_point(point):
+                return region
+        return None
+    
+    def pack_regions(self, sizes: Sequence[Tuple[int, int]], grid: 'Grid',
+                     strategy: str = "first_fit") -> Tuple[List[Region], List[Tuple[int, int]]]:
+        """自动排布：为每个 (宽度, 高度) 创建区域，并无重叠地放置到点阵的空闲位置
+        返回 (已放置的区域列表, 放不下的尺寸列表)
+        """
+        if len(self.regions) + len(sizes) > self.MAX_REGIONS:
+            raise ValueError(f"区域数量将超过最大限制({self.MAX_REGIONS}个)")
+        
+        # 导出时矩形边界上的网格也算作被覆盖，宽w高h的区域覆盖 (w+1)×(h+1) 个网格，
+        # 占用位图只记录内部，向右、向下各扩展一格即为已有区域导出时覆盖的网格；
+        # 新区域同样按 (w+1)×(h+1) 排布，使导出的mask中相邻区域不共用行列
+        occupied = grid.occupancy != 0
+        covered = occupied.copy()
+        covered[:, 1:] |= occupied[:, :-1]
+        covered[1:, :] |= covered[:-1, :].copy()
+        positions = pack_rectangles([(width + 1, height + 1) for width, height in sizes], covered, strategy)
+        placed, failed = [], []
+        with self.batch():
+            for (width, height), position in zip(sizes, positions):
+                if position is None:
+                    failed.append((width, height))
+                    continue
+                region = self.create_region(width, height)
+                self.move_region(region.name, Point(position[1], position[0]))
+                self.set_placed(region.name)
+                grid.place_region(region)
+                placed.append(region)
+        return placed, failed
@@ -0,0 +1,29 @@
+from typing import Callable, List
+
+class Signal:
+    """轻量级信号，接口与pyqtSignal一致（connect/disconnect/emit），不依赖Qt
+    序列化时不保留已连接的回调，便于将模型对象传递给工作进程
+    """
+    __slots__ = ('_slots',)
+
+    def __init__(self):
+        self._slots: List[Callable] = []
+
+    def connect(self, slot: Callable):
+        """连接回调"""
+        self._slots.append(slot)
+
+    def disconnect(self, slot: Callable = None):
+        """断开回调，不指定时断开全部"""
+        if slot is None:
+            self._slots.clear()
+        else:
+            self._slots.remove(slot)
+
+    def emit(self, *args):
+        """依次调用所有已连接的回调"""
+        for slot in list(self._slots):
+            slot(*args)
+
+    def __reduce__(self):
+        return (Signal, ())
@@ -0,0 +1,94 @@
+import math
+from collections import defaultdict
+from typing import Dict, Set, Tuple
+import numpy as np
+from .geometry import Rect
+
+def overlapping_pairs(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """排序扫描求所有相交的矩形对（仅接触边界或面积为0的矩形不算相交，与 Rect.intersects 一致）
+    boxes 为 (n, 4) 的 (左, 上, 右, 下)；返回索引数组 (i, j)，i < j。
+    按左边界排序后，与第k个矩形在x方向相交的只可能是其后左边界小于其右边界的连续一段，
+    用 searchsorted 一次求出所有这样的候选段，再批量检查y方向
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    count = len(boxes)
+    order = np.argsort(boxes[:, 0], kind='stable')
+    left, top, right, bottom = boxes[order].T
+    ends = np.searchsorted(left, right, 'left')
+    counts = np.maximum(ends - np.arange(count) - 1, 0)
+    a = np.repeat(np.arange(count), counts)
+    b = a + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    keep = ((left[b] < right[a]) & (top[a] < bottom[b]) & (top[b] < bottom[a])
+            & (left < right)[a] & (top < bottom)[a] & (left < right)[b] & (top < bottom)[b])
+    i, j = order[a[keep]], order[b[keep]]
+    return np.minimum(i, j), np.maximum(i, j)
+
+class SpatialIndex:
+    """均匀分桶空间索引
+    将点阵按 bucket_size×bucket_size 划分为桶，每个矩形登记到其覆盖的所有桶中，
+    查询时只需检查与目标矩形相交的桶内的矩形，而不必遍历全部矩形
+    """
+    def __init__(self, bucket_size: int = 32):
+        self.bucket_size = bucket_size
+        self.buckets: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+        self.rects: Dict[str, Rect] = {}  # 每个键当前登记的矩形
+
+    def _bucket_range(self, rect: Rect) -> Tuple[int, int, int, int]:
+        """计算矩形覆盖的桶范围 (起始列, 结束列, 起始行, 结束行)，均包含"""
+        size = self.bucket_size
+        return (math.floor(rect.left() / size), math.floor(rect.right() / size),
+                math.floor(rect.top() / size), math.floor(rect.bottom() / size))
+
+    def _buckets(self, rect: Rect):
+        """遍历矩形覆盖的所有桶"""
+        start_x, end_x, start_y, end_y = self._bucket_range(rect)
+        for bx in range(start_x, end_x + 1):
+            for by in range(start_y, end_y + 1):
+                yield (bx, by)
+
+    def insert(self, key: str, rect: Rect):
+        """登记矩形"""
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = rect
+        for bucket in self._buckets(rect):
+            self.buckets[bucket].add(key)
+
+    def remove(self, key: str):
+        """移除矩形"""
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        for bucket in self._buckets(rect):
+            keys = self.buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.buckets[bucket]
+
+    def update(self, key: str, rect: Rect):
+        """更新矩形位置，覆盖的桶不变时只替换记录的矩形"""
+        old_rect = self.rects.get(key)
+        if old_rect == rect:
+            return
+        if old_rect is not None and self._bucket_range(old_rect) == self._bucket_range(rect):
+            self.rects[key] = rect
+            return
+        self.insert(key, rect)
+
+    def query(self, rect: Rect) -> Set[str]:
+        """返回与矩形重叠的所有键"""
+        candidates = set()
+        for bucket in self._buckets(rect):
+            keys = self.buckets.get(bucket)
+            if keys:
+                candidates.update(keys)
+        return {key for key in candidates if self.rects[key].intersects(rect)}
+
+    def clear(self):
+        """清空索引"""
+        self.buckets.clear()
+        self.rects.clear()
+
+    def __len__(self) -> int:
+        return len(self.rects)
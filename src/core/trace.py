@@ -0,0 +1,108 @@
+"""日志与性能追踪
+
+日志统一使用 logging.getLogger("maskforsyn") 及其子记录器，默认不输出调试信息；
+热点路径（绘制、拖动、重叠检测、导出）通过 tracer.span() 记录耗时区间，
+追踪默认关闭，关闭时 span() 返回共享的空对象，开销只有一次属性判断。
+记录的区间可以导出为Chrome Trace格式（chrome://tracing 或 Perfetto 打开）
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger("maskforsyn")
+
+def get_logger(name: str) -> logging.Logger:
+    """获取子模块的日志记录器"""
+    return logger.getChild(name)
+
+class _NullSpan:
+    """追踪关闭时使用的空区间"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """一个耗时区间，退出时写入追踪器"""
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+class Tracer:
+    """耗时区间追踪器"""
+    def __init__(self, max_events: int = 1_000_000):
+        self.enabled = False
+        self.max_events = max_events  # 最多保存的区间数量，超出后丢弃新区间
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        """开启追踪"""
+        self.enabled = True
+
+    def disable(self):
+        """关闭追踪"""
+        self.enabled = False
+
+    def clear(self):
+        """清空已记录的区间"""
+        with self._lock:
+            self.events.clear()
+            self.dropped = 0
+
+    def span(self, name: str, **args):
+        """记录一个耗时区间，用法: with tracer.span("paint", zoom=1.0): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name: str, start: float, duration: float, args: Dict[str, Any] = None):
+        """写入一个已完成的区间，时间单位为秒（time.perf_counter）"""
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    def export_chrome_trace(self, filename: str):
+        """导出为Chrome Trace JSON文件"""
+        with self._lock:
+            events = list(self.events)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        if self.dropped:
+            logger.warning("追踪区间超出上限，已丢弃 %d 个", self.dropped)
+
+# 全局追踪器
+tracer = Tracer()
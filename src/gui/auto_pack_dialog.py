@@ -0,0 +1,53 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout,
+                            QLabel, QPlainTextEdit, QComboBox, QPushButton)
+
+class AutoPackDialog(QDialog):
+    # 排布策略的显示名称
+    STRATEGIES = {
+        "首次适应": "first_fit",
+        "最佳适应": "best_fit",
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("自动排布分割区域")
+
+        # 创建布局
+        layout = QVBoxLayout()
+
+        # 尺寸列表输入
+        layout.addWidget(QLabel("区域尺寸（每行: 宽度 高度 [数量]）:"))
+        self.sizes_edit = QPlainTextEdit()
+        self.sizes_edit.setPlaceholderText("10 10\n20 5 4")
+        layout.addWidget(self.sizes_edit)
+
+        # 排布策略选择
+        strategy_layout = QHBoxLayout()
+        strategy_label = QLabel("策略:")
+        self.strategy_combo = QComboBox()
+        self.strategy_combo.addItems(self.STRATEGIES.keys())
+        strategy_layout.addWidget(strategy_label)
+        strategy_layout.addWidget(self.strategy_combo)
+        layout.addLayout(strategy_layout)
+
+        # 确定取消按钮
+        button_layout = QHBoxLayout()
+        ok_button = QPushButton("确定")
+        cancel_button = QPushButton("取消")
+        button_layout.addWidget(ok_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+        # 连接信号
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+
+    def get_sizes_text(self):
+        """获取输入的尺寸列表文本"""
+        return self.sizes_edit.toPlainText()
+
+    def get_strategy(self):
+        """获取选择的排布策略"""
+        return self.STRATEGIES[self.strategy_combo.currentText()]
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import List
+import numpy as np
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from core.mask_writer import get_mask_writer
+from core.trace import get_logger, tracer
+
+log = get_logger("export")
+
+# 后台导出时每次写入的行数，行块越小进度更新越频繁
+EXPORT_CHUNK_ROWS = 16
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+
+class ExportSignals(QObject):
+    """后台导出任务的信号，在工作线程中发送，由界面线程中的槽函数接收"""
+    progress = pyqtSignal(int)     # 进度百分比
+    finished = pyqtSignal(str, float)  # 输出文件, 耗时（秒）
+    failed = pyqtSignal(str)       # 错误信息
+    cancelled = pyqtSignal()
+
+class MaskExportTask(QRunnable):
+    """在线程池中导出mask文件
+    labels 和 names 为创建任务时的区域快照（如 RegionManager.export_labels() 返回的新数组），
+    导出期间继续编辑区域不会影响输出；写入器先写临时文件，完成后改名，取消或失败时不留下不完整的文件
+    """
+    def __init__(self, labels: np.ndarray, names: List[str], filename: str, encoding: str = "text"):
+        super().__init__()
+        self.labels = labels
+        self.names = names
+        self.filename = filename
+        self.encoding = encoding
+        self.signals = ExportSignals()
+        self._cancel = threading.Event()
+        self._percent = -1
+
+    def cancel(self):
+        """请求取消，写完当前行块后中止"""
+        self._cancel.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _report(self, done: int, total: int):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        percent = done * 100 // max(total, 1)
+        if percent != self._percent:
+            self._percent = percent
+            self.signals.progress.emit(percent)
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            with tracer.span("export", encoding=self.encoding, regions=len(self.names), cells=self.labels.size):
+                writer = get_mask_writer(self.encoding, chunk_rows=EXPORT_CHUNK_ROWS, progress=self._report)
+                writer.write(self.labels, self.names, self.filename)
+        except ExportCancelled:
+            log.debug("导出已取消: %s", self.filename)
+            self.signals.cancelled.emit()
+        except Exception as e:
+            log.exception("导出失败: %s", self.filename)
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(self.filename, time.perf_counter() - start)
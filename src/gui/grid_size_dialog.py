@@ -1,5 +1,6 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
                             QLabel, QSpinBox, QPushButton)
+from core.grid import CHIP_PRESETS
 
 class GridSizeDialog(QDialog):
     def __init__(self, parent=None):
@@ -13,8 +14,8 @@ class GridSizeDialog(QDialog):
         row_layout = QHBoxLayout()
         row_label = QLabel("行数:")
         self.row_spinbox = QSpinBox()
-        self.row_spinbox.setRange(1, 2000)  # 增大范围以适应更大的点阵
-        self.row_spinbox.setValue(318)  # 默认23k芯片的行数
+        self.row_spinbox.setRange(1, 20000)  # 支持千万级网格的点阵，大点阵使用磁盘存储
+        self.row_spinbox.setValue(CHIP_PRESETS["23k"][0])  # 默认23k芯片的行数
         row_layout.addWidget(row_label)
         row_layout.addWidget(self.row_spinbox)
         
@@ -22,17 +23,17 @@ class GridSizeDialog(QDialog):
         col_layout = QHBoxLayout()
         col_label = QLabel("列数:")
         self.col_spinbox = QSpinBox()
-        self.col_spinbox.setRange(1, 2000)  # 增大范围以适应更大的点阵
-        self.col_spinbox.setValue(74)  # 默认23k芯片的列数
+        self.col_spinbox.setRange(1, 20000)  # 支持千万级网格的点阵，大点阵使用磁盘存储
+        self.col_spinbox.setValue(CHIP_PRESETS["23k"][1])  # 默认23k芯片的列数
         col_layout.addWidget(col_label)
         col_layout.addWidget(self.col_spinbox)
         
         # 预设按钮
         preset_layout = QHBoxLayout()
-        btn_23k = QPushButton("23k (318×74)")
-        btn_680k = QPushButton("680k (636×1080)")  # 修改680k的预设值
-        preset_layout.addWidget(btn_23k)
-        preset_layout.addWidget(btn_680k)
+        for name, (rows, cols) in CHIP_PRESETS.items():
+            preset_button = QPushButton(f"{name} ({rows}×{cols})")
+            preset_button.clicked.connect(lambda _, r=rows, c=cols: self.set_preset(r, c))
+            preset_layout.addWidget(preset_button)
         
         # 确定取消按钮
         button_layout = QHBoxLayout()
@@ -52,8 +53,6 @@ class GridSizeDialog(QDialog):
         # 连接信号
         ok_button.clicked.connect(self.accept)
         cancel_button.clicked.connect(self.reject)
-        btn_23k.clicked.connect(lambda: self.set_preset(318, 74))
-        btn_680k.clicked.connect(lambda: self.set_preset(636, 1080))  # 修改680k的预设值
     
     def set_preset(self, rows, cols):
         """设置预设值"""
@@ -1,14 +1,56 @@
+import math
+import time
+import numpy as np
 from PyQt6.QtWidgets import (QWidget, QDialog, QMessageBox, 
                             QMainWindow)
-from PyQt6.QtGui import QPainter, QColor, QPen, QPainterPath, QBrush
+from PyQt6.QtGui import QPainter, QColor, QPen, QPainterPath, QBrush, QRegion, QPolygonF, QImage
 from PyQt6.QtCore import Qt, QPoint, QRect, QRectF, pyqtSignal, QPointF
 from core.region_manager import RegionManager
 from core.region import Region
+from core.geometry import Point, Rect
+from core.history import (CompositeCommand, CreateRegion, DeleteRegion, SetRegionGeometry,
+                          UndoStack, region_geometry)
+from core.trace import get_logger, tracer
 from gui.region_size_dialog import RegionSizeDialog
+from gui.qt_adapter import to_qcolor, to_qpointf, to_qrectf
+from gui.tile_cache import TileCache, render_tile, tile_cells_for, tile_range
+from gui.overview_renderer import overview_factor, render_overview
+from core.pyramid import GridPyramid
+
+log = get_logger("grid_view")
+
+# 拖动时与其他区域冲突的网格的高亮颜色（0xAARRGGBB）
+CONFLICT_COLOR = 0xC0FF0000
+
+# 高缩放级别下坐标标签固定绘制在控件左侧和上方的条带内，平移时需要单独重绘
+ROW_LABEL_STRIP = 40
+COL_LABEL_STRIP = 20
+
+def region_rects(region: QRegion, max_depth: int = 12):
+    """将重绘区域拆分为若干矩形（PyQt6的QRegion不提供矩形列表）
+    沿长边递归二分，直到每块只含一个矩形；平移露出的L形条带通常拆成十几个小矩形
+    """
+    bounds = region.boundingRect()
+    if region.rectCount() <= 1 or max_depth == 0:
+        return [bounds] if not bounds.isEmpty() else []
+    if bounds.width() >= bounds.height():
+        half = bounds.width() // 2
+        halves = (QRect(bounds.left(), bounds.top(), half, bounds.height()),
+                  QRect(bounds.left() + half, bounds.top(), bounds.width() - half, bounds.height()))
+    else:
+        half = bounds.height() // 2
+        halves = (QRect(bounds.left(), bounds.top(), bounds.width(), half),
+                  QRect(bounds.left(), bounds.top() + half, bounds.width(), bounds.height() - half))
+    rects = []
+    for part in halves:
+        rects.extend(region_rects(region.intersected(part), max_depth - 1))
+    return rects
 
 class GridView(QWidget):
     # 添加信号，用于通知坐标变化
     mouse_position_changed = pyqtSignal(str)
+    # 每帧绘制完成后发送耗时（毫秒）和重绘区域，仅在启用帧统计时发送
+    frame_rendered = pyqtSignal(float, QRect)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -31,6 +73,8 @@ class GridView(QWidget):
         
         # 启用鼠标追踪
         self.setMouseTracking(True)
+        # paintEvent会填充整个重绘区域，不需要Qt预先擦除背景，平移时可直接滚动已绘制的内容
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
         # 设置焦点策略，使得widget可以接收键盘事件
         self.setFocusPolicy(Qt.FocusPolicy.WheelFocus)
         
@@ -41,11 +85,13 @@ class GridView(QWidget):
         self.key_move_step = 50  # 每次按键移动的像素数
         
         self.region_manager = RegionManager()
+        self.region_manager.labels_changed.connect(self._on_labels_changed)
         self.current_region = None  # 当前正在绘制的区域
         
         # 添加区域创建相关的状态
-        self.is_creating_region = False
+        self.is_creating_region = False  # 是否正在逐点绘制多边形区域
         self.current_region = None
+        self.polygon_preview_pos = None  # 多边形下一个顶点的预览位置（网格坐标）
         
         # 添加鼠标悬停位置属性
         self.hover_pos = QPoint(-1, -1)  # 初始化为无效位置
@@ -54,6 +100,81 @@ class GridView(QWidget):
         
         self.dragging_region = None  # 当前正在拖动的区域
         self.drag_offset = QPointF(0, 0)  # 拖动偏移
+        # 移动已放置区域时记录其原始几何信息，创建新区域时为None
+        self.drag_start_geometry = None
+        self._drag_count = 0  # 拖动序号，同一次拖动的各步移动合并为一条撤销记录
+        # 拖动区域与其他区域冲突的网格：(起始行, 起始列, 像素缓冲区, 引用该缓冲区的QImage)，无冲突时为None
+        self.conflict_overlay = None
+        self.history = UndoStack()  # 区域编辑的撤销/重做记录
+        
+        # 网格图块缓存和每帧耗时统计
+        self.tile_cache = TileCache()
+        self.last_frame_time = 0.0  # 上一帧绘制耗时（秒）
+        self.last_repaint_rect = QRect()  # 上一帧的重绘区域（外接矩形）
+        self.last_repaint_area = 0  # 上一帧实际重绘的面积（像素）
+        self.frame_stats_enabled = False  # 是否发送帧统计信号
+        self.overview_pooling = "max"  # 小缩放比例下的池化方式：max 或 mode
+        self.pyramid = None  # 点阵的多分辨率金字塔，小缩放比例下从匹配的层绘制
+    
+    def set_grid(self, grid):
+        """设置点阵，并将已放置的区域同步到新点阵的占用位图中"""
+        if self.grid is not None:
+            self.grid.cells_changed.disconnect(self._on_cells_changed)
+        self.grid = grid
+        self.tile_cache.clear()
+        self.pyramid = None
+        for region in self.region_manager.regions.values():
+            if region.is_placed:
+                grid.place_region(region)
+        self.region_manager.set_grid_size(grid.rows, grid.cols, grid.storage_dir)
+        # 金字塔在区域同步后生成，之后随点阵和标签栅格的变化增量更新
+        self._build_pyramid()
+        grid.cells_changed.connect(self._on_cells_changed)
+        self.update()
+    
+    def set_project(self, grid, regions):
+        """用加载的项目替换当前点阵和全部区域"""
+        self.dragging_region = None
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        with self.region_manager.batch():
+            self.region_manager.remove_regions(self.region_manager.regions)
+            self.region_manager.add_regions(regions.values())
+        self.history.clear()
+        self.set_grid(grid)
+
+    def replace_regions(self, regions):
+        """用一组新区域替换全部区域（如从mask文件导入的区域），已放置的区域同步到占用位图中"""
+        self.dragging_region = None
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        with self.region_manager.batch():
+            for name in list(self.region_manager.regions):
+                self.region_manager.remove_region(name)
+                if self.grid:
+                    self.grid.remove_region(name)
+            for region in regions.values():
+                self.region_manager.add_region(region)
+                if self.grid and region.is_placed:
+                    self.grid.place_region(region)
+        self.history.clear()
+        self.update()
+
+    def _build_pyramid(self):
+        """由点阵数据和导出用的标签栅格生成金字塔，小缩放比例下显示的区域与导出的mask一致"""
+        self.pyramid = GridPyramid(self.grid, self.overview_pooling,
+                                   labels=self.region_manager.label_raster.labels)
+    
+    def _on_labels_changed(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """标签栅格变化后，增量更新金字塔中受影响的部分，只重绘该范围在屏幕上覆盖的部分"""
+        if self.pyramid is None:
+            return
+        self.pyramid.update(start_row, end_row, start_col, end_col)
+        self.update(self.cells_screen_rect(start_row, end_row, start_col, end_col))
+    
+    def _on_cells_changed(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """点阵数据或占用位图变化后，增量更新金字塔中受影响的部分，并使对应的缓存图块失效"""
+        if self.pyramid is not None:
+            self.pyramid.update(start_row, end_row, start_col, end_col)
+        self.invalidate_cells(start_row, end_row, start_col, end_col)
     
     @property
     def current_cell_size(self):
@@ -109,8 +230,8 @@ class GridView(QWidget):
             new_pos = self.grid_to_screen(QPointF(old_pos.x(), old_pos.y()))
             delta = mouse_pos - QPoint(int(new_pos.x()), int(new_pos.y()))
             self.offset += delta
-        except Exception as e:
-            print(f"缩放调整错误: {e}")
+        except Exception:
+            log.exception("缩放调整错误")
         
         self.update()
     
@@ -125,74 +246,147 @@ class GridView(QWidget):
             grid_pos = self.screen_to_grid(event.pos())
             # 检查是否点击在区域内
             if self.dragging_region.contains_point(grid_pos):
-                # 计算区域中心点
-                region_center = QPointF(
-                    self.dragging_region.position.x() + self.dragging_region.width / 2,
-                    self.dragging_region.position.y() + self.dragging_region.height / 2
-                )
-                # 计算鼠标点击位置相对于区域中心的偏移
-                self.drag_offset = QPointF(grid_pos.x() - region_center.x(),
-                                         grid_pos.y() - region_center.y())
+                self._set_drag_offset(grid_pos)
                 self.setCursor(Qt.CursorShape.SizeAllCursor)
             else:
                 # 如果点击在区域外，取消拖动
                 self.dragging_region = None
                 self.setCursor(Qt.CursorShape.ArrowCursor)
+        elif event.button() == Qt.MouseButton.LeftButton and self.grid and not self.is_creating_region:
+            # 按下已放置的区域时开始移动该区域
+            grid_pos = self.screen_to_grid(event.pos())
+            region = self.region_manager.region_at(grid_pos)
+            if region is not None:
+                self.dragging_region = region
+                self.drag_start_geometry = region_geometry(region)
+                self._drag_count += 1
+                self._set_drag_offset(grid_pos)
+                self.setCursor(Qt.CursorShape.SizeAllCursor)
         elif self.is_creating_region and event.button() == Qt.MouseButton.LeftButton:
             # 开始创建新区域或添加点到当前区域
             grid_pos = self.screen_to_grid(event.pos())
             if 0 <= grid_pos.x() < self.grid.cols and 0 <= grid_pos.y() < self.grid.rows:
+                vertex = self._snap_vertex(grid_pos)
                 if not self.current_region:
                     # 开始新区域
-                    self.current_region = self.region_manager.create_region()
+                    try:
+                        self.current_region = self.region_manager.create_region(0, 0)
+                    except ValueError as e:
+                        QMessageBox.warning(self, "错误", str(e))
+                        return
+                elif len(self.current_region.points) >= 3 and vertex == self.current_region.vertices()[0]:
+                    # 回到起点时完成绘制
+                    self._finish_polygon()
+                    return
                 
                 # 添加点到当前区域
-                self.current_region.add_point(QPointF(grid_pos.x(), grid_pos.y()))
+                self.current_region.add_point(vertex)
                 self.update()
         elif self.is_creating_region and event.button() == Qt.MouseButton.RightButton:
             # 右键完成区域创建
             if self.current_region and len(self.current_region.points) >= 3:
-                self.current_region.close_region()
-                self.is_creating_region = False
-                self.current_region = None
-                self.setCursor(Qt.CursorShape.ArrowCursor)
-                # 取消工具栏按钮的选中状态
-                from PyQt6.QtWidgets import QMainWindow  # 添加导入
-                parent = self.parent()
-                if isinstance(parent, QMainWindow):
-                    parent.create_region_action.setChecked(False)
-                self.update()
+                self._finish_polygon()
+    
+    def mouseDoubleClickEvent(self, event):
+        """绘制多边形时双击完成绘制"""
+        if (self.is_creating_region and event.button() == Qt.MouseButton.LeftButton
+                and self.current_region and len(self.current_region.points) >= 3):
+            self._finish_polygon()
+        else:
+            super().mouseDoubleClickEvent(event)
+    
+    @staticmethod
+    def _snap_vertex(grid_pos) -> Point:
+        """多边形顶点吸附到最近的网格点"""
+        return Point(round(grid_pos.x()), round(grid_pos.y()))
+    
+    def start_polygon_creation(self):
+        """开始逐点绘制多边形区域：左键添加顶点，双击、右键或回到起点完成"""
+        if not self.grid:
+            return
+        self.is_creating_region = True
+        self.current_region = None
+        self.polygon_preview_pos = None
+        self.setCursor(Qt.CursorShape.CrossCursor)
+    
+    def cancel_polygon_creation(self):
+        """取消多边形绘制，删除未完成的区域"""
+        if self.current_region is not None:
+            self.region_manager.remove_region(self.current_region.name)
+        self.is_creating_region = False
+        self.current_region = None
+        self.polygon_preview_pos = None
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        self.update()
+    
+    def _finish_polygon(self):
+        """完成多边形绘制：位置有效且不重叠时放置区域，否则删除"""
+        region = self.current_region
+        try:
+            region.close_region()
+        except ValueError:
+            return
+        # 顶点改变了外接矩形，同步空间索引
+        self.region_manager.move_region(region.name, region.position)
+        self.current_region = None
+        self.is_creating_region = False
+        self.polygon_preview_pos = None
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        if (not region.is_valid_position(self.grid.cols, self.grid.rows)
+                or self.region_manager.check_overlap(region)):
+            log.debug("多边形区域 %s 无效或与已有区域重叠，已删除", region.name)
+            self.region_manager.remove_region(region.name)
+            QMessageBox.warning(self, "错误", "多边形与已有区域重叠或超出点阵范围，请重新绘制")
+        else:
+            self.region_manager.set_placed(region.name)
+            self.grid.place_region(region)
+            self.history.push(CreateRegion(region))
+            log.debug("多边形区域 %s 放置完成，%d 个顶点", region.name, len(region.points))
+        # 取消工具栏按钮的选中状态
+        window = self.window()
+        if isinstance(window, QMainWindow):
+            window.polygon_action.setChecked(False)
+        self.update()
+    
+    def _set_drag_offset(self, grid_pos):
+        """记录鼠标按下位置相对于拖动区域中心的偏移"""
+        region_center = QPointF(
+            self.dragging_region.position.x() + self.dragging_region.width / 2,
+            self.dragging_region.position.y() + self.dragging_region.height / 2
+        )
+        self.drag_offset = QPointF(grid_pos.x() - region_center.x(),
+                                   grid_pos.y() - region_center.y())
     
     def mouseReleaseEvent(self, event):
         """处理鼠标释放事件"""
         if event.button() == Qt.MouseButton.MiddleButton:
             self.is_panning = False
             self.setCursor(Qt.CursorShape.ArrowCursor)
+            return
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.conflict_overlay = None  # 拖动结束，不再高亮冲突网格
+        if event.button() == Qt.MouseButton.LeftButton and self.dragging_region and self.drag_start_geometry:
+            self._finish_move()
         elif event.button() == Qt.MouseButton.LeftButton and self.dragging_region:
-            print(f"\n鼠标释放前状态:")
-            print(f"  - region名称: {self.dragging_region.name}")
-            print(f"  - is_placed: {self.dragging_region.is_placed}")
-            print(f"  - manager中的is_placed: {self.region_manager.regions[self.dragging_region.name].is_placed}")
-            
             # 检查是否与其他区域重叠
             if self.region_manager.check_overlap(self.dragging_region):
                 # 重叠，删除区域并显示警告
                 name = self.dragging_region.name
+                log.debug("区域 %s 与已有区域重叠，已删除", name)
                 self.region_manager.remove_region(name)
                 self.dragging_region = None
                 self.setCursor(Qt.CursorShape.ArrowCursor)
                 QMessageBox.warning(self, "错误", "区域与已有区域重叠，请重新放置")
             else:
-                # 先更新region_manager中的状态
+                # 更新region_manager中的状态
                 name = self.dragging_region.name
-                self.region_manager.regions[name].is_placed = True
-                # 再更新dragging_region的状态
-                self.dragging_region.is_placed = True
+                self.region_manager.set_placed(name)
+                # 同步点阵的占用位图
+                self.grid.place_region(self.dragging_region)
+                self.history.push(CreateRegion(self.dragging_region))
                 
-                print(f"\n设置is_placed后:")
-                print(f"  - region名称: {name}")
-                print(f"  - dragging_region的is_placed: {self.dragging_region.is_placed}")
-                print(f"  - manager中的is_placed: {self.region_manager.regions[name].is_placed}")
+                log.debug("区域 %s 放置于 (%d, %d)", name,
+                          self.dragging_region.position.x(), self.dragging_region.position.y())
                 
                 # 清除拖动状态
                 self.dragging_region = None
@@ -202,13 +396,31 @@ class GridView(QWidget):
             if isinstance(self.parent(), QMainWindow):
                 self.parent().create_region_action.setChecked(False)
             
-            print("\n状态更新后的所有区域:")
-            for name, region in self.region_manager.regions.items():
-                print(f"区域 {name}:")
-                print(f"  - is_placed: {region.is_placed}")
-            
             self.update()
     
+    def _finish_move(self):
+        """结束移动已放置的区域：位置有效时更新占用位图，否则恢复到原位置"""
+        region = self.dragging_region
+        if (self.region_manager.check_overlap(region)
+                or not region.is_valid_position(self.grid.cols, self.grid.rows)):
+            # 恢复原位置，这一步与拖动过程中的记录合并后相互抵消
+            self._record_move(region, self.drag_start_geometry)
+            QMessageBox.warning(self, "错误", "区域与已有区域重叠，已恢复到原位置")
+        self.grid.place_region(region)
+        log.debug("区域 %s 移动到 (%d, %d)", region.name, region.position.x(), region.position.y())
+        self.dragging_region = None
+        self.drag_start_geometry = None
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        self.update()
+    
+    def _record_move(self, region: Region, geometry):
+        """将区域移动到指定几何位置，并记录到本次拖动的撤销记录中"""
+        before = region_geometry(region)
+        x, y, region.width, region.height = geometry
+        self.region_manager.move_region(region.name, Point(x, y))
+        self.history.push(SetRegionGeometry(region.name, before, geometry,
+                                            merge_key=("drag", self._drag_count)))
+    
     def mouseMoveEvent(self, event):
         """处理鼠标移动事件"""
         # 处理视图平移
@@ -216,65 +428,22 @@ class GridView(QWidget):
             delta = event.pos() - self.last_mouse_pos
             self.offset += delta
             self.last_mouse_pos = event.pos()
-            self.update()
+            self.scroll_view(delta.x(), delta.y())
             return  # 拖动时不处理悬停效果
         
         # 处理区域拖动
         if self.dragging_region:
-            grid_pos = self.screen_to_grid(event.pos())
-            
-            # 首先限制grid_pos在有效范围内
-            grid_pos.setX(max(0, min(self.grid.cols, grid_pos.x())))
-            grid_pos.setY(max(0, min(self.grid.rows, grid_pos.y())))
-            
-            # 计算新的中心位置（取整到最近的整数）
-            center_x = round(grid_pos.x() - self.drag_offset.x())
-            center_y = round(grid_pos.y() - self.drag_offset.y())
-            
-            # 从中心位置计算左上角位置
-            new_x = round(center_x - self.dragging_region.width / 2)
-            new_y = round(center_y - self.dragging_region.height / 2)
-            
-            # 限制在网格范围内
-            max_x = self.grid.cols - self.dragging_region.width
-            max_y = self.grid.rows - self.dragging_region.height
-            
-            # 确保位置是整数，并严格限制在有效范围内
-            new_x = max(0, min(int(max_x), int(new_x)))
-            new_y = max(0, min(int(max_y), int(new_y)))
-            
-            # 更新区域位置
-            self.dragging_region.set_position(QPointF(new_x, new_y))
-            
-            # 检查位置是否有效和是否重叠
-            is_valid = self.dragging_region.is_valid_position(self.grid.cols, self.grid.rows)
-            is_overlapping = self.region_manager.check_overlap(self.dragging_region)
-            
-            # 更新region_manager中的状态
-            name = self.dragging_region.name
-            if name in self.region_manager.regions:
-                self.region_manager.regions[name].position = self.dragging_region.position
-                self.region_manager.regions[name].is_placed = True
-            
-            # 更新dragging_region的状态
-            self.dragging_region.is_placed = True
-            
-            if not is_valid or is_overlapping:
-                self.setCursor(Qt.CursorShape.ForbiddenCursor)
-            else:
-                self.setCursor(Qt.CursorShape.SizeAllCursor)
-            
-            self.update()
-            
-            # 更新状态栏显示
-            position_text = f"区域 {self.dragging_region.name.upper()}: ({int(new_x)}, {int(new_y)})"
-            if not is_valid:
-                position_text += " - 位置无效"
-            elif is_overlapping:
-                position_text += " - 与其他区域重叠"
-            self.mouse_position_changed.emit(position_text)
+            with tracer.span("drag", region=self.dragging_region.name):
+                self._drag_region_to(event.pos())
             return
         
+        # 绘制多边形时更新下一条边的预览
+        if self.is_creating_region and self.current_region:
+            vertex = self._snap_vertex(self.screen_to_grid(event.pos()))
+            if vertex != self.polygon_preview_pos:
+                self.polygon_preview_pos = vertex
+                self.update()
+        
         # 更新鼠标位置
         pos = event.pos()
         grid_pos = self.screen_to_grid(pos)
@@ -319,6 +488,92 @@ class GridView(QWidget):
                 # 清除坐标显示
                 self.mouse_position_changed.emit("(-,-)")
     
+    def _drag_region_to(self, pos):
+        """将正在拖动的区域移动到鼠标位置，并更新光标和状态栏"""
+        old_position = self.dragging_region.position
+        old_rect = self.region_screen_rect(self.dragging_region)
+        grid_pos = self.screen_to_grid(pos)
+        
+        # 首先限制grid_pos在有效范围内
+        grid_pos.setX(max(0, min(self.grid.cols, grid_pos.x())))
+        grid_pos.setY(max(0, min(self.grid.rows, grid_pos.y())))
+        
+        # 计算新的中心位置（取整到最近的整数）
+        center_x = round(grid_pos.x() - self.drag_offset.x())
+        center_y = round(grid_pos.y() - self.drag_offset.y())
+        
+        # 从中心位置计算左上角位置
+        new_x = round(center_x - self.dragging_region.width / 2)
+        new_y = round(center_y - self.dragging_region.height / 2)
+        
+        # 限制在网格范围内
+        max_x = self.grid.cols - self.dragging_region.width
+        max_y = self.grid.rows - self.dragging_region.height
+        
+        # 取整并严格限制在有效范围内，保留区域位置原有的小数部分（如导入的半格区域）
+        new_x = max(0, min(int(max_x), int(new_x)))
+        new_y = max(0, min(int(max_y), int(new_y)))
+        snapped = self.dragging_region.snapped_position(new_x, new_y)
+        new_x = snapped.x() - 1 if snapped.x() > max_x else snapped.x()
+        new_y = snapped.y() - 1 if snapped.y() > max_y else snapped.y()
+        
+        # 更新区域位置，移动已放置的区域时记录撤销信息
+        if self.drag_start_geometry is not None:
+            self._record_move(self.dragging_region,
+                              (new_x, new_y, self.dragging_region.width, self.dragging_region.height))
+        else:
+            self.region_manager.move_region(self.dragging_region.name, Point(new_x, new_y))
+        
+        # 检查位置是否有效和是否重叠
+        is_valid = self.dragging_region.is_valid_position(self.grid.cols, self.grid.rows)
+        is_overlapping = self.region_manager.check_overlap(self.dragging_region)
+        conflict_count = self._update_conflicts(self.dragging_region) if is_overlapping else 0
+        if not is_overlapping:
+            self.conflict_overlay = None
+        
+        # 更新region_manager中的状态
+        name = self.dragging_region.name
+        if not self.dragging_region.is_placed:
+            if name in self.region_manager.regions:
+                self.region_manager.set_placed(name)
+            else:
+                self.dragging_region.is_placed = True
+        
+        if not is_valid or is_overlapping:
+            self.setCursor(Qt.CursorShape.ForbiddenCursor)
+        else:
+            self.setCursor(Qt.CursorShape.SizeAllCursor)
+        
+        # 只重绘区域移动前后覆盖的屏幕范围
+        if self.dragging_region.position != old_position:
+            self.update(old_rect)
+            self.update(self.region_screen_rect(self.dragging_region))
+        
+        # 更新状态栏显示
+        position_text = f"区域 {self.dragging_region.name.upper()}: ({new_x:g}, {new_y:g})"
+        if not is_valid:
+            position_text += " - 位置无效"
+        elif is_overlapping:
+            position_text += f" - 与其他区域重叠（{conflict_count} 个网格）"
+        self.mouse_position_changed.emit(position_text)
+    
+    def _update_conflicts(self, region: Region) -> int:
+        """计算区域与其他已放置区域冲突的网格，生成高亮图像，返回冲突网格数"""
+        start_row, start_col, mask = self.region_manager.conflict_mask(region)
+        height, width = mask.shape
+        pixels = np.ascontiguousarray(np.where(mask, np.uint32(CONFLICT_COLOR), np.uint32(0)))
+        image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32)
+        self.conflict_overlay = (start_row, start_col, pixels, image)
+        return int(np.count_nonzero(mask))
+    
+    def _draw_conflicts(self, painter: QPainter):
+        """将冲突网格的高亮图像按网格尺寸缩放绘制（不做平滑，每个网格为一个色块）"""
+        start_row, start_col, pixels, image = self.conflict_overlay
+        cell_size = self.current_cell_size
+        target = QRectF(self.grid_to_screen(QPointF(start_col, start_row)),
+                        QRectF(0, 0, image.width() * cell_size, image.height() * cell_size).size())
+        painter.drawImage(target, image)
+    
     def screen_to_grid(self, pos):
         """屏幕坐标转网格坐标"""
         try:
@@ -326,8 +581,8 @@ class GridView(QWidget):
             x = (pos.x() - self.offset.x()) / cell_size
             y = (pos.y() - self.offset.y()) / cell_size
             return QPointF(x, y)  # 返回浮点坐标
-        except Exception as e:
-            print(f"坐标转换错误: {e}")
+        except Exception:
+            log.exception("坐标转换错误")
             return QPointF(0, 0)
     
     def grid_to_screen(self, pos):
@@ -337,15 +592,48 @@ class GridView(QWidget):
         y = pos.y() * cell_size + self.offset.y()
         return QPointF(float(x), float(y))  # 返回QPointF而不是QPoint
     
-    def get_visible_range(self):
-        """获取当前可见的网格范围"""
+    def _screen_rect(self, left: float, top: float, right: float, bottom: float) -> QRect:
+        """网格坐标范围在屏幕上覆盖的像素范围，向外扩展边框线宽"""
+        cell_size = self.current_cell_size
+        left = math.floor(self.offset.x() + left * cell_size) - 2
+        top = math.floor(self.offset.y() + top * cell_size) - 2
+        right = math.ceil(self.offset.x() + right * cell_size) + 2
+        bottom = math.ceil(self.offset.y() + bottom * cell_size) + 2
+        return QRect(left, top, right - left, bottom - top)
+    
+    def region_screen_rect(self, region: Region) -> QRect:
+        """区域在屏幕上覆盖的像素范围，包含边框线宽"""
+        x, y = region.position.x(), region.position.y()
+        return self._screen_rect(x, y, x + region.width, y + region.height)
+    
+    def cells_screen_rect(self, start_row: int, end_row: int, start_col: int, end_col: int) -> QRect:
+        """网格范围（结束值不包含）在屏幕上覆盖的像素范围"""
+        return self._screen_rect(start_col, start_row, end_col, end_row)
+    
+    def scroll_view(self, dx: int, dy: int):
+        """视图平移后滚动已绘制的内容，只重绘新露出的条带"""
+        if dx == 0 and dy == 0:
+            return
+        if abs(dx) >= self.width() or abs(dy) >= self.height():
+            self.update()
+            return
+        # scroll会移动控件已绘制的像素，并为露出的区域安排重绘
+        self.scroll(dx, dy)
+        # 坐标标签固定在控件边缘，不随内容移动，单独重绘
+        if self.zoom_levels[self.current_zoom_index] >= 2.0:
+            self.update(QRect(0, 0, ROW_LABEL_STRIP, self.height()))
+            self.update(QRect(0, 0, self.width(), COL_LABEL_STRIP))
+    
+    def get_visible_range(self, visible_rect: QRect = None):
+        """获取当前可见的网格范围，可指定屏幕区域（默认为整个控件）"""
         if not self.grid:
             return QRect()
             
         cell_size = self.current_cell_size
         
         # 计算可见区域的网格范围
-        visible_rect = self.rect()
+        if visible_rect is None:
+            visible_rect = self.rect()
         start_col = max(0, int((visible_rect.left() - self.offset.x()) / cell_size))
         start_row = max(0, int((visible_rect.top() - self.offset.y()) / cell_size))
         end_col = min(self.grid.cols, int((visible_rect.right() - self.offset.x()) / cell_size) + 1)
@@ -356,10 +644,14 @@ class GridView(QWidget):
     def paintEvent(self, event):
         if not self.grid:
             return
-            
+        
+        frame_start = time.perf_counter()
         painter = QPainter(self)
         rect = event.rect()
-        painter.fillRect(rect, QColor(240, 240, 240))
+        # 平移时重绘区域是L形条带，按拆分后的矩形分别绘制，避免渲染整个外接矩形
+        paint_rects = region_rects(event.region())
+        for paint_rect in paint_rects:
+            painter.fillRect(paint_rect, QColor(240, 240, 240))
         
         cell_size = self.current_cell_size
         visible_range = self.get_visible_range()
@@ -376,62 +668,25 @@ class GridView(QWidget):
             painter.setPen(QColor(100, 100, 100))
             painter.drawRect(left, top, width, height)
             
-            # 在边界框内绘制点
-            for row in range(visible_range.top(), visible_range.bottom()):
-                for col in range(visible_range.left(), visible_range.right()):
-                    if (0 <= row < self.grid.rows and 
-                        0 <= col < self.grid.cols and 
-                        self.grid.get_point(row, col) == 1):
-                        x = int(self.offset.x() + col * cell_size)
-                        y = int(self.offset.y() + row * cell_size)
-                        # 根据缩放比例调整点的透明度
-                        alpha = min(255, int(255 * cell_size))
-                        painter.setPen(QColor(0, 0, 0, alpha))
-                        painter.drawPoint(x, y)
+            # 在边界框内一次性绘制点阵和区域的栅格图像，只渲染重绘区域覆盖的部分
+            for paint_rect in paint_rects:
+                self._draw_overview(painter, self.get_visible_range(paint_rect), cell_size)
         else:
-            # 网格线绘制代码
-            if cell_size >= 4:
-                painter.setPen(QColor(200, 200, 200))
-                # 绘制水平网格线
-                for row in range(visible_range.top(), visible_range.bottom() + 1):
-                    if row <= self.grid.rows:  # 修改条件，包含最后一行
-                        y = int(self.offset.y() + row * cell_size)
-                        painter.drawLine(
-                            int(self.offset.x() + visible_range.left() * cell_size),
-                            y,
-                            int(self.offset.x() + (visible_range.right() + 1) * cell_size),  # 修改这里，确保线段长度一致
-                            y
-                        )
-                
-                # 绘制垂直网格线
-                for col in range(visible_range.left(), visible_range.right() + 1):
-                    if col <= self.grid.cols:  # 修改条件，包含最后一列
-                        x = int(self.offset.x() + col * cell_size)
-                        painter.drawLine(
-                            x,
-                            int(self.offset.y() + visible_range.top() * cell_size),
-                            x,
-                            int(self.offset.y() + (visible_range.bottom() + 1) * cell_size)  # 修改这里，确保线段长度一致
-                        )
+            # 从图块缓存中绘制网格（背景、网格线和点）
+            for paint_rect in paint_rects:
+                self._draw_tiles(painter, self.get_visible_range(paint_rect), int(cell_size))
             
-            # 正常绘制点阵
-            for row in range(visible_range.top(), visible_range.bottom() + 1):
-                for col in range(visible_range.left(), visible_range.right() + 1):
-                    if 0 <= row < self.grid.rows and 0 <= col < self.grid.cols:
-                        x = int(self.offset.x() + col * cell_size)
-                        y = int(self.offset.y() + row * cell_size)
-                        
-                        # 简化悬停效果的判断
-                        is_hover = (col == self.hover_pos.x() and row == self.hover_pos.y())
-                        
-                        # 根据状态设置颜色
-                        if self.grid.get_point(row, col) == 0:
-                            color = QColor(220, 220, 220) if is_hover else QColor(255, 255, 255)
-                        else:
-                            color = QColor(50, 50, 50) if is_hover else QColor(0, 0, 0)
-                        
-                        painter.fillRect(x + 1, y + 1, 
-                                       int(cell_size - 1), int(cell_size - 1), color)
+            # 悬停效果只重绘一个格子，不写入图块缓存
+            if (0 <= self.hover_pos.y() < self.grid.rows and 
+                0 <= self.hover_pos.x() < self.grid.cols):
+                x = int(self.offset.x() + self.hover_pos.x() * cell_size)
+                y = int(self.offset.y() + self.hover_pos.y() * cell_size)
+                if self.grid.get_point(self.hover_pos.y(), self.hover_pos.x()) == 0:
+                    color = QColor(220, 220, 220)
+                else:
+                    color = QColor(50, 50, 50)
+                painter.fillRect(x + 1, y + 1, 
+                               int(cell_size - 1), int(cell_size - 1), color)
         
         # 在高缩放级别下显示坐标
         if self.zoom_levels[self.current_zoom_index] >= 2.0:
@@ -453,40 +708,120 @@ class GridView(QWidget):
         if cell_size > 2:  # 只在足够大时绘制区域
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
             
-            # 添加调试信息
-            print("\n当前所有区域状态：")
-            for name, region in self.region_manager.regions.items():
-                print(f"区域 {name}:")
-                print(f"  - 位置: ({region.position.x()}, {region.position.y()})")
-                print(f"  - 尺寸: {region.width}×{region.height}")
-                print(f"  - 是否放置: {region.is_placed}")
-                print(f"  - 位置是否有效: {region.is_valid_position(self.grid.cols, self.grid.rows)}")
-            
-            # 绘制所有区域，包括正在拖动的和已放置的
-            for name, region in self.region_manager.regions.items():
+            # 通过空间索引只绘制与重绘区域相交的区域，包括正在拖动的和已放置的
+            # 查询范围向外扩展一格，包含边框线宽
+            query_rect = Rect((rect.left() - self.offset.x()) / cell_size - 1,
+                              (rect.top() - self.offset.y()) / cell_size - 1,
+                              rect.width() / cell_size + 2, rect.height() / cell_size + 2)
+            for region in self.region_manager.regions_in(query_rect):
+                if not event.region().intersects(self.region_screen_rect(region)):
+                    continue
                 if region.is_placed or (self.dragging_region and region.name == self.dragging_region.name):
                     is_invalid = not region.is_valid_position(self.grid.cols, self.grid.rows)
                     self._draw_region(painter, region, is_invalid=is_invalid)
+            
+            if self.dragging_region is not None and self.conflict_overlay is not None:
+                self._draw_conflicts(painter)
+            
+            if self.current_region and self.current_region.points:
+                self._draw_polygon_in_progress(painter, self.current_region)
+        
+        painter.end()
+        self.last_frame_time = time.perf_counter() - frame_start
+        self.last_repaint_rect = rect
+        self.last_repaint_area = sum(r.width() * r.height() for r in paint_rects)
+        if tracer.enabled:
+            tracer.record("paint", frame_start, self.last_frame_time,
+                          {"zoom": self.zoom_levels[self.current_zoom_index],
+                           "rect": [rect.x(), rect.y(), rect.width(), rect.height()]})
+        if self.frame_stats_enabled:
+            self.frame_rendered.emit(self.last_frame_time * 1000, rect)
+    
+    def _draw_overview(self, painter: QPainter, visible_range: QRect, cell_size: float):
+        """小缩放比例下，将可见范围的点阵和区域标签栅格渲染为一张图像后整体绘制"""
+        if visible_range.width() <= 0 or visible_range.height() <= 0:
+            return
+        
+        # 池化方式改变后重新生成金字塔
+        if self.pyramid.pooling != self.overview_pooling:
+            self._build_pyramid()
+        
+        # 起始行列对齐到池化倍数，使平移时每个像素对应的网格块保持不变
+        _, factor = overview_factor(cell_size, self.pyramid)
+        start_row = visible_range.top() - visible_range.top() % factor
+        start_col = visible_range.left() - visible_range.left() % factor
+        end_row = visible_range.top() + visible_range.height()
+        end_col = visible_range.left() + visible_range.width()
+        
+        pixels, image, factor = render_overview(
+            self.grid, self.region_manager.regions,
+            start_row, end_row, start_col, end_col, cell_size, pyramid=self.pyramid,
+            region_labels=self.region_manager.label_raster.region_labels
+        )
+        target = QRectF(self.offset.x() + start_col * cell_size,
+                        self.offset.y() + start_row * cell_size,
+                        image.width() * factor * cell_size,
+                        image.height() * factor * cell_size)
+        painter.drawImage(target, image)
+    
+    def _draw_tiles(self, painter: QPainter, visible_range: QRect, cell_size: int):
+        """绘制可见范围内的网格图块，未缓存的图块先渲染再放入缓存"""
+        if visible_range.width() <= 0 or visible_range.height() <= 0:
+            return
+        
+        tile_cells = tile_cells_for(cell_size)
+        start_row, end_row, start_col, end_col = tile_range(visible_range, tile_cells)
+        tile_pixels = tile_cells * cell_size
+        for tile_row in range(start_row, end_row):
+            for tile_col in range(start_col, end_col):
+                key = (cell_size, tile_cells, tile_row, tile_col)
+                pixmap = self.tile_cache.get(key)
+                if pixmap is None:
+                    pixmap = render_tile(self.grid, cell_size, tile_cells, tile_row, tile_col)
+                    self.tile_cache.put(key, pixmap)
+                painter.drawPixmap(int(self.offset.x()) + tile_col * tile_pixels,
+                                   int(self.offset.y()) + tile_row * tile_pixels, pixmap)
+        
+        # 图块只包含每个格子左上方的网格线，补画点阵右侧和下方的边界线
+        if cell_size >= 4:
+            painter.setPen(QColor(200, 200, 200))
+            right = int(self.offset.x()) + self.grid.cols * cell_size
+            bottom = int(self.offset.y()) + self.grid.rows * cell_size
+            painter.drawLine(int(self.offset.x()), bottom, right, bottom)
+            painter.drawLine(right, int(self.offset.y()), right, bottom)
+    
+    def invalidate_cells(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """点阵数据变化后，使对应范围（结束值不包含）的缓存图块失效，只重绘该范围在屏幕上覆盖的部分"""
+        self.tile_cache.invalidate_cells(start_row, end_row, start_col, end_col)
+        self.update(self.cells_screen_rect(start_row, end_row, start_col, end_col))
     
     def _draw_region(self, painter: QPainter, region: Region, is_invalid: bool = False):
         """绘制区域"""
-        rect = region.get_rect()
+        rect = to_qrectf(region.get_rect())
         screen_rect = QRectF(
             self.grid_to_screen(rect.topLeft()),
             self.grid_to_screen(rect.bottomRight())
         )
         
         # 根据是否有效设置颜色
-        color = region.color
+        color = to_qcolor(region.color)
         if is_invalid:
             color = QColor(255, 0, 0, 100)  # 无效位置显示红色
         
-        # 绘制半透明填充
-        painter.fillRect(screen_rect, color)
-        
-        # 绘制边框
-        painter.setPen(QPen(color.darker(150), 2))
-        painter.drawRect(screen_rect)
+        if region.is_polygon:
+            # 多边形区域：半透明填充和边框
+            polygon = QPolygonF([self.grid_to_screen(to_qpointf(vertex)) for vertex in region.vertices()])
+            painter.setPen(QPen(color.darker(150), 2))
+            painter.setBrush(color)
+            painter.drawPolygon(polygon, Qt.FillRule.OddEvenFill)
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+        else:
+            # 绘制半透明填充
+            painter.fillRect(screen_rect, color)
+            
+            # 绘制边框
+            painter.setPen(QPen(color.darker(150), 2))
+            painter.drawRect(screen_rect)
         
         # 绘制区域名称
         font = painter.font()
@@ -494,6 +829,25 @@ class GridView(QWidget):
         painter.setFont(font)
         painter.drawText(screen_rect, Qt.AlignmentFlag.AlignCenter, region.name.upper())
     
+    def _draw_polygon_in_progress(self, painter: QPainter, region: Region):
+        """绘制正在绘制的多边形：已有的边、顶点和到鼠标位置的预览边"""
+        points = [self.grid_to_screen(to_qpointf(vertex)) for vertex in region.vertices()]
+        if self.polygon_preview_pos is not None:
+            preview = self.grid_to_screen(to_qpointf(self.polygon_preview_pos))
+        else:
+            preview = None
+        color = to_qcolor(region.color)
+        painter.setPen(QPen(color.darker(150), 2))
+        painter.drawPolyline(QPolygonF(points))
+        if preview is not None:
+            painter.setPen(QPen(color.darker(150), 1, Qt.PenStyle.DashLine))
+            painter.drawLine(points[-1], preview)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color.darker(150))
+        for point in points:
+            painter.drawEllipse(point, 3, 3)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+    
     def keyPressEvent(self, event):
         """处理键盘按键事件"""
         # 获取当前鼠标位置作为缩放中心点
@@ -564,7 +918,7 @@ class GridView(QWidget):
                 region = self.region_manager.create_region(width, height)
                 center = self.rect().center()
                 grid_pos = self.screen_to_grid(center)
-                region.set_position(QPointF(grid_pos.x() - width/2, grid_pos.y() - height/2))
+                self.region_manager.move_region(region.name, Point(grid_pos.x() - width/2, grid_pos.y() - height/2))
                 self.dragging_region = region
                 # 确保新创建的region是未放置状态
                 self.dragging_region.is_placed = False
@@ -580,11 +934,21 @@ class GridView(QWidget):
             if isinstance(self.parent(), QMainWindow):
                 self.parent().create_region_action.setChecked(False)
     
+    def auto_pack(self, sizes, strategy: str = "first_fit"):
+        """自动排布一组区域，返回 (已放置的区域列表, 放不下的尺寸列表)"""
+        placed, failed = self.region_manager.pack_regions(sizes, self.grid, strategy)
+        if placed:
+            self.history.push(CompositeCommand("自动排布", [CreateRegion(region) for region in placed]))
+        self.update()
+        return placed, failed
+    
     def cancel_region_creation(self):
         """取消区域创建"""
-        if self.dragging_region:
+        if self.dragging_region and self.drag_start_geometry is None:
             name = self.dragging_region.name
             self.region_manager.remove_region(name)
+            if self.grid:
+                self.grid.remove_region(name)
             self.dragging_region = None
             self.setCursor(Qt.CursorShape.ArrowCursor)
             self.update()
@@ -592,10 +956,28 @@ class GridView(QWidget):
     def delete_region(self, name: str):
         """删除区域"""
         if name in self.region_manager.regions:
+            region = self.region_manager.regions[name]
+            # 尚未放置的新区域不记录撤销信息
+            committed = region is not self.dragging_region or self.drag_start_geometry is not None
             # 如果正在拖动这个区域，取消拖动
             if self.dragging_region and self.dragging_region.name == name:
                 self.dragging_region = None
+                self.drag_start_geometry = None
                 self.setCursor(Qt.CursorShape.ArrowCursor)
             # 从管理器中删除区域
             self.region_manager.remove_region(name)
+            if self.grid:
+                self.grid.remove_region(name)
+            if committed:
+                self.history.push(DeleteRegion(region))
+            self.update()
+    
+    def undo(self):
+        """撤销最近一次区域编辑，拖动区域时不响应"""
+        if self.dragging_region is None and self.history.undo(self.region_manager, self.grid):
+            self.update()
+    
+    def redo(self):
+        """重做最近一次被撤销的区域编辑，拖动区域时不响应"""
+        if self.dragging_region is None and self.history.redo(self.region_manager, self.grid):
             self.update()
\ No newline at end of file
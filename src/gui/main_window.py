@@ -1,14 +1,37 @@
+import tempfile
 from PyQt6.QtWidgets import (QMainWindow, QToolBar, QPushButton, 
                             QStatusBar, QMessageBox, QDialog, QLabel, QHBoxLayout, QWidget, QSizePolicy,
-                            QFileDialog)
-from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt
+                            QFileDialog, QProgressBar)
+from PyQt6.QtGui import QAction, QKeySequence
+from PyQt6.QtCore import Qt, QThreadPool
 from gui.grid_view import GridView
+from gui.export_worker import MaskExportTask
 from gui.grid_size_dialog import GridSizeDialog
+from gui.auto_pack_dialog import AutoPackDialog
 from core.grid import Grid
+from core.layout import parse_region_sizes
+from core.mask_import import import_mask
+from core.rasterizer import rasterize_regions
+from core.project import PROJECT_EXTENSION, load_project, save_project
 from .region_control_panel import RegionControlPanel
 
 class MainWindow(QMainWindow):
+    # 导出对话框的文件类型与mask格式的对应关系
+    MASK_FILE_FILTERS = {
+        "Text Files (*.txt)": "text",
+        "RLE Files (*.rle)": "rle",
+        "Binary Files (*.bin)": "binary",
+        "Gzip Files (*.gz)": "gzip",
+        "All Files (*)": "text",
+    }
+    # 保存项目对话框的文件类型与是否同时写入JSON附属文件的对应关系
+    PROJECT_FILE_FILTERS = {
+        f"Project Files (*{PROJECT_EXTENSION})": False,
+        f"Project Files + JSON (*{PROJECT_EXTENSION})": True,
+    }
+    # 网格数不少于该值的新点阵使用临时目录中的np.memmap存储，避免全部常驻内存
+    MEMMAP_MIN_CELLS = 16 * 1024 * 1024
+    
     def __init__(self, grid=None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("点阵分割工具")
@@ -24,6 +47,23 @@ class MainWindow(QMainWindow):
         self.zoom_label = QLabel("缩放: 1.00x")
         self.statusBar.addPermanentWidget(self.zoom_label)
         
+        # 帧耗时标签，默认隐藏，通过工具栏按钮开启
+        self.frame_label = QLabel()
+        self.frame_label.setVisible(False)
+        self.statusBar.addPermanentWidget(self.frame_label)
+        
+        # 后台导出的进度条和取消按钮，只在导出期间显示
+        self._export_task = None
+        self.export_progress = QProgressBar()
+        self.export_progress.setFixedWidth(150)
+        self.export_progress.setFormat("导出 %p%")
+        self.export_progress.setVisible(False)
+        self.statusBar.addPermanentWidget(self.export_progress)
+        self.export_cancel_button = QPushButton("取消导出")
+        self.export_cancel_button.clicked.connect(self._cancel_export)
+        self.export_cancel_button.setVisible(False)
+        self.statusBar.addPermanentWidget(self.export_cancel_button)
+        
         # 创建主窗口的中心部件
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -35,19 +75,21 @@ class MainWindow(QMainWindow):
         
         # 创建并添加GridView
         self.grid_view = GridView(self)
+        self._grid_storage = None  # 大点阵的临时存储目录
         self.grid_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)  # 允许GridView扩展
         main_layout.addWidget(self.grid_view)
         
         # 创建并添加RegionControlPanel
-        self.region_panel = RegionControlPanel()
+        self.region_panel = RegionControlPanel(self.grid_view.region_manager)
         self.region_panel.setFixedWidth(150)  # 固定控制面板宽度
         main_layout.addWidget(self.region_panel)
         
         # 连接信号
-        self.grid_view.region_manager.region_added.connect(self.region_panel.add_region)
-        self.grid_view.region_manager.region_removed.connect(self.region_panel.remove_region)
         self.region_panel.region_deleted.connect(self.delete_region)
         self.grid_view.mouse_position_changed.connect(self._update_status_bar)
+        self.grid_view.frame_rendered.connect(self._update_frame_stats)
+        self.grid_view.history.changed.connect(self._update_undo_actions)
+        self._update_undo_actions()
         
         # 如果提供了grid，则加载它
         if grid:
@@ -65,6 +107,17 @@ class MainWindow(QMainWindow):
             # 更新坐标信息
             self.statusBar.showMessage(f"坐标: {position_text}")
     
+    def _update_frame_stats(self, frame_ms: float, rect):
+        """更新状态栏显示的帧耗时和重绘区域"""
+        self.frame_label.setText(f"帧: {frame_ms:.1f}ms  重绘: {rect.width()}×{rect.height()}")
+    
+    def _toggle_frame_stats(self, checked: bool):
+        """切换帧耗时显示"""
+        self.grid_view.frame_stats_enabled = checked
+        self.frame_label.setVisible(checked)
+        if checked:
+            self.grid_view.update()
+    
     def _zoom_in(self):
         self.grid_view.zoom_in()
     
@@ -73,8 +126,7 @@ class MainWindow(QMainWindow):
     
     def load_grid(self, grid):
         """加载点阵数据"""
-        self.grid_view.grid = grid
-        self.grid_view.update()
+        self.grid_view.set_grid(grid)
     
     def _create_new_grid(self):
         """创建新的点阵"""
@@ -82,8 +134,13 @@ class MainWindow(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             rows, cols = dialog.get_size()
             try:
-                new_grid = Grid(rows, cols)
+                storage = None
+                if rows * cols >= self.MEMMAP_MIN_CELLS:
+                    storage = tempfile.TemporaryDirectory(prefix="maskforsyn-")
+                new_grid = Grid(rows, cols, storage_dir=storage.name if storage else None)
                 self.load_grid(new_grid)
+                # 替换后旧点阵的临时目录随之清理
+                self._grid_storage = storage
                 self.statusBar.showMessage(f"已创建 {rows}×{cols} 的点阵", 3000)
             except Exception as e:
                 QMessageBox.warning(self, "错误", f"创建点阵失败: {str(e)}")
@@ -91,6 +148,7 @@ class MainWindow(QMainWindow):
     def _toggle_region_creation(self, checked: bool):
         """切换区域创建模式"""
         if checked:
+            self.polygon_action.setChecked(False)
             try:
                 self.grid_view.start_region_creation()
             except ValueError as e:
@@ -99,6 +157,48 @@ class MainWindow(QMainWindow):
         else:
             self.grid_view.cancel_region_creation()
     
+    def _toggle_polygon_creation(self, checked: bool):
+        """切换多边形绘制模式"""
+        if checked:
+            self.create_region_action.setChecked(False)
+            self.grid_view.start_polygon_creation()
+        else:
+            self.grid_view.cancel_polygon_creation()
+    
+    def _auto_pack(self):
+        """自动排布分割区域"""
+        if not self.grid_view.grid:
+            return
+        dialog = AutoPackDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        try:
+            sizes = parse_region_sizes(dialog.get_sizes_text())
+            placed, failed = self.grid_view.auto_pack(sizes, dialog.get_strategy())
+        except ValueError as e:
+            QMessageBox.warning(self, "错误", str(e))
+            return
+        
+        message = f"已自动放置 {len(placed)} 个区域"
+        if failed:
+            message += f"，{len(failed)} 个区域没有足够的空闲位置"
+            QMessageBox.warning(self, "提示", message)
+        self.statusBar.showMessage(message, 3000)
+    
+    def _undo(self):
+        self.grid_view.undo()
+    
+    def _redo(self):
+        self.grid_view.redo()
+    
+    def _update_undo_actions(self):
+        """根据撤销栈状态更新撤销/重做按钮"""
+        history = self.grid_view.history
+        self.undo_action.setEnabled(history.can_undo)
+        self.undo_action.setToolTip(f"撤销 {history.undo_text()}".strip())
+        self.redo_action.setEnabled(history.can_redo)
+        self.redo_action.setToolTip(f"重做 {history.redo_text()}".strip())
+    
     def delete_region(self, name: str):
         """删除区域"""
         self.grid_view.delete_region(name)
@@ -113,6 +213,16 @@ class MainWindow(QMainWindow):
         new_grid_action.triggered.connect(self._create_new_grid)
         toolbar.addAction(new_grid_action)
         
+        # 打开项目按钮
+        open_project_action = QAction("打开项目", self)
+        open_project_action.triggered.connect(self._open_project)
+        toolbar.addAction(open_project_action)
+        
+        # 保存项目按钮
+        save_project_action = QAction("保存项目", self)
+        save_project_action.triggered.connect(self._save_project)
+        toolbar.addAction(save_project_action)
+        
         # 添加分隔符
         toolbar.addSeparator()
         
@@ -122,33 +232,181 @@ class MainWindow(QMainWindow):
         self.create_region_action.toggled.connect(self._toggle_region_creation)
         toolbar.addAction(self.create_region_action)
         
+        # 绘制多边形区域按钮
+        self.polygon_action = QAction("多边形", self)
+        self.polygon_action.setCheckable(True)
+        self.polygon_action.toggled.connect(self._toggle_polygon_creation)
+        toolbar.addAction(self.polygon_action)
+        
+        # 撤销/重做按钮
+        self.undo_action = QAction("撤销", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self._undo)
+        toolbar.addAction(self.undo_action)
+        
+        self.redo_action = QAction("重做", self)
+        # 平台的标准重做快捷键不同（Linux为Ctrl+Shift+Z，Windows为Ctrl+Y），统一额外绑定Ctrl+Y
+        redo_keys = QKeySequence.keyBindings(QKeySequence.StandardKey.Redo)
+        if QKeySequence("Ctrl+Y") not in redo_keys:
+            redo_keys.append(QKeySequence("Ctrl+Y"))
+        self.redo_action.setShortcuts(redo_keys)
+        self.redo_action.triggered.connect(self._redo)
+        toolbar.addAction(self.redo_action)
+        
+        # 自动排布按钮
+        auto_pack_action = QAction("自动排布", self)
+        auto_pack_action.triggered.connect(self._auto_pack)
+        toolbar.addAction(auto_pack_action)
+        
         # 添加分隔符
         toolbar.addSeparator()
         
-        # 导出Mask按钮
-        export_mask_action = QAction("导出Mask", self)
-        export_mask_action.triggered.connect(self._export_mask)
-        toolbar.addAction(export_mask_action)
+        # 导出Mask按钮，后台导出期间禁用
+        self.export_mask_action = QAction("导出Mask", self)
+        self.export_mask_action.triggered.connect(self._export_mask)
+        toolbar.addAction(self.export_mask_action)
+        
+        # 导入Mask按钮
+        import_mask_action = QAction("导入Mask", self)
+        import_mask_action.triggered.connect(self._import_mask)
+        toolbar.addAction(import_mask_action)
+        
+        # 添加分隔符
+        toolbar.addSeparator()
+        
+        # 帧耗时显示按钮
+        frame_stats_action = QAction("帧耗时", self)
+        frame_stats_action.setCheckable(True)
+        frame_stats_action.toggled.connect(self._toggle_frame_stats)
+        toolbar.addAction(frame_stats_action)
         
         return toolbar
     
     def _export_mask(self):
-        """导出mask文件"""
+        """导出mask文件：在界面线程中取得区域快照，写入在后台线程中进行，导出期间可以继续平移和编辑"""
+        grid = self.grid_view.grid
+        if not grid or self._export_task is not None:
+            return
         # 获取保存文件的路径
-        filename, _ = QFileDialog.getSaveFileName(
+        filename, selected_filter = QFileDialog.getSaveFileName(
             self,
             "保存Mask文件",
             "mask.txt",
-            "Text Files (*.txt);;All Files (*)"
+            ";;".join(self.MASK_FILE_FILTERS)
+        )
+        
+        if filename:
+            # 区域管理器增量维护的标签栅格重新编号后即为独立的快照，不必重新栅格化全部区域
+            manager = self.grid_view.region_manager
+            labels = manager.export_labels()
+            if labels is None or labels[0].shape != (grid.rows, grid.cols):
+                labels = rasterize_regions(manager.regions, grid.rows, grid.cols)
+            self._start_export(MaskExportTask(*labels, filename,
+                                              self.MASK_FILE_FILTERS.get(selected_filter, "text")))
+    
+    def _start_export(self, task: MaskExportTask):
+        """在全局线程池中运行导出任务，并显示进度"""
+        task.setAutoDelete(False)  # 任务由窗口持有，结束后再释放
+        task.signals.progress.connect(self.export_progress.setValue)
+        task.signals.finished.connect(self._on_export_finished)
+        task.signals.failed.connect(self._on_export_failed)
+        task.signals.cancelled.connect(self._on_export_cancelled)
+        self._export_task = task
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.export_cancel_button.setVisible(True)
+        self.export_mask_action.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+    
+    def _cancel_export(self):
+        """请求取消正在进行的导出"""
+        if self._export_task is not None:
+            self._export_task.cancel()
+    
+    def _end_export(self):
+        self._export_task = None
+        self.export_progress.setVisible(False)
+        self.export_cancel_button.setVisible(False)
+        self.export_mask_action.setEnabled(True)
+    
+    def _on_export_finished(self, filename: str, elapsed: float):
+        self._end_export()
+        self.statusBar.showMessage(f"Mask已成功导出到: {filename}（{elapsed:.2f}s）", 3000)
+    
+    def _on_export_failed(self, message: str):
+        self._end_export()
+        QMessageBox.warning(self, "错误", f"导出Mask文件失败: {message}")
+    
+    def _on_export_cancelled(self):
+        self._end_export()
+        self.statusBar.showMessage("已取消导出Mask", 3000)
+    
+    def closeEvent(self, event):
+        """关闭窗口时取消正在进行的导出，并等待后台线程结束（临时文件会被删除）"""
+        if self._export_task is not None:
+            self._export_task.cancel()
+            QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+    
+    def _import_mask(self):
+        """从mask文件重建区域，替换当前的全部区域"""
+        grid = self.grid_view.grid
+        if not grid:
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "导入Mask文件",
+            "",
+            "Mask Files (*.txt *.rle *.bin *.gz);;All Files (*)"
+        )
+        
+        if filename:
+            try:
+                _, regions, unmatched = import_mask(filename, (grid.rows, grid.cols))
+                self.grid_view.replace_regions(regions)
+            except Exception as e:
+                QMessageBox.warning(self, "错误", f"导入Mask文件失败: {str(e)}")
+                return
+            message = f"已从Mask导入 {len(regions)} 个区域"
+            if unmatched:
+                message += f"，{unmatched} 个网格无法用矩形区域还原"
+                QMessageBox.warning(self, "提示", message)
+            self.statusBar.showMessage(message, 3000)
+    
+    def _save_project(self):
+        """保存项目文件"""
+        if not self.grid_view.grid:
+            return
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "保存项目",
+            f"project{PROJECT_EXTENSION}",
+            ";;".join(self.PROJECT_FILE_FILTERS)
+        )
+        
+        if filename:
+            try:
+                save_project(filename, self.grid_view.grid, self.grid_view.region_manager.regions,
+                             self.PROJECT_FILE_FILTERS.get(selected_filter, False))
+                self.statusBar.showMessage(f"项目已保存到: {filename}", 3000)
+            except Exception as e:
+                QMessageBox.warning(self, "错误", f"保存项目失败: {str(e)}")
+    
+    def _open_project(self):
+        """打开项目文件"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "打开项目",
+            "",
+            f"Project Files (*{PROJECT_EXTENSION});;All Files (*)"
         )
         
         if filename:
             try:
-                # 调用grid的导出方法
-                self.grid_view.grid.export_mask(
-                    self.grid_view.region_manager.regions,
-                    filename
-                )
-                self.statusBar.showMessage(f"Mask已成功导出到: {filename}", 3000)
+                grid, regions = load_project(filename)
+                self.grid_view.set_project(grid, regions)
+                # 加载的点阵映射自项目文件，不再需要新建点阵时的临时目录
+                self._grid_storage = None
+                self.statusBar.showMessage(f"已打开项目: {filename}", 3000)
             except Exception as e:
-                QMessageBox.warning(self, "错误", f"导出Mask文件失败: {str(e)}")
\ No newline at end of file
+                QMessageBox.warning(self, "错误", f"打开项目失败: {str(e)}")
@@ -0,0 +1,59 @@
+import math
+from typing import Dict, Optional, Tuple
+import numpy as np
+from PyQt6.QtGui import QImage
+from core.pyramid import GridPyramid, POOLING_FUNCTIONS, pool_max
+
+POINT_COLOR = 0xFF000000  # 有效点颜色（0xAARRGGBB）
+
+def argb(color) -> int:
+    """将 (r, g, b, a) 颜色转换为QImage使用的 0xAARRGGBB 整数"""
+    r, g, b, a = color
+    return (a << 24) | (r << 16) | (g << 8) | b
+
+def region_color_table(region_labels: Dict[str, int], regions: Dict[str, 'Region']) -> np.ndarray:
+    """根据区域名称到标签的映射生成颜色查找表，标签0为透明"""
+    table = np.zeros(max(region_labels.values(), default=0) + 1, dtype=np.uint32)
+    for name, label in region_labels.items():
+        if name in regions:
+            table[label] = argb(regions[name].color)
+    return table
+
+def overview_factor(cell_size: float, pyramid: Optional[GridPyramid] = None) -> Tuple[int, int]:
+    """计算小缩放比例下使用的 (金字塔层, 每像素对应的网格数)
+    单元格小于1像素时每像素至少对应 ceil(1/cell_size) 个网格；使用金字塔时取整到该层倍数的整数倍
+    """
+    factor = max(1, math.ceil(1 / cell_size)) if cell_size < 1 else 1
+    level = pyramid.level_for(factor) if pyramid is not None else 0
+    scale = 1 << level
+    return level, -(-factor // scale) * scale
+
+def render_overview(grid: 'Grid', regions: Dict[str, 'Region'], start_row: int, end_row: int,
+                    start_col: int, end_col: int, cell_size: float, pooling: str = "max",
+                    pyramid: Optional[GridPyramid] = None,
+                    region_labels: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, QImage, int]:
+    """将点阵数据和区域标签栅格渲染为ARGB图像，用于小缩放比例下的整体显示
+    每个像素对应 factor×factor 个网格（单元格小于1像素时进行池化），
+    提供金字塔时从匹配的层开始池化，耗时只与屏幕像素数相关，起始行列需对齐到factor；
+    标签栅格为金字塔的第0层标签（未提供金字塔时为点阵的占用位图），region_labels 为其区域名称到标签的映射，
+    默认为点阵占用位图的映射；
+    返回 (像素缓冲区, 直接引用该缓冲区的QImage, factor)，绘制完成前必须保持缓冲区存活
+    """
+    level, factor = overview_factor(cell_size, pyramid)
+    pool = POOLING_FUNCTIONS[pyramid.pooling if pyramid is not None else pooling]
+
+    if pyramid is not None:
+        points, labels = pyramid.window(level, start_row, end_row, start_col, end_col)
+    else:
+        points = grid.get_window(start_row, end_row, start_col, end_col) != 0
+        labels = grid.occupancy[start_row:end_row, start_col:end_col]
+    residual = factor >> level
+
+    table = region_color_table(grid.region_labels if region_labels is None else region_labels, regions)
+    pixels = table[pool(labels, residual)]
+    pixels[pool_max(points, residual)] = POINT_COLOR
+    pixels = np.ascontiguousarray(pixels)
+
+    height, width = pixels.shape
+    image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32)
+    return pixels, image, factor
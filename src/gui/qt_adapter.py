@@ -0,0 +1,19 @@
+from PyQt6.QtGui import QColor
+from PyQt6.QtCore import QPointF, QRectF
+from core.geometry import Color, Point, Rect
+
+def to_qpointf(point: Point) -> QPointF:
+    """将核心层的点转换为QPointF"""
+    return QPointF(point.x(), point.y())
+
+def from_qpointf(point: QPointF) -> Point:
+    """将QPointF转换为核心层的点"""
+    return Point(point.x(), point.y())
+
+def to_qrectf(rect: Rect) -> QRectF:
+    """将核心层的矩形转换为QRectF"""
+    return QRectF(rect.x(), rect.y(), rect.width(), rect.height())
+
+def to_qcolor(color: Color) -> QColor:
+    """将核心层的 (r, g, b, a) 颜色转换为QColor"""
+    return QColor(*color)
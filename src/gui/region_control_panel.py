@@ -1,120 +1,101 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
-                            QPushButton, QLabel, QScrollArea)
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, QListView,
+                            QStyledItemDelegate, QStyleOptionViewItem, QAbstractItemView)
+from PyQt6.QtCore import pyqtSignal, Qt, QEvent, QModelIndex, QRect, QSize
+from core.region_manager import RegionManager
+from gui.region_list_model import RegionListModel
+
+class RegionItemDelegate(QStyledItemDelegate):
+    """区域列表的行：左侧为颜色和区域名称，右侧为删除按钮（×）
+    按钮只在绘制时画出，不为每一行创建控件
+    """
+    delete_clicked = pyqtSignal(str)  # 发送被点击删除按钮的区域名称
+    ROW_HEIGHT = 30
+
+    def delete_rect(self, rect: QRect) -> QRect:
+        """行内删除按钮所在的矩形"""
+        return QRect(rect.right() - self.ROW_HEIGHT + 1, rect.top(), self.ROW_HEIGHT, rect.height())
+
+    def paint(self, painter, option, index):
+        item_option = QStyleOptionViewItem(option)
+        item_option.rect = option.rect.adjusted(0, 0, -self.ROW_HEIGHT, 0)
+        super().paint(painter, item_option, index)
+        painter.save()
+        painter.setPen(option.palette.text().color())
+        painter.drawText(self.delete_rect(option.rect), Qt.AlignmentFlag.AlignCenter, "×")
+        painter.restore()
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(super().sizeHint(option, index).width(), self.ROW_HEIGHT)
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self.delete_rect(option.rect).contains(event.position().toPoint())):
+            self.delete_clicked.emit(index.data(RegionListModel.NameRole))
+            return True
+        return super().editorEvent(event, model, option, index)
 
 class RegionControlPanel(QWidget):
-    """分割框控制面板"""
+    """分割框控制面板
+    区域列表使用 QListView + RegionListModel，只绘制可见的行，区域数量很多时也能快速构建和滚动
+    """
     region_selected = pyqtSignal(str)  # 发送选中的区域名称
     region_deleted = pyqtSignal(str)   # 发送要删除的区域名称
-    
-    def __init__(self, parent=None):
+
+    def __init__(self, region_manager: RegionManager, parent=None):
         super().__init__(parent)
+        self.model = RegionListModel(region_manager, self)
         self.initUI()
-        
+
     def initUI(self):
         # 创建主布局
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(5, 5, 5, 5)  # 减少边距
-        
+
         # 添加标题
         title = QLabel("分割框控制")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(title)
-        
-        # 创建滚动区域
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        
-        # 创建容器widget
-        self.container = QWidget()
-        self.container_layout = QVBoxLayout()
-        self.container_layout.setContentsMargins(2, 2, 2, 2)  # 减少边距
-        self.container_layout.setSpacing(2)  # 减少间距
-        self.container.setLayout(self.container_layout)
-        
-        # 将容器放入滚动区域
-        scroll.setWidget(self.container)
-        main_layout.addWidget(scroll)
-        
+
+        # 按名称过滤区域
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索区域")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.model.set_filter)
+        main_layout.addWidget(self.search_edit)
+
+        # 区域列表：行高固定，滚动时只需计算可见的行
+        self.delegate = RegionItemDelegate(self)
+        self.delegate.delete_clicked.connect(self.delete_region)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.clicked.connect(self._on_clicked)
+        main_layout.addWidget(self.list_view)
+
+        # 区域数量
+        self.count_label = QLabel()
+        self.count_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(self.count_label)
+        self.model.counts_changed.connect(self._update_count)
+        self._update_count()
+
         self.setLayout(main_layout)
         self.setFixedWidth(150)  # 固定宽度
-        
-        # 存储按钮字典
-        self.region_buttons = {}
-    
-    def add_region(self, name: str):
-        """添加新的区域按钮"""
-        # 检查区域名称是否已存在,避免重复添加
-        if name in self.region_buttons:
-            return
-            
-        # 创建一个新的widget作为按钮组的容器
-        button_widget = QWidget()
-        # 创建水平布局来放置按钮
-        layout = QHBoxLayout()
-        # 设置布局的边距为0,使按钮紧凑排列
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 创建区域选择按钮,显示大写的区域名称
-        select_btn = QPushButton(name.upper())
-        # 设置按钮固定高度为30像素
-        select_btn.setFixedHeight(30)
-        # 连接按钮点击信号,发送区域选中信号
-        select_btn.clicked.connect(lambda: self.region_selected.emit(name))
-        
-        # 创建删除按钮,使用×符号
-        delete_btn = QPushButton("×")
-        # 设置删除按钮为固定大小30x30像素
-        delete_btn.setFixedSize(30, 30)
-        # 连接删除按钮的点击信号到delete_region方法
-        delete_btn.clicked.connect(lambda: self.delete_region(name))
-        
-        # 将两个按钮添加到水平布局中
-        layout.addWidget(select_btn)
-        layout.addWidget(delete_btn)
-        # 设置按钮组容器的布局
-        button_widget.setLayout(layout)
-        
-        # 将按钮组widget保存到字典中以便后续管理
-        self.region_buttons[name] = button_widget
-        
-        # 将按钮组添加到主容器的布局中
-        self.container_layout.addWidget(button_widget)
-    
+
+    def _on_clicked(self, index: QModelIndex):
+        """点击行（删除按钮以外的部分）时发送区域选中信号"""
+        self.region_selected.emit(self.model.name_at(index.row()))
+
+    def _update_count(self):
+        """更新区域数量，过滤时同时显示匹配的数量"""
+        shown, total = self.model.rowCount(), self.model.total
+        self.count_label.setText(f"{shown} / {total} 个区域" if self.search_edit.text().strip() else f"{total} 个区域")
+
     def delete_region(self, name: str):
-        """删除区域按钮"""
-        # 检查要删除的区域是否存在
-        if name in self.region_buttons:
-            # 获取对应的按钮组件
-            button_widget = self.region_buttons[name]
-            # 从容器布局中移除按钮组
-            self.container_layout.removeWidget(button_widget)
-            # 调用deleteLater()延迟删除组件
-            button_widget.deleteLater()
-            # 从按钮字典中删除记录
-            del self.region_buttons[name]
-            # 发送区域删除信号
-            self.region_deleted.emit(name)
-    
-    def clear(self):
-        """清除所有按钮"""
-        # 遍历所有按钮组件并删除
-        for button_widget in self.region_buttons.values():
-            button_widget.deleteLater()
-        # 清空按钮字典
-        self.region_buttons.clear() 
-    
-    def remove_region(self, name: str):
-        """从控制面板中移除区域"""
-        # 检查要删除的区域是否存在于按钮字典中
-        if name in self.region_buttons:
-            # 获取对应的按钮组件
-            button_widget = self.region_buttons[name]
-            # 从容器布局中移除按钮组
-            self.container_layout.removeWidget(button_widget)
-            # 删除按钮组件
-            button_widget.deleteLater()
-            # 从按钮字典中删除记录
-            del self.region_buttons[name]
\ No newline at end of file
+        """请求删除区域，列表在区域从管理器中删除后随之更新"""
+        self.region_deleted.emit(name)
@@ -0,0 +1,130 @@
+from typing import Dict, List
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from core.region_manager import RegionManager
+from gui.qt_adapter import to_qcolor
+
+# 删除行数较多且分散时，重置模型比逐段发送行删除通知更快
+MAX_REMOVE_RUNS = 32
+
+class RegionListModel(QAbstractListModel):
+    """区域列表模型，跟随 RegionManager 的添加/删除信号增量更新
+    按添加顺序列出名称中包含过滤文本的区域；批量添加和删除各只产生一次行变化通知
+    """
+    NameRole = Qt.ItemDataRole.UserRole  # 区域名称（小写）
+    counts_changed = pyqtSignal()  # 区域总数或匹配的行数变化时发送
+
+    def __init__(self, manager: RegionManager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self._names: Dict[str, None] = dict.fromkeys(manager.regions)  # 全部区域，按添加顺序
+        self._filter = ""
+        self._visible: List[str] = list(self._names)  # 与过滤文本匹配的区域，即模型的行
+        manager.region_added.connect(self._on_region_added)
+        manager.region_removed.connect(self._on_region_removed)
+        manager.regions_added.connect(self._insert)
+        manager.regions_removed.connect(self._remove)
+
+    @property
+    def total(self) -> int:
+        """区域总数（不受过滤影响）"""
+        return len(self._names)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._visible)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._visible):
+            return None
+        name = self._visible[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name.upper()
+        if role == self.NameRole:
+            return name
+        region = self.manager.regions.get(name)
+        if region is None:
+            return None
+        if role == Qt.ItemDataRole.DecorationRole:
+            color = to_qcolor(region.color)
+            color.setAlpha(255)
+            return color
+        if role == Qt.ItemDataRole.ToolTipRole:
+            state = "" if region.is_placed else "（未放置）"
+            return f"{name.upper()}  {region.width}×{region.height}{state}"
+        return None
+
+    def name_at(self, row: int) -> str:
+        return self._visible[row]
+
+    def row_of(self, name: str) -> int:
+        """区域所在的行，被过滤掉或不存在时返回-1"""
+        try:
+            return self._visible.index(name)
+        except ValueError:
+            return -1
+
+    def set_filter(self, text: str):
+        """按名称过滤（不区分大小写的子串匹配）
+        新的过滤文本包含旧文本时，结果只可能在当前可见的行中，只需重新检查这些行
+        """
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        candidates = self._visible if self._filter in text else self._names
+        self.beginResetModel()
+        self._filter = text
+        self._visible = [name for name in candidates if text in name]
+        self.endResetModel()
+        self.counts_changed.emit()
+
+    def _on_region_added(self, name: str):
+        self._insert([name])
+
+    def _on_region_removed(self, name: str):
+        self._remove([name])
+
+    def _insert(self, names: List[str]):
+        """在末尾追加区域，匹配过滤文本的区域作为连续的一段行插入"""
+        names = [name for name in names if name not in self._names]
+        self._names.update(dict.fromkeys(names))
+        matched = [name for name in names if self._filter in name]
+        if matched:
+            first = len(self._visible)
+            self.beginInsertRows(QModelIndex(), first, first + len(matched) - 1)
+            self._visible.extend(matched)
+            self.endInsertRows()
+        self.counts_changed.emit()
+
+    def _remove(self, names: List[str]):
+        """删除区域，连续的行合并为一次行删除通知，过于分散时直接重置模型"""
+        removed = {name for name in names if name in self._names}
+        if not removed:
+            return
+        for name in removed:
+            del self._names[name]
+        if len(removed) <= MAX_REMOVE_RUNS:
+            # 少量删除时逐个查找行号（list.index 在C层扫描），避免逐行检查
+            rows = sorted(self._visible.index(name) for name in removed if self._filter in name)
+        else:
+            rows = [row for row, name in enumerate(self._visible) if name in removed]
+        if rows:
+            self._remove_rows(rows, removed)
+        self.counts_changed.emit()
+
+    def _remove_rows(self, rows: List[int], removed: set):
+        """删除可见行，rows 为升序的行号"""
+        runs = []  # (起始行, 结束行)，结束行包含
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1] = (runs[-1][0], row)
+            else:
+                runs.append((row, row))
+        if len(runs) > MAX_REMOVE_RUNS:
+            self.beginResetModel()
+            self._visible = [name for name in self._visible if name not in removed]
+            self.endResetModel()
+            return
+        # 从后往前删除，前面各段的行号保持不变
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._visible[first:last + 1]
+            self.endRemoveRows()
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+import numpy as np
+from PyQt6.QtGui import QImage, QPixmap
+
+# 网格图块颜色（0xAARRGGBB）
+BACKGROUND_COLOR = 0xFFF0F0F0  # 背景
+GRID_LINE_COLOR = 0xFFC8C8C8   # 网格线
+EMPTY_CELL_COLOR = 0xFFFFFFFF  # 空白点
+FILLED_CELL_COLOR = 0xFF000000 # 有效点
+
+# 单个图块的目标像素尺寸，用于决定每个图块包含的网格数
+TILE_PIXELS = 512
+MIN_TILE_CELLS = 8
+MAX_TILE_CELLS = 64
+
+def tile_cells_for(cell_size: float) -> int:
+    """根据单元格大小计算每个图块的边长（网格数）"""
+    return max(MIN_TILE_CELLS, min(MAX_TILE_CELLS, int(TILE_PIXELS // cell_size)))
+
+def render_tile(grid: 'Grid', cell_size: int, tile_cells: int, tile_row: int, tile_col: int) -> QPixmap:
+    """将一个图块内的网格（背景、网格线和点）渲染为QPixmap"""
+    start_row = tile_row * tile_cells
+    start_col = tile_col * tile_cells
+    end_row = min(grid.rows, start_row + tile_cells)
+    end_col = min(grid.cols, start_col + tile_cells)
+
+    window = grid.get_window(start_row, end_row, start_col, end_col)
+    colors = np.where(window == 0, np.uint32(EMPTY_CELL_COLOR), np.uint32(FILLED_CELL_COLOR))
+
+    # 每个网格放大为 cell_size×cell_size 个像素，左上边界的一行一列为网格线
+    pixels = np.repeat(np.repeat(colors, cell_size, axis=0), cell_size, axis=1)
+    line_color = GRID_LINE_COLOR if cell_size >= 4 else BACKGROUND_COLOR
+    pixels[::cell_size, :] = line_color
+    pixels[:, ::cell_size] = line_color
+    pixels = np.ascontiguousarray(pixels)
+
+    height, width = pixels.shape
+    image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_RGB32)
+    # QImage不持有numpy缓冲区，先复制一份再转换，避免缓冲区释放后被引用
+    return QPixmap.fromImage(image.copy())
+
+def tile_range(visible_range, tile_cells: int) -> Tuple[int, int, int, int]:
+    """计算覆盖可见网格范围的图块范围 (起始行, 结束行, 起始列, 结束列)，结束值不包含"""
+    return (visible_range.top() // tile_cells,
+            (visible_range.top() + visible_range.height() - 1) // tile_cells + 1,
+            visible_range.left() // tile_cells,
+            (visible_range.left() + visible_range.width() - 1) // tile_cells + 1)
+
+class TileCache:
+    """图块缓存
+    按 (单元格大小, 图块边长, 图块行, 图块列) 缓存已渲染的图块，
+    超出内存预算时淘汰最久未使用的图块
+    """
+    def __init__(self, budget_bytes: int = 128 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.tiles: "OrderedDict[Hashable, QPixmap]" = OrderedDict()
+        self.hits = 0    # 命中次数
+        self.misses = 0  # 未命中（需要重新渲染）次数
+
+    @staticmethod
+    def _pixmap_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * 4
+
+    def get(self, key: Hashable) -> Optional[QPixmap]:
+        """获取图块，命中时将其标记为最近使用"""
+        pixmap = self.tiles.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.tiles.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def put(self, key: Hashable, pixmap: QPixmap):
+        """保存图块，并按预算淘汰最久未使用的图块"""
+        if key in self.tiles:
+            self.used_bytes -= self._pixmap_bytes(self.tiles.pop(key))
+        self.tiles[key] = pixmap
+        self.used_bytes += self._pixmap_bytes(pixmap)
+        while self.used_bytes > self.budget_bytes and len(self.tiles) > 1:
+            _, evicted = self.tiles.popitem(last=False)
+            self.used_bytes -= self._pixmap_bytes(evicted)
+
+    def invalidate_cells(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """使覆盖指定网格范围（结束值不包含）的所有图块失效"""
+        for key in list(self.tiles):
+            _, tile_cells, tile_row, tile_col = key
+            if (tile_row * tile_cells < end_row and start_row < (tile_row + 1) * tile_cells and
+                    tile_col * tile_cells < end_col and start_col < (tile_col + 1) * tile_cells):
+                self.used_bytes -= self._pixmap_bytes(self.tiles.pop(key))
+
+    def clear(self):
+        """清空缓存"""
+        self.tiles.clear()
+        self.used_bytes = 0
@@ -1,21 +1,44 @@
 from PyQt6.QtWidgets import QApplication
 from gui.main_window import MainWindow
 from core.grid import Grid
+from core.trace import logger, tracer
+import argparse
+import logging
 import sys
 
+def parse_args():
+    """解析命令行参数，未识别的参数交给Qt处理"""
+    parser = argparse.ArgumentParser(description="点阵区域分割工具")
+    parser.add_argument("--log-level", default="WARNING",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="日志级别")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="记录绘制、拖动、重叠检测和导出的耗时，退出时保存为Chrome Trace JSON文件")
+    return parser.parse_known_args()
+
 def main():
+    args, qt_args = parse_args()
+
+    # 配置日志，默认只输出警告及以上级别
+    logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+    logger.setLevel(args.log_level)
+    if args.trace:
+        tracer.enable()
+
     # 创建QApplication实例
-    app = QApplication(sys.argv)
-    
+    app = QApplication(sys.argv[:1] + qt_args)
+
     # 创建网格
     grid = Grid(318, 74)
-    
+
     # 创建主窗口
     window = MainWindow(grid)
     window.show()
-    
+
     # 运行应用程序事件循环
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试与基准测试一样从src目录导入 core、benchmarks 等模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+"""标签栅格导出与逐点检查的参考实现逐字节一致"""
+import pytest
+from benchmarks.export import export_mask_per_point, make_regions
+from core.grid import CHIP_PRESETS, Grid
+from core.region_manager import RegionManager
+
+def read_bytes(filename: str) -> bytes:
+    with open(filename, 'rb') as f:
+        return f.read()
+
+@pytest.mark.parametrize("rows, cols, count, seed", [
+    (*CHIP_PRESETS["23k"], 20, 0),
+    (40, 60, 30, 1),
+    (40, 60, 30, 2),
+    (7, 5, 10, 3),
+    (1, 1, 3, 4),
+])
+def test_export_matches_per_point_reference(tmp_path, rows, cols, count, seed):
+    grid = Grid(rows, cols)
+    regions = make_regions(rows, cols, count, seed)
+    reference, raster = str(tmp_path / "reference.txt"), str(tmp_path / "raster.txt")
+    export_mask_per_point(grid, regions, reference)
+    grid.export_mask(regions, raster)
+    assert read_bytes(raster) == read_bytes(reference)
+
+def test_export_with_label_raster_matches_reference(tmp_path):
+    rows, cols = 40, 60
+    manager = RegionManager()
+    manager.add_regions(make_regions(rows, cols, 30, 5).values())
+    manager.set_grid_size(rows, cols)
+    grid = Grid(rows, cols)
+    reference, raster = str(tmp_path / "reference.txt"), str(tmp_path / "raster.txt")
+    export_mask_per_point(grid, manager.regions, reference)
+    grid.export_mask(manager.regions, raster, labels=manager.export_labels())
+    assert read_bytes(raster) == read_bytes(reference)
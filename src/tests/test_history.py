@@ -0,0 +1,77 @@
+"""撤销/重做栈的容量限制和记录合并"""
+from core.geometry import Point
+from core.history import RegionCommand, SetRegionGeometry, UndoStack, region_geometry
+from core.region_manager import RegionManager
+
+class SizedCommand(RegionCommand):
+    """内存估计可调的空记录"""
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    @property
+    def nbytes(self) -> int:
+        return self.size
+
+    def undo(self, manager, grid):
+        pass
+
+    def redo(self, manager, grid):
+        pass
+
+def test_max_entries_drops_oldest():
+    stack = UndoStack(max_entries=3, max_bytes=None)
+    commands = [SizedCommand(1) for _ in range(5)]
+    for command in commands:
+        stack.push(command)
+    assert len(stack) == 3
+    assert [stack.undo(None, None) for _ in range(4)] == commands[:1:-1] + [None]
+
+def test_max_bytes_keeps_latest_entry():
+    stack = UndoStack(max_bytes=100)
+    stack.push(SizedCommand(60))
+    stack.push(SizedCommand(30))
+    assert len(stack) == 2 and stack.nbytes == 90
+    stack.push(SizedCommand(500))
+    assert len(stack) == 1 and stack.nbytes == 500
+
+def test_redo_applies_byte_cap():
+    stack = UndoStack(max_bytes=100)
+    first, second = SizedCommand(60), SizedCommand(30)
+    stack.push(first)
+    stack.push(second)
+    stack.undo(None, None)
+    second.size = 60  # 如合并了更多步骤的记录，重做时的内存估计变大
+    stack.redo(None, None)
+    assert stack.nbytes <= 100 and len(stack) == 1
+    assert stack.undo(None, None) is second
+
+def test_drag_steps_merge_into_one_entry():
+    manager = RegionManager()
+    region = manager.create_region(4, 4)
+    stack = UndoStack()
+    start = region_geometry(region)
+    for step in range(1, 6):
+        before = region_geometry(region)
+        manager.move_region(region.name, Point(step, step))
+        stack.push(SetRegionGeometry(region.name, before, region_geometry(region), merge_key=("drag", 1)))
+    assert len(stack) == 1
+    stack.push(SetRegionGeometry(region.name, region_geometry(region), start, merge_key=("drag", 2)))
+    assert len(stack) == 2
+
+    stack.undo(manager, None)
+    stack.undo(manager, None)
+    assert region_geometry(region) == start
+    stack.redo(manager, None)
+    assert region_geometry(region) == (5, 5, 4, 4)
+
+def test_merge_back_to_start_is_dropped():
+    manager = RegionManager()
+    region = manager.create_region(4, 4)
+    stack = UndoStack()
+    start = region_geometry(region)
+    manager.move_region(region.name, Point(3, 0))
+    stack.push(SetRegionGeometry(region.name, start, region_geometry(region), merge_key="drag"))
+    manager.move_region(region.name, Point(0, 0))
+    stack.push(SetRegionGeometry(region.name, (3, 0, 4, 4), start, merge_key="drag"))
+    assert len(stack) == 0 and stack.nbytes == 0 and not stack.can_undo
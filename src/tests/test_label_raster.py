@@ -0,0 +1,60 @@
+"""增量更新的标签栅格与重新栅格化的结果一致"""
+import random
+import numpy as np
+import pytest
+from benchmarks.label_raster import random_region
+from core.geometry import Point
+from core.rasterizer import rasterize_regions
+from core.region_manager import RegionManager
+
+def cell_names(labels: np.ndarray, names) -> np.ndarray:
+    """每个网格所属区域的名称，未被覆盖为空字符串"""
+    return np.array([""] + list(names))[labels]
+
+def random_edit(manager: RegionManager, rng: random.Random, rows: int, cols: int):
+    """随机移动、添加、删除、取消放置区域，或在一次批量更新中移动多个区域"""
+    names = list(manager.regions)
+    op = rng.random()
+    if op < 0.4:
+        region = manager.regions[rng.choice(names)]
+        manager.move_region(region.name, Point(region.position.x() + rng.randint(-3, 3),
+                                               region.position.y() + rng.randint(-3, 3)))
+    elif op < 0.6:
+        manager.set_placed(random_region(manager, rng, rows, cols).name)
+    elif op < 0.7:
+        manager.set_placed(rng.choice(names), rng.random() < 0.5)
+    elif op < 0.85:
+        with manager.batch():
+            for name in rng.sample(names, min(3, len(names))):
+                manager.move_region(name, Point(rng.randint(-5, cols), rng.randint(-5, rows)))
+    elif len(names) > 1:
+        manager.remove_region(rng.choice(names))
+
+@pytest.mark.parametrize("memmap", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_label_raster_matches_rasterize_after_edits(tmp_path, seed, memmap):
+    rows, cols = 50, 70
+    rng = random.Random(seed)
+    manager = RegionManager()
+    for _ in range(15):
+        manager.set_placed(random_region(manager, rng, rows, cols).name)
+    manager.set_grid_size(rows, cols, str(tmp_path) if memmap else None)
+    dirty = []
+    manager.labels_changed.connect(lambda *window: dirty.append(window))
+
+    before = cell_names(*manager.export_labels())
+    for _ in range(150):
+        dirty.clear()
+        random_edit(manager, rng, rows, cols)
+        labels, names = manager.export_labels()
+        expected, expected_names = rasterize_regions(manager.regions, rows, cols)
+        assert names == expected_names
+        assert np.array_equal(labels, expected)
+
+        # 发生变化的网格都在 labels_changed 发送的范围内
+        after = cell_names(labels, names)
+        changed = before != after
+        for start_row, end_row, start_col, end_col in dirty:
+            changed[start_row:end_row, start_col:end_col] = False
+        assert not changed.any()
+        before = after
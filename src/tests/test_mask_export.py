@@ -0,0 +1,35 @@
+"""多文件mask导出的任务规划和输出"""
+import os
+import numpy as np
+import pytest
+from core.mask_export import export_masks, plan_exports
+from core.mask_reader import read_mask
+
+def test_plan_exports_names():
+    jobs = plan_exports(["a", "b"], "out", "chip", "text", cycles=[["b"], ["a", "b"]])
+    assert [filename for filename, _ in jobs] == [os.path.join("out", name) for name in (
+        "chip.txt", "chip_A.txt", "chip_B.txt", "chip_cycle001.txt", "chip_cycle002.txt")]
+    assert [selected for _, selected in jobs] == [None, (1,), (2,), (2,), (1, 2)]
+
+def test_plan_exports_rejects_case_insensitive_collisions():
+    with pytest.raises(ValueError, match="冲突"):
+        plan_exports(["cycle001", "b"], "out", "mask", "text", cycles=[["b"]])
+    with pytest.raises(ValueError, match="冲突"):
+        plan_exports(["a", "A"], "out", "mask", "text")
+
+def test_plan_exports_rejects_unknown_cycle_regions():
+    with pytest.raises(ValueError, match="不存在"):
+        plan_exports(["a"], "out", cycles=[["a", "z"]])
+
+def test_export_masks_writes_every_job(tmp_path):
+    labels = np.zeros((6, 8), dtype=np.uint16)
+    labels[1:3, 1:4] = 1
+    labels[3:6, 5:8] = 2
+    names = ["a", "b"]
+    jobs = plan_exports(names, str(tmp_path), "mask", "binary", cycles=[["a", "b"]])
+    export_masks(labels, names, jobs, "binary", workers=1)
+    merged, merged_names = read_mask(jobs[0][0])
+    assert np.array_equal(np.array(["0", "A", "B"])[labels], np.array(["0"] + merged_names)[merged])
+    for filename, selected in jobs[1:]:
+        mask, _ = read_mask(filename)
+        assert np.array_equal(mask, np.isin(labels, selected))
@@ -0,0 +1,63 @@
+"""mask读写和从mask重建区域"""
+import math
+import numpy as np
+import pytest
+from benchmarks.export import make_regions
+from core.grid import Grid
+from core.mask_import import import_mask, regions_from_labels, unmatched_cells
+from core.mask_reader import read_mask
+from core.mask_writer import MASK_WRITERS
+from core.rasterizer import rasterize_regions
+
+def tokens(labels: np.ndarray, names) -> np.ndarray:
+    """将标签栅格转换为名称栅格，便于比较标签编号不同的两个mask"""
+    return np.array(["0"] + [name.upper() for name in names], dtype=object)[labels]
+
+@pytest.mark.parametrize("encoding", list(MASK_WRITERS))
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_import_round_trip(tmp_path, encoding, seed):
+    rows, cols = 60, 80
+    grid = Grid(rows, cols)
+    regions = make_regions(rows, cols, 12, seed)
+    filename = str(tmp_path / ("mask" + MASK_WRITERS[encoding].extension))
+    grid.export_mask(regions, filename, encoding)
+    expected_labels, expected_names = rasterize_regions(regions, rows, cols)
+    labels, names = read_mask(filename, (rows, cols))
+    assert np.array_equal(tokens(labels, names), tokens(expected_labels, expected_names))
+
+    size, imported, unmatched = import_mask(filename, (rows, cols))
+    assert size == (rows, cols) and unmatched == 0
+    grid.export_mask(imported, filename, encoding)
+    assert np.array_equal(tokens(*read_mask(filename, (rows, cols))), tokens(labels, names))
+
+def test_disjoint_blocks_become_separate_regions():
+    labels = np.zeros((10, 12), dtype=np.uint16)
+    labels[1:3, 1:3] = 1
+    labels[6:9, 7:11] = 1
+    regions = regions_from_labels(labels, ["B"])
+    assert sorted(regions) == ["b", "b_2"]
+    assert unmatched_cells(labels, ["B"], regions) == 0
+
+def test_blocks_separated_by_occluder_stay_one_region():
+    labels = np.zeros((5, 9), dtype=np.uint16)
+    labels[1:4, :] = 1
+    labels[:, 4] = 2
+    regions = regions_from_labels(labels, ["A", "B"])
+    assert list(regions) == ["b", "a"]
+    assert unmatched_cells(labels, ["A", "B"], regions) == 0
+
+def test_single_column_region_survives_grid_moves():
+    labels = np.zeros((8, 10), dtype=np.uint16)
+    labels[2:6, 3] = 1
+    labels[0, 5:9] = 2
+    regions = regions_from_labels(labels, ["A", "B"])
+    assert all(not region.get_rect().isNull() for region in regions.values())
+
+    # 与拖动时一样先取整到网格，再由区域保留原有的小数部分
+    for region in regions.values():
+        x, y = region.position.x(), region.position.y()
+        region.set_position(region.snapped_position(math.floor(x) + 1, math.floor(y) + 1))
+    moved, names = rasterize_regions(regions, 8, 10)
+    expected = np.zeros_like(labels)
+    expected[1:, 1:] = labels[:-1, :-1]
+    assert np.array_equal(tokens(moved, names), tokens(expected, ["A", "B"]))
@@ -0,0 +1,35 @@
+"""自动排布的区域导出后互不重叠"""
+import random
+import numpy as np
+import pytest
+from core.geometry import Point
+from core.grid import Grid
+from core.packing import PACKING_STRATEGIES
+from core.rasterizer import rasterize_regions
+from core.region_manager import RegionManager
+
+@pytest.mark.parametrize("strategy", PACKING_STRATEGIES)
+@pytest.mark.parametrize("seed", range(3))
+def test_packed_regions_do_not_share_exported_cells(strategy, seed):
+    rows, cols = 60, 80
+    rng = random.Random(seed)
+    manager = RegionManager()
+    grid = Grid(rows, cols)
+    # 已有区域，排布时需避开其导出时覆盖的网格（包括右边界和下边界）
+    existing = manager.create_region(10, 8)
+    manager.move_region(existing.name, Point(20, 15))
+    manager.set_placed(existing.name)
+    grid.place_region(existing)
+
+    sizes = [(rng.randint(1, 12), rng.randint(1, 12)) for _ in range(40)]
+    placed, failed = manager.pack_regions(sizes, grid, strategy)
+    assert placed
+    assert len(placed) + len(failed) == len(sizes)
+    assert manager.find_overlaps() == []
+
+    # 每个区域导出 (w+1)×(h+1) 个网格，没有被其他区域遮挡
+    labels, names = rasterize_regions(manager.regions, rows, cols)
+    counts = np.bincount(labels.ravel(), minlength=len(names) + 1)
+    for label, name in enumerate(names, 1):
+        region = manager.regions[name]
+        assert counts[label] == (region.width + 1) * (region.height + 1), name
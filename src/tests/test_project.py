@@ -0,0 +1,61 @@
+"""项目文件的保存与加载"""
+import numpy as np
+from core.geometry import Point
+from core.grid import Grid
+from core.layout import load_layout
+from core.project import load_project, save_project, sidecar_filename
+from core.region import Region
+
+def make_project():
+    grid = Grid(40, 50)
+    grid.points[::3, ::7] = 1
+    rect = Region("a", 10, 6)
+    rect.set_position(Point(2, 3))
+    rect.color = (10, 20, 30, 255)
+    rect.is_placed = True
+    polygon = Region("b", 0, 0)
+    polygon.set_polygon([(20, 5), (30, 5), (25, 12.5)])
+    polygon.is_placed = True
+    unplaced = Region("c", 4, 4)
+    unplaced.set_position(Point(35.5, 30))
+    return grid, {"a": rect, "b": polygon, "c": unplaced}
+
+def region_state(region: Region):
+    return (region.name, region.position.x(), region.position.y(), region.width, region.height,
+            region.points, tuple(region.color), region.is_placed)
+
+def test_round_trip(tmp_path):
+    grid, regions = make_project()
+    filename = str(tmp_path / "chip.maskproj")
+    save_project(filename, grid, regions)
+    for mmap in (True, False):
+        loaded_grid, loaded = load_project(filename, mmap=mmap)
+        assert (loaded_grid.rows, loaded_grid.cols) == (grid.rows, grid.cols)
+        assert np.array_equal(loaded_grid.points, grid.points)
+        assert [region_state(region) for region in loaded.values()] == \
+            [region_state(region) for region in regions.values()]
+
+def test_resave_over_mapped_file(tmp_path):
+    grid, regions = make_project()
+    filename = str(tmp_path / "chip.maskproj")
+    save_project(filename, grid, regions)
+    loaded_grid, loaded = load_project(filename)
+    loaded_grid.points[0, 1] = 1
+    save_project(filename, loaded_grid, loaded)
+    assert loaded_grid.points[0, 1] == 1
+
+    expected = grid.points.copy()
+    expected[0, 1] = 1
+    reloaded_grid, reloaded = load_project(filename)
+    assert np.array_equal(reloaded_grid.points, expected)
+    assert list(reloaded) == list(regions)
+    assert [path.name for path in tmp_path.iterdir()] == ["chip.maskproj"]
+
+def test_sidecar_is_a_layout(tmp_path):
+    grid, regions = make_project()
+    filename = str(tmp_path / "chip.maskproj")
+    save_project(filename, grid, regions, sidecar=True)
+    size, layout = load_layout(sidecar_filename(filename))
+    assert size == (grid.rows, grid.cols)
+    assert {name: region.is_placed for name, region in layout.items()} == {"a": True, "b": True, "c": False}
+    assert layout["b"].points == regions["b"].points
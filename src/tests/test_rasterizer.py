@@ -0,0 +1,59 @@
+"""多边形扫描线填充与逐点奇偶判断一致"""
+import random
+import numpy as np
+import pytest
+from core.rasterizer import polygon_mask
+
+def even_odd(xs, ys, px: float, py: float) -> bool:
+    """向右的射线与多边形的边相交奇数次时点在内部"""
+    inside = False
+    for k in range(len(xs)):
+        x0, y0, x1, y1 = xs[k - 1], ys[k - 1], xs[k], ys[k]
+        if (y0 <= py) != (y1 <= py) and x0 + (py - y0) * (x1 - x0) / (y1 - y0) > px:
+            inside = not inside
+    return inside
+
+def on_boundary(xs, ys, px: float, py: float) -> bool:
+    """点是否落在多边形的某条边上（整数坐标下精确判断）"""
+    for k in range(len(xs)):
+        x0, y0, x1, y1 = xs[k - 1], ys[k - 1], xs[k], ys[k]
+        if ((x1 - x0) * (py - y0) == (y1 - y0) * (px - x0)
+                and min(x0, x1) <= px <= max(x0, x1) and min(y0, y1) <= py <= max(y0, y1)):
+            return True
+    return False
+
+def window(mask, rows: int, cols: int) -> np.ndarray:
+    """将 (起始行, 起始列, 掩码) 放到 rows×cols 的点阵中"""
+    start_row, start_col, array = mask
+    result = np.zeros((rows, cols), dtype=bool)
+    result[start_row:start_row + array.shape[0], start_col:start_col + array.shape[1]] = array
+    return result
+
+@pytest.mark.parametrize("seed", range(10))
+def test_open_polygon_matches_even_odd_at_cell_centers(seed):
+    # 顶点为随机小数，网格中心不会恰好落在边上；顶点随机排列，多边形通常自相交
+    rng = random.Random(seed)
+    count = rng.randint(3, 9)
+    xs = [rng.uniform(1, 29) for _ in range(count)]
+    ys = [rng.uniform(1, 19) for _ in range(count)]
+    expected = np.array([[even_odd(xs, ys, col + 0.5, row + 0.5) for col in range(30)] for row in range(20)])
+    assert np.array_equal(window(polygon_mask(xs, ys, closed=False), 20, 30), expected)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_closed_polygon_matches_even_odd_with_boundary(seed):
+    # 顶点为整数，边上的网格点也算作被覆盖
+    rng = random.Random(seed)
+    count = rng.randint(3, 7)
+    xs = [rng.randint(1, 28) for _ in range(count)]
+    ys = [rng.randint(1, 18) for _ in range(count)]
+    expected = np.array([[even_odd(xs, ys, col, row) or on_boundary(xs, ys, col, row) for col in range(30)]
+                         for row in range(20)])
+    assert np.array_equal(window(polygon_mask(xs, ys, closed=True), 20, 30), expected)
+
+def test_pentagram_center_is_empty():
+    # 五角星按奇偶规则填充，五条边围成的中心五边形被覆盖两次，不算在内部
+    xs = [10.3, 16.2, 1.1, 19.5, 3.8]
+    ys = [1.2, 19.1, 7.9, 7.7, 19.3]
+    mask = window(polygon_mask(xs, ys, closed=False), 21, 21)
+    assert not mask[9:12, 8:12].any()
+    assert mask[4, 10] and mask[9, 4] and mask[14, 8]
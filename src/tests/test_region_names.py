@@ -0,0 +1,23 @@
+"""区域名称与序号的相互转换"""
+import pytest
+from core.region_manager import name_index, region_name
+
+@pytest.mark.parametrize("index, name", [
+    (0, "a"), (25, "z"), (26, "aa"), (27, "ab"), (51, "az"), (52, "ba"),
+    (701, "zz"), (702, "aaa"), (18277, "zzz"), (18278, "aaaa"),
+])
+def test_region_name_boundaries(index, name):
+    assert region_name(index) == name
+    assert name_index(name) == index
+
+def test_region_name_is_bijection():
+    names = [region_name(index) for index in range(20000)]
+    assert len(set(names)) == len(names)
+    assert [name_index(name) for name in names] == list(range(20000))
+    # 同长度的名称按字母序排列，长度增加时从 a...a 重新开始
+    for previous, name in zip(names, names[1:]):
+        assert (len(previous), previous) < (len(name), name)
+
+@pytest.mark.parametrize("name", ["", "A", "a1", "ab_2", "é"])
+def test_name_index_rejects_other_names(name):
+    assert name_index(name) is None
@@ -0,0 +1,42 @@
+"""排序扫描求相交矩形对与两两检查一致"""
+import random
+import numpy as np
+import pytest
+from core.spatial_index import overlapping_pairs
+
+def brute_force_pairs(boxes):
+    """两两检查：内部相交才算，仅接触边界或面积为0不算"""
+    pairs = set()
+    for i, (l0, t0, r0, b0) in enumerate(boxes):
+        for j in range(i + 1, len(boxes)):
+            l1, t1, r1, b1 = boxes[j]
+            if l0 < r0 and t0 < b0 and l1 < r1 and t1 < b1 and l0 < r1 and l1 < r0 and t0 < b1 and t1 < b0:
+                pairs.add((i, j))
+    return pairs
+
+def random_boxes(rng: random.Random, count: int, integer: bool):
+    boxes = []
+    for _ in range(count):
+        if integer:
+            # 整数坐标，经常出现边界相接、完全重合和宽或高为0的矩形
+            x, y, w, h = rng.randint(0, 30), rng.randint(0, 30), rng.randint(0, 8), rng.randint(0, 8)
+        else:
+            x, y, w, h = rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 20), rng.uniform(0, 20)
+        boxes.append((x, y, x + w, y + h))
+    return boxes
+
+@pytest.mark.parametrize("integer", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_pairs_matches_brute_force(seed, integer):
+    boxes = random_boxes(random.Random(seed), 200, integer)
+    first, second = overlapping_pairs(boxes)
+    pairs = list(zip(first.tolist(), second.tolist()))
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == brute_force_pairs(boxes)
+
+def test_overlapping_pairs_edge_cases():
+    assert [a.size for a in overlapping_pairs(np.zeros((0, 4)))] == [0, 0]
+    assert [a.tolist() for a in overlapping_pairs([(0, 0, 1, 1)])] == [[], []]
+    # 相接、重合、零面积
+    first, second = overlapping_pairs([(0, 0, 2, 2), (2, 0, 4, 2), (0, 0, 2, 2), (1, 1, 1, 3)])
+    assert list(zip(first.tolist(), second.tolist())) == [(0, 2)]